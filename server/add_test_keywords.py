@@ -3,11 +3,12 @@ Quick script to add test keywords to a user profile for testing
 """
 import os
 import sys
+import asyncio
 sys.path.append('.')
 
 from services.user_profile_service import add_keyword_location
 
-def add_test_keywords():
+async def add_test_keywords():
     """Add some test keywords for demonstration"""
     
     # You can change this to your actual Auth0 user ID
@@ -49,7 +50,7 @@ def add_test_keywords():
     
     for keyword, location_data in test_keywords.items():
         try:
-            add_keyword_location(test_user_id, keyword, location_data)
+            await add_keyword_location(test_user_id, keyword, location_data)
             print(f"✅ Added '{keyword}' -> {location_data['name']}")
         except Exception as e:
             print(f"❌ Failed to add '{keyword}': {str(e)}")
@@ -61,4 +62,4 @@ def add_test_keywords():
     print("- 'Take me home after work'")
 
 if __name__ == "__main__":
-    add_test_keywords()
+    asyncio.run(add_test_keywords())
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark for the scraper HTML parsing backends.
+
+Runs the Luma and blog extractors over the saved pages in
+benchmarks/fixtures with every installed backend, checks that each backend
+extracts exactly what BeautifulSoup does, and prints the time per page.
+
+    cd server && python -m benchmarks.bench_html_parser [--repeat 50]
+"""
+import argparse
+import os
+import time
+
+from services import html_parser
+from services.luma_scraper import _parse_luma_events, _scrape_blog_events
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# fixture file -> extractor used on it in production
+CASES = [
+    ("luma_search.html", _parse_luma_events),
+    ("event_blog.html", _scrape_blog_events),
+]
+
+
+def _time_per_call_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on saved pages")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    backends = html_parser.available_backends()
+    print(f"Backends: {', '.join(backends)}\n")
+
+    for filename, extract in CASES:
+        with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+            content = f.read()
+
+        expected = extract(content, "Waterloo", "bs4")
+        baseline_ms = None
+        print(f"{filename} ({len(content) / 1024:.0f} KB, {len(expected)} events)")
+        for backend in reversed(backends):  # bs4 first, as the baseline
+            events = extract(content, "Waterloo", backend)
+            status = "ok" if events == expected else "MISMATCH"
+            ms = _time_per_call_ms(lambda: extract(content, "Waterloo", backend), args.repeat)
+            if baseline_ms is None:
+                baseline_ms = ms
+            print(f"  {backend:<11} {ms:8.2f} ms/page  {baseline_ms / ms:5.1f}x  {status}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
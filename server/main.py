@@ -16,6 +16,11 @@ import datetime
 import uvicorn
 from routers import plan_route_audio, sidequest, user_profile, cohere_rag_experimental
 from services import google_places  # ← now this sees the env var loaded above
+from services import http_client
+from services import mongo
+from services.cache import cache_stats
+from services.circuit_breaker import breaker_states
+from services.luma_scraper import get_structuring_stats
 
 app = FastAPI(
     title="Rouvia API",
@@ -56,6 +61,22 @@ async def health_check():
     }
 
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_client.aclose()
+    http_client.close()
+
+
+@app.on_event("startup")
+async def create_mongo_indexes():
+    await mongo.ensure_indexes()
+
+
+@app.on_event("shutdown")
+async def close_mongo_client():
+    mongo.close()
+
+
 app.include_router(plan_route_audio.router, prefix="", tags=["plan_route"])
 app.include_router(sidequest.router, prefix="", tags=["sidequest"])
 app.include_router(user_profile.router, prefix="", tags=["user_profile"])
@@ -82,5 +103,23 @@ def debug_places(intent: DebugIntent):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/debug/cache-stats", tags=["debug"])
+def debug_cache_stats():
+    """Hit/miss/eviction counters for every named cache."""
+    return cache_stats()
+
+
+@app.get("/debug/event-structuring-stats", tags=["debug"])
+def debug_event_structuring_stats():
+    """How many scraped events the rules and Cohere tiers have structured."""
+    return get_structuring_stats()
+
+
+@app.get("/debug/circuit-breakers", tags=["debug"])
+def debug_circuit_breakers():
+    """State and consecutive failures of every circuit breaker."""
+    return breaker_states()
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
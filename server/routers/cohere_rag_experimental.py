@@ -38,7 +38,7 @@ async def parse_text_with_rag(request: RAGParseRequest):
     and match it against their personal location keyword database.
     """
     try:
-        result = parse_user_text_with_rag(
+        result = await parse_user_text_with_rag(
             user_text=request.user_text,
             auth0_user_id=request.auth0_user_id,
             context_location=request.context_location
@@ -68,7 +68,7 @@ async def get_user_keyword_stats(auth0_user_id: str):
     and recent additions for analysis and debugging.
     """
     try:
-        stats = get_user_location_keywords_stats(auth0_user_id)
+        stats = await get_user_location_keywords_stats(auth0_user_id)
         
         return UserStatsResponse(
             total_keywords=stats.get("total_keywords", 0),
@@ -94,7 +94,7 @@ async def compare_rag_vs_current(request: RAGParseRequest):
     """
     try:
         # Get RAG results
-        rag_result = parse_user_text_with_rag(
+        rag_result = await parse_user_text_with_rag(
             user_text=request.user_text,
             auth0_user_id=request.auth0_user_id,
             context_location=request.context_location
@@ -179,7 +179,7 @@ async def test_with_sample_keywords():
         }
         
         # Add test keywords to user profile (this would normally be done through the user profile API)
-        from services.user_profile_service import user_profiles_col
+        from services.mongo import user_profiles_collection
         from datetime import datetime
         
         # Create or update test user
@@ -191,7 +191,7 @@ async def test_with_sample_keywords():
             "last_updated": datetime.now().isoformat()
         }
         
-        user_profiles_col.update_one(
+        await user_profiles_collection().update_one(
             {"auth0_user_id": test_user_id},
             {"$set": test_user},
             upsert=True
@@ -208,7 +208,7 @@ async def test_with_sample_keywords():
         
         results = []
         for text in test_texts:
-            result = parse_user_text_with_rag(text, test_user_id)
+            result = await parse_user_text_with_rag(text, test_user_id)
             results.append({
                 "input_text": text,
                 "matched_keywords": result.get("matched_keywords", []),
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 
 from schemas.plan_route_audio import PlanRouteAudioResponse
 from services import speech_to_text, llm_service, google_places
+from services.concurrency import run_blocking
 
 router = APIRouter()
 
@@ -67,11 +68,17 @@ def _build_places_intent(
     }
 
 
-def _pipeline_from_text(
+def _save_upload(audio: UploadFile, saved_path: str) -> None:
+    with open(saved_path, "wb") as f:
+        shutil.copyfileobj(audio.file, f)
+
+
+async def _pipeline_from_text(
     text: str, lat: Optional[float], lng: Optional[float], user_id: Optional[str] = None
 ) -> PlanRouteAudioResponse:
     """
     Shared pipeline: parse intent -> search places -> select stops -> build response.
+    Blocking LLM calls run on the shared blocking pool so the event loop stays free.
     """
     starting_location = (
         f"latitude:{lat},longitude:{lng}"
@@ -81,17 +88,24 @@ def _pipeline_from_text(
 
     print(f"🔄 Pipeline starting with user_id: {user_id}")
 
+    # 1) Load the user's keywords once for both LLM steps
+    user_context = await llm_service.load_user_context(user_id) if user_id else {}
+
     # 2) LLM parse intent with user_id for keyword resolution
-    intent = llm_service.parse_intent(starting_location, text, user_id)
+    intent = await run_blocking(
+        llm_service.parse_intent, starting_location, text, user_id, user_context
+    )
 
     # 3) Places intent
     places_intent = _build_places_intent(intent, lat, lng)
 
     # 4) Google Places candidates
-    candidates = google_places.search(places_intent)
+    candidates = await google_places.search_async(places_intent)
 
     # 5) LLM selects actual stops with user_id for personalized preferences
-    stops = llm_service.select_stops(intent, candidates, user_id)
+    stops = await run_blocking(
+        llm_service.select_stops, intent, candidates, user_id, user_context
+    )
 
     # 6) Response
     return PlanRouteAudioResponse(
@@ -136,8 +150,7 @@ async def plan_route_audio(
         saved_path = os.path.join(AUDIO_FILES_DIR, saved_name)
         
         print(f"💾 Saving to path: {saved_path}")
-        with open(saved_path, "wb") as f:
-            shutil.copyfileobj(audio.file, f)
+        await run_blocking(_save_upload, audio, saved_path)
         
         print(f"✅ File saved successfully")
         print(f"📊 File size: {os.path.getsize(saved_path)} bytes")
@@ -147,12 +160,12 @@ async def plan_route_audio(
         
         # 3) Transcribe
         print(f"🎤 Starting transcription...")
-        text = speech_to_text.transcribe(audio)
+        text = await run_blocking(speech_to_text.transcribe, audio)
         print(f"📝 Transcription complete: {text}")
 
         # 4) Run the pipeline with user_id
         print(f"🔄 Starting pipeline with user_id: {user_id}")
-        result = _pipeline_from_text(text=text, lat=lat, lng=lng, user_id=user_id)
+        result = await _pipeline_from_text(text=text, lat=lat, lng=lng, user_id=user_id)
         print(f"✅ Pipeline complete")
         return result
     except HTTPException:
@@ -192,7 +205,7 @@ async def plan_route_text(payload: PlanRouteTextRequest):
             lat = float(lat) if lat is not None else None
             lng = float(lng) if lng is not None else None
 
-        return _pipeline_from_text(text=payload.text, lat=lat, lng=lng, user_id=payload.user_id)
+        return await _pipeline_from_text(text=payload.text, lat=lat, lng=lng, user_id=payload.user_id)
 
     except HTTPException:
         raise
@@ -21,6 +21,8 @@ async def get_sidequests(request: SidequestRequest):
         interests=request.interests,
         energy=request.energy,
         indoor_outdoor=request.indoor_outdoor,
-        user_id=request.user_id
+        user_id=request.user_id,
+        plan_date=request.plan_date,
+        timezone_name=request.timezone
     )
     return results
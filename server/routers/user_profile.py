@@ -47,7 +47,7 @@ async def create_or_update_profile(user_data: Auth0UserData):
     Create or update user profile from Auth0 data
     """
     try:
-        profile = create_or_update_auth0_user_profile(
+        profile = await create_or_update_auth0_user_profile(
             auth0_user_id=user_data.auth0_user_id,
             email=user_data.email,
             name=user_data.name,
@@ -77,7 +77,7 @@ async def get_profile(auth0_user_id: str):
     Get user profile by Auth0 user ID
     """
     try:
-        profile = get_user_profile_by_auth0_id(auth0_user_id)
+        profile = await get_user_profile_by_auth0_id(auth0_user_id)
         
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
@@ -119,7 +119,7 @@ async def add_keyword(auth0_user_id: str, request: KeywordLocationRequest):
             "place_id": request.location.place_id
         }
         
-        add_keyword_location(auth0_user_id, request.keyword, location_data)
+        await add_keyword_location(auth0_user_id, request.keyword, location_data)
         
         return {
             "success": True,
@@ -136,7 +136,7 @@ async def get_keywords(auth0_user_id: str):
     Get all keyword mappings for a user
     """
     try:
-        keywords = get_user_keywords(auth0_user_id)
+        keywords = await get_user_keywords(auth0_user_id)
         
         return {
             "success": True,
@@ -151,7 +151,7 @@ async def remove_keyword(auth0_user_id: str, keyword: str):
     Remove a keyword mapping
     """
     try:
-        delete_keyword(auth0_user_id, keyword)
+        await delete_keyword(auth0_user_id, keyword)
         
         return {
             "success": True,
@@ -166,7 +166,7 @@ async def get_keyword(auth0_user_id: str, keyword: str):
     Get a specific keyword mapping
     """
     try:
-        keywords = get_user_keywords(auth0_user_id)
+        keywords = await get_user_keywords(auth0_user_id)
         
         if keyword not in keywords:
             raise HTTPException(status_code=404, detail=f"Keyword '{keyword}' not found")
@@ -187,7 +187,7 @@ async def migrate_keywords():
     Migration endpoint to add keywords field to existing users
     """
     try:
-        migrated_count = migrate_existing_users_add_keywords()
+        migrated_count = await migrate_existing_users_add_keywords()
         
         return {
             "success": True,
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 # Standardized interest categories
 INTEREST_CATEGORIES = [
@@ -21,6 +21,8 @@ class SidequestRequest(BaseModel):
     energy: int = 5
     indoor_outdoor: Optional[str] = None  # "indoor", "outdoor", or None
     user_id: Optional[str] = None  # For tracking visited places
+    plan_date: Optional[date] = None  # Day being planned, e.g. "2025-10-05"; default: today for the user
+    timezone: Optional[str] = None  # IANA name, e.g. "America/Toronto"; default: the city's at lat/lon
 
 class SidequestActivity(BaseModel):
     title: str
@@ -1,39 +1,66 @@
 import os
 import asyncio
-import requests
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from services import http_client
+from services.activity_sources import ActivitySource, stream_sources
+from services.city_resolver import city_resolver
+from services.concurrency import run_blocking
+from services import event_index
+from services.places_cache import places_cache, places_cache_key
 from services.luma_scraper import fetch_luma_events, fetch_local_blog_events
 from services.scoring_service import activity_scorer
+from services.ranking import top_k
 from services.enhanced_scraper import trendiness_checker
 
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_CLOUD_API_KEY")
 EVENTBRITE_API_KEY = os.getenv("EVENTBRITE_API_KEY")
 
+# fetch_google_places runs its city text searches on a bounded worker pool
+# and returns whatever has finished when the deadline passes
+CITY_SEARCH_WORKERS = int(os.getenv("CITY_SEARCH_WORKERS", "5"))
+CITY_SEARCH_DEADLINE_S = float(os.getenv("CITY_SEARCH_DEADLINE_S", "8"))
+_city_search_pool = ThreadPoolExecutor(max_workers=CITY_SEARCH_WORKERS, thread_name_prefix="city-search")
+
+# Per-source timeouts for fetch_all_activities, plus how many candidates are enhanced at once
+GOOGLE_PLACES_SOURCE_TIMEOUT_S = float(os.getenv("GOOGLE_PLACES_SOURCE_TIMEOUT_S", "10"))
+EVENTBRITE_SOURCE_TIMEOUT_S = float(os.getenv("EVENTBRITE_SOURCE_TIMEOUT_S", "8"))
+LUMA_SOURCE_TIMEOUT_S = float(os.getenv("LUMA_SOURCE_TIMEOUT_S", "15"))
+BLOG_SOURCE_TIMEOUT_S = float(os.getenv("BLOG_SOURCE_TIMEOUT_S", "15"))
+ENHANCE_CONCURRENCY = int(os.getenv("ENHANCE_CONCURRENCY", "8"))
+
+# By default fetch_activities_with_scoring returns at most this many candidates
+# per interest, the number it fetches per interest (0 = return all of them)
+SCORED_CANDIDATES_PER_INTEREST = int(os.getenv("SCORED_CANDIDATES_PER_INTEREST", "20"))
+
+# Event sources are read from the crawler's event index when it was refreshed
+# within EVENT_INDEX_MAX_AGE_S; otherwise they're scraped live unless the
+# fallback is switched off (e.g. when services.event_crawler always runs)
+EVENT_INDEX_MAX_AGE_S = float(os.getenv("EVENT_INDEX_MAX_AGE_S", "3600"))
+EVENT_INDEX_LIVE_FALLBACK = os.getenv("EVENT_INDEX_LIVE_FALLBACK", "true").lower() == "true"
+
+# Fields requested from searchNearby; opening hours feed the itinerary scheduler
+NEARBY_FIELD_MASK = (
+    "places.displayName,places.location,places.rating,places.types,"
+    "places.priceLevel,places.id,places.currentOpeningHours"
+)
+
 
 
 def get_city_from_latlon(lat, lon):
     """
-    Given latitude and longitude, return the city name using Google Geocoding API.
-    If it fails, fallback to 'Waterloo'.
+    Given latitude and longitude, return the city name.
+    Resolved from the local cache and bundled gazetteer first, then the
+    Google Geocoding API. If it fails, fallback to 'Waterloo'.
     """
     try:
-        url = f"https://maps.googleapis.com/maps/api/geocode/json?latlng={lat},{lon}&key={GOOGLE_API_KEY}"
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
-
-        if not data.get("results"):
-            print("[Sidequest] No geocoding results, using fallback city 'Waterloo'")
-            return "Waterloo"
+        city = city_resolver.resolve(lat, lon)
+        if city:
+            return city
 
-        # Look for the 'locality' component
-        for component in data["results"][0].get("address_components", []):
-            if "locality" in component.get("types", []):
-                return component["long_name"]
-
-        # fallback if no locality
-        print("[Sidequest] Could not determine city from results, using fallback 'Waterloo'")
+        print("[Sidequest] Could not determine city, using fallback 'Waterloo'")
         return "Waterloo"
 
     except Exception as e:
@@ -49,7 +76,7 @@ async def fetch_eventbrite_events(lat, lon, radius_km=5):
     url = f"https://www.eventbriteapi.com/v3/events/search/?location.latitude={lat}&location.longitude={lon}&location.within={radius_km}km"
     headers = {"Authorization": f"Bearer {EVENTBRITE_API_KEY}"}
     try:
-        res = requests.get(url, headers=headers, timeout=5)
+        res = await http_client.aget(url, headers=headers)
         res.raise_for_status()
         data = res.json()
         events = []
@@ -129,8 +156,6 @@ def fetch_google_places(lat, lon):
         city = get_city_from_latlon(lat, lon)
         print(f"[Google Places] Searching in city: {city}")
         
-        activities = []
-        
         # Define search queries for different activity types
         search_queries = [
             f"restaurants in {city}",
@@ -145,66 +170,21 @@ def fetch_google_places(lat, lon):
             f"indoor activities in {city}"
         ]
         
-        for query in search_queries:
-            try:
-                # Use NEW Places API (Text Search)
-                url = "https://places.googleapis.com/v1/places:searchText"
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Goog-Api-Key": GOOGLE_API_KEY,
-                    "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.types,places.priceLevel,places.currentOpeningHours"
-                }
-                
-                payload = {
-                    "textQuery": query,
-                    "locationBias": {
-                        "circle": {
-                            "center": {"latitude": lat, "longitude": lon},
-                            "radius": 5000.0  # 5km radius
-                        }
-                    },
-                    "maxResultCount": 10
-                }
-                
-                response = requests.post(url, headers=headers, json=payload, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                print(f"[Google Places] Query '{query}' returned {len(data.get('places', []))} results")
-                
-                for place in data.get("places", []):
-                    structured_place = _structure_new_google_place(place, city)
-                    if structured_place:
-                        activities.append(structured_place)
-                
-            except Exception as e:
-                print(f"[Google Places] Error fetching for query '{query}': {e}")
-                # Fallback to legacy API if new API fails
-                try:
-                    legacy_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-                    legacy_params = {
-                        "query": query,
-                        "key": GOOGLE_API_KEY,
-                        "fields": "place_id,name,formatted_address,geometry,rating,types,price_level",
-                        "location": f"{lat},{lon}",
-                        "radius": 5000
-                    }
-                    
-                    legacy_response = requests.get(legacy_url, params=legacy_params, timeout=10)
-                    legacy_response.raise_for_status()
-                    legacy_data = legacy_response.json()
-                    
-                    if legacy_data.get("status") == "OK":
-                        for place in legacy_data.get("results", []):
-                            structured_place = _structure_google_place(place, city)
-                            if structured_place:
-                                activities.append(structured_place)
-                    else:
-                        print(f"[Google Places] Legacy API also failed: {legacy_data.get('status')}")
-                        
-                except Exception as legacy_e:
-                    print(f"[Google Places] Legacy API fallback also failed: {legacy_e}")
-                continue
+        # Run all queries at once; keep whatever has finished by the deadline
+        futures = [
+            _city_search_pool.submit(_fetch_city_query, query, lat, lon, city)
+            for query in search_queries
+        ]
+        done, not_done = wait(futures, timeout=CITY_SEARCH_DEADLINE_S)
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            print(f"[Google Places] Deadline of {CITY_SEARCH_DEADLINE_S}s reached, {len(not_done)}/{len(futures)} queries still pending, returning partial results")
+        
+        activities = []
+        for future in futures:  # query order, not completion order
+            if future in done and not future.cancelled():
+                activities.extend(future.result())
         
         print(f"[Google Places] Found {len(activities)} total activities")
         
@@ -219,6 +199,70 @@ def fetch_google_places(lat, lon):
         print(f"[Google Places] Critical error: {e}")
         return _get_fallback_activities(lat, lon)
 
+def _fetch_city_query(query, lat, lon, city):
+    """Run one city text search, falling back to the legacy API on failure."""
+    activities = []
+    try:
+        # Use NEW Places API (Text Search)
+        url = "https://places.googleapis.com/v1/places:searchText"
+        headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": GOOGLE_API_KEY,
+            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.types,places.priceLevel,places.currentOpeningHours"
+        }
+        
+        payload = {
+            "textQuery": query,
+            "locationBias": {
+                "circle": {
+                    "center": {"latitude": lat, "longitude": lon},
+                    "radius": 5000.0  # 5km radius
+                }
+            },
+            "maxResultCount": 10
+        }
+        
+        response = http_client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        
+        print(f"[Google Places] Query '{query}' returned {len(data.get('places', []))} results")
+        
+        for place in data.get("places", []):
+            structured_place = _structure_new_google_place(place, city)
+            if structured_place:
+                activities.append(structured_place)
+        
+    except Exception as e:
+        print(f"[Google Places] Error fetching for query '{query}': {e}")
+        # Fallback to legacy API if new API fails
+        try:
+            legacy_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+            legacy_params = {
+                "query": query,
+                "key": GOOGLE_API_KEY,
+                "fields": "place_id,name,formatted_address,geometry,rating,types,price_level",
+                "location": f"{lat},{lon}",
+                "radius": 5000
+            }
+            
+            legacy_response = http_client.get(legacy_url, params=legacy_params)
+            legacy_response.raise_for_status()
+            legacy_data = legacy_response.json()
+            
+            if legacy_data.get("status") == "OK":
+                for place in legacy_data.get("results", []):
+                    structured_place = _structure_google_place(place, city)
+                    if structured_place:
+                        activities.append(structured_place)
+            else:
+                print(f"[Google Places] Legacy API also failed: {legacy_data.get('status')}")
+                
+        except Exception as legacy_e:
+            print(f"[Google Places] Legacy API fallback also failed: {legacy_e}")
+    
+    return activities
+
 def _structure_new_google_place(place, city):
     """
     Structure a NEW Google Places API result into our activity format
@@ -275,7 +319,8 @@ def _structure_new_google_place(place, city):
             "activity_type": activity_type,
             "indoor_outdoor": indoor_outdoor,
             "energy_level": energy_level,
-            "confidence": confidence
+            "confidence": confidence,
+            "opening_hours": (place.get("currentOpeningHours") or {}).get("periods")
         }
         
         print(f"[Google Places] Structured (NEW API): {name} -> {activity_type} ({indoor_outdoor}, lat:{lat}, lon:{lon})")
@@ -574,58 +619,81 @@ def _get_fallback_activities(lat, lon):
     return fallback_activities
 
 
+def _google_places_source(city, lat, lon):
+    if not city:
+        print("[Activity Service] Could not determine city. Skipping Google sources.")
+        return []
+    return fetch_google_places(lat, lon)
+
+async def _eventbrite_source(city, lat, lon):
+    return await fetch_eventbrite_events(lat, lon, radius_km=5)
+
+# Sources queried by fetch_all_activities; results are listed in this order
+ACTIVITY_SOURCES = [
+    ActivitySource("google_places", _google_places_source, GOOGLE_PLACES_SOURCE_TIMEOUT_S),
+    ActivitySource("eventbrite", _eventbrite_source, EVENTBRITE_SOURCE_TIMEOUT_S),
+    ActivitySource("luma", fetch_luma_events, LUMA_SOURCE_TIMEOUT_S),
+    ActivitySource("local_blogs", fetch_local_blog_events, BLOG_SOURCE_TIMEOUT_S),
+]
+
+# Sources kept warm per city by services.event_crawler
+EVENT_SOURCES = [source for source in ACTIVITY_SOURCES if source.name != "google_places"]
+
+def _from_event_index(source):
+    """Wrap an event source so it reads the crawler's event index first."""
+    async def fetch(city, lat, lon):
+        try:
+            events = await event_index.load_events(city, source.name, EVENT_INDEX_MAX_AGE_S)
+        except Exception as e:
+            print(f"[Activity Service] Event index read failed for {source.name}: {e}")
+            events = None
+        if events is not None:
+            print(f"[Activity Service] Using {len(events)} indexed {source.name} events for {city}")
+            return events
+        if not EVENT_INDEX_LIVE_FALLBACK:
+            print(f"[Activity Service] No fresh {source.name} events indexed for {city}, skipping")
+            return []
+        return await source.run(city, lat, lon)
+
+    return ActivitySource(source.name, fetch, source.timeout_s)
+
 async def fetch_all_activities(lat, lon):
-    """Fetch all activities safely with comprehensive logging."""
+    """
+    Fetch all activities safely with comprehensive logging.
+    All sources run concurrently, each under its own timeout and circuit breaker,
+    and candidates are enhanced as soon as their source returns. Event sources
+    come from the background crawler's event index while it is fresh.
+    """
     print(f"[Activity Service] Starting fetch_all_activities for lat={lat}, lon={lon}")
-    candidates = []
 
     # Get city name
     city = get_city_from_latlon(lat, lon)
     print(f"[Activity Service] Determined city: {city}")
 
-    # Fetch from Google Places
-    if city:
-        print("[Activity Service] Fetching from Google Places...")
-        google_activities = fetch_google_places(lat, lon)
-        candidates.extend(google_activities)
-        print(f"[Activity Service] Google Places returned {len(google_activities)} activities")
-    else:
-        print("[Activity Service] Could not determine city. Skipping Google sources.")
-
-    # Fetch from Eventbrite (optional)
-    print("[Activity Service] Fetching from Eventbrite...")
-    eventbrite_activities = await fetch_eventbrite_events(lat, lon, radius_km=5)
-    candidates.extend(eventbrite_activities)
-    print(f"[Activity Service] Eventbrite returned {len(eventbrite_activities)} activities")
+    # Enhance ALL activities with better scraping using Cohere
+    # This addresses the $25 issue by using Cohere multimodal analysis for realistic pricing
+    enhance_slots = asyncio.Semaphore(ENHANCE_CONCURRENCY)
 
-    # Fetch from Luma (real event data)
-    print("[Activity Service] Fetching from Luma...")
-    luma_activities = fetch_luma_events(city, lat, lon)
-    candidates.extend(luma_activities)
-    print(f"[Activity Service] Luma returned {len(luma_activities)} activities")
+    async def enhance(candidate):
+        async with enhance_slots:
+            return await enhance_place_data_with_scraper(candidate)
 
-    # Fetch from local blogs (real event data)
-    print("[Activity Service] Fetching from local blogs...")
-    blog_activities = fetch_local_blog_events(city, lat, lon)
-    candidates.extend(blog_activities)
-    print(f"[Activity Service] Local blogs returned {len(blog_activities)} activities")
+    sources = [_from_event_index(source) if source in EVENT_SOURCES else source for source in ACTIVITY_SOURCES]
+    source_order = {source.name: i for i, source in enumerate(sources)}
+    enhancement_tasks = []
+    async for source, activities in stream_sources(sources, city, lat, lon):
+        print(f"[Activity Service] Enhancing {len(activities)} activities from {source.name}...")
+        enhancement_tasks.append(
+            (source_order[source.name], [asyncio.create_task(enhance(candidate)) for candidate in activities])
+        )
 
-    print(f"[Activity Service] Total candidates found: {len(candidates)}")
-    
-    # Enhance ALL activities with better scraping using Cohere
-    # This addresses the $25 issue by using Cohere multimodal analysis for realistic pricing
+    # Keep the candidate list in source order, regardless of which finished first
+    enhancement_tasks.sort(key=lambda entry: entry[0])
     enhanced_candidates = []
-    
-    print(f"[Activity Service] Enhancing ALL {len(candidates)} activities with Cohere analysis...")
-    
-    for i, candidate in enumerate(candidates):
-        # Use enhanced scraper for ALL activities to get realistic pricing
-        enhanced_candidate = await enhance_place_data_with_scraper(candidate)
-        enhanced_candidates.append(enhanced_candidate)
-        
-        # Log progress every 10 activities
-        if (i + 1) % 10 == 0:
-            print(f"[Activity Service] Enhanced {i + 1}/{len(candidates)} activities...")
+    for _, tasks in enhancement_tasks:
+        enhanced_candidates.extend(await asyncio.gather(*tasks))
+
+    print(f"[Activity Service] Total candidates found: {len(enhanced_candidates)}")
     
     # Log summary of activity types and costs
     activity_types = {}
@@ -643,23 +711,21 @@ async def fetch_all_activities(lat, lon):
 
     return enhanced_candidates
 
-async def fetch_activities_with_scoring(lat: float, lon: float, interests: list, budget: float, travel_distance: float = 5):
+async def fetch_activities_with_scoring(lat: float, lon: float, interests: list, budget: float, travel_distance: float = 5,
+                                        limit: Optional[int] = None):
     """
     OPTIMIZED APPROACH: Get 20 places per interest, then select best ones.
     Phase 1: Get 20 places per interest from Google Places (reliable approach)
     Phase 2: Calculate base scores (fast, no API calls)
     Phase 3: Check trendiness for top candidates only (selective Cohere)
-    Phase 4: Return best weighted combination
+    Phase 4: Return best weighted combination (the best `limit`, 0 for all
+             of them; by default SCORED_CANDIDATES_PER_INTEREST per interest)
     """
     print(f"[Activity Service] OPTIMIZED APPROACH: Fetching 20 places per interest")
     
-    # Phase 1: Get activities per interest (reliable approach)
-    all_activities = []
-    
-    for interest in interests:
-        print(f"[Activity Service] Fetching places for interest: {interest}")
-        interest_activities = fetch_google_places_by_interest(lat, lon, interest, limit=20)
-        all_activities.extend(interest_activities)
+    # Phase 1: Get activities per interest, sending each distinct request once
+    print(f"[Activity Service] Fetching places for interests: {interests}")
+    all_activities = await fetch_google_places_for_interests(lat, lon, interests or [], limit=20)
     
     print(f"[Activity Service] Phase 1 complete: {len(all_activities)} total activities")
     
@@ -672,30 +738,24 @@ async def fetch_activities_with_scoring(lat: float, lon: float, interests: list,
     top_candidates = activity_scorer.select_top_candidates(scored_activities, per_category=2)  # Reduced from 5 to 2
     print(f"[Activity Service] Phase 2 complete: {len(top_candidates)} candidates for trendiness check")
     
-    # Phase 4: Check trendiness for top candidates only (with timeout)
-    trendiness_data = {}
-    for candidate in top_candidates:
-        place_name = candidate.get("name", "")
-        location = candidate.get("location", "")
-        try:
-            # Add timeout to prevent hanging
-            trendiness = await asyncio.wait_for(
-                trendiness_checker.check_trendiness(place_name, location), 
-                timeout=5.0  # 5 second timeout
-            )
-            trendiness_data[place_name.lower()] = trendiness
-        except asyncio.TimeoutError:
-            print(f"[Activity Service] Trendiness check timeout for {place_name}, using default score")
-            trendiness_data[place_name.lower()] = 0.5  # Default neutral score
-        except Exception as e:
-            print(f"[Activity Service] Trendiness check error for {place_name}: {e}, using default score")
-            trendiness_data[place_name.lower()] = 0.5  # Default neutral score
+    # Phase 4: Check trendiness for top candidates only, in one batched call with a deadline
+    try:
+        trendiness_data = await trendiness_checker.check_trendiness_batch(
+            [(candidate.get("name", ""), candidate.get("location", "")) for candidate in top_candidates]
+        )
+    except Exception as e:
+        print(f"[Activity Service] Trendiness check error: {e}, using default scores")
+        trendiness_data = {}
     
     # Phase 5: Apply trendiness boost and get final scores
     final_activities = activity_scorer.apply_trendiness_boost(scored_activities, trendiness_data)
     
-    # Sort by final score and return
-    final_activities.sort(key=lambda x: x["final_score"], reverse=True)
+    # Select the best by final score (bounded heap, no full sort of the pool)
+    if limit is None and SCORED_CANDIDATES_PER_INTEREST > 0:
+        limit = SCORED_CANDIDATES_PER_INTEREST * max(1, len(interests or []))
+    elif limit == 0:
+        limit = None  # no cap, like SCORED_CANDIDATES_PER_INTEREST=0
+    final_activities = top_k(final_activities, limit, key=lambda x: x["final_score"])
     
     print(f"[Activity Service] NEW APPROACH complete: {len(final_activities)} activities with final scores")
     return final_activities
@@ -728,7 +788,7 @@ def fetch_nearby_places_bulk(lat: float, lon: float, limit: int = 100):
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": GOOGLE_API_KEY,
-            "X-Goog-FieldMask": "places.displayName,places.location,places.rating,places.types,places.priceLevel,places.id"
+            "X-Goog-FieldMask": NEARBY_FIELD_MASK
         }
         data = {
             "locationRestriction": {
@@ -743,7 +803,7 @@ def fetch_nearby_places_bulk(lat: float, lon: float, limit: int = 100):
             "maxResultCount": min(limit, 20)  # searchNearby has a max limit of 20
         }
         
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = http_client.post(url, headers=headers, json=data)
         
         if response.status_code != 200:
             print(f"[Google Places] Bulk API Error {response.status_code}: {response.text}")
@@ -774,76 +834,166 @@ def fetch_nearby_places_bulk(lat: float, lon: float, limit: int = 100):
         print(f"[Google Places] Error in bulk fetch: {e}")
         return []
 
+def _search_nearby(lat: float, lon: float, max_results: int, included_types: tuple = ()) -> dict:
+    """
+    POST a searchNearby request (5 km circle, optionally restricted to
+    `included_types`). Responses are cached per geohash tile, so nearby
+    requests reuse the same result.
+    """
+    url = "https://places.googleapis.com/v1/places:searchNearby"
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLE_API_KEY,
+        "X-Goog-FieldMask": NEARBY_FIELD_MASK
+    }
+    data = {
+        "locationRestriction": {
+            "circle": {
+                "center": {
+                    "latitude": lat,
+                    "longitude": lon
+                },
+                "radius": 5000.0  # 5km radius in meters
+            }
+        },
+        "maxResultCount": min(max_results, 20)  # searchNearby has a max limit of 20
+    }
+    if included_types:
+        data["includedTypes"] = list(included_types)
+
+    def fetch():
+        response = http_client.post(url, headers=headers, json=data)
+        response.raise_for_status()
+        print(f"[Google Places] API Response status: {response.status_code}")
+        return response.json()
+
+    # The field mask is part of the key, so responses cached with fewer fields aren't reused
+    query = f"max={data['maxResultCount']} types={','.join(included_types)} fields={NEARBY_FIELD_MASK}"
+    key = places_cache_key("searchNearby", query, lat, lon, 5000.0)
+    return places_cache.get_or_fetch(key, fetch)
+
 def fetch_google_places_by_interest(lat: float, lon: float, interest: str, limit: int = 15):
     """Fetch Google Places activities for a specific interest category"""
     try:
         # Use the new Places API (New) format
-        url = "https://places.googleapis.com/v1/places:searchNearby"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": GOOGLE_API_KEY,
-            "X-Goog-FieldMask": "places.displayName,places.location,places.rating,places.types,places.priceLevel,places.id"
-        }
-        data = {
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": lat,
-                        "longitude": lon
-                    },
-                    "radius": 5000.0  # 5km radius in meters
-                }
-            },
-            "maxResultCount": min(limit, 20)  # searchNearby has a max limit of 20
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        api_data = response.json()
+        api_data = _search_nearby(lat, lon, limit)
         
-        print(f"[Google Places] API Response status: {response.status_code}")
         print(f"[Google Places] API Response places count: {len(api_data.get('places', []))}")
         
-        activities = []
         places = api_data.get("places", [])
         
         # Filter places by interest after getting results
         filtered_places = _filter_places_by_interest(places, interest)
-        
-        for place in filtered_places[:limit]:
-            structured_activity = _structure_google_place_new_api(place, interest, interest)
-            if structured_activity:
-                # Wrap in the format expected by scoring service
-                activity = {
-                    "structured": structured_activity,
-                    "raw_name": structured_activity.get("name", ""),
-                    "place_id": structured_activity.get("place_id", "")
-                }
-                activities.append(activity)
-        
-        print(f"[Google Places] Found {len(activities)} places for {interest}")
-        return activities
+        return _structure_places_for_interest(filtered_places, interest, limit)
         
     except Exception as e:
         print(f"[Google Places] Error fetching {interest}: {e}")
         return []
 
+def _structure_places_for_interest(filtered_places: list, interest: str, limit: int) -> list:
+    """Structure filtered searchNearby places into scoring-service activities"""
+    activities = []
+    for place in filtered_places[:limit]:
+        structured_activity = _structure_google_place_new_api(place, interest, interest)
+        if structured_activity:
+            # Wrap in the format expected by scoring service
+            activity = {
+                "structured": structured_activity,
+                "raw_name": structured_activity.get("name", ""),
+                "place_id": structured_activity.get("place_id", "")
+            }
+            activities.append(activity)
+    
+    print(f"[Google Places] Found {len(activities)} places for {interest}")
+    return activities
+
+async def fetch_google_places_for_interests(lat: float, lon: float, interests: list, limit: int = 20) -> list:
+    """
+    Fetch planner for a whole sidequest: each distinct upstream searchNearby
+    request is sent once and its results fanned out to every interest filter.
+
+    All interests share one unrestricted request (the body is identical for
+    every interest). An interest whose types do not appear in that result
+    gets a type-restricted request instead (includedTypes), which does return
+    different places; interests with the same type set share that request.
+    """
+    try:
+        shared = await run_blocking(_search_nearby, lat, lon, limit)
+        shared_places = shared.get("places", [])
+    except Exception as e:
+        print(f"[Google Places] Shared nearby search failed: {e}")
+        shared_places = []
+    print(f"[Google Places] Shared nearby search returned {len(shared_places)} places")
+
+    # Plan one restricted request per distinct type set that needs it
+    restricted_requests = {}
+    for interest in dict.fromkeys(interests):
+        included_types = tuple(NEARBY_INCLUDED_TYPES.get(interest, ()))
+        if included_types and not _has_interest_type_match(shared_places, interest):
+            restricted_requests.setdefault(included_types, []).append(interest)
+
+    print(f"[Google Places] Fetch plan: 1 shared + {len(restricted_requests)} type-restricted requests for {len(interests)} interests")
+
+    async def fetch_restricted(included_types):
+        try:
+            data = await run_blocking(_search_nearby, lat, lon, limit, included_types)
+            return data.get("places", [])
+        except Exception as e:
+            print(f"[Google Places] Type-restricted search {included_types} failed: {e}")
+            return []
+
+    restricted_results = await asyncio.gather(
+        *(fetch_restricted(types) for types in restricted_requests)
+    )
+    places_by_interest = {}
+    for included_types, places in zip(restricted_requests, restricted_results):
+        for interest in restricted_requests[included_types]:
+            if places:
+                places_by_interest[interest] = places
+
+    activities = []
+    for interest in interests:
+        places = places_by_interest.get(interest, shared_places)
+        filtered_places = _filter_places_by_interest(places, interest)
+        activities.extend(_structure_places_for_interest(filtered_places, interest, limit))
+    return activities
+
+# Google types that count as a match for each interest
+INTEREST_TYPE_FILTERS = {
+    "meals": ["restaurant", "meal_takeaway", "meal_delivery", "food"],
+    "bites": ["cafe", "bakery", "food"],
+    "entertainment": ["movie_theater", "night_club", "bar", "amusement_park"],
+    "events": ["amusement_park", "tourist_attraction", "event_venue"],
+    "scenery": ["park", "natural_feature", "tourist_attraction", "landmark"],
+    "culture": ["museum", "art_gallery", "library", "cultural_center"],
+    "shopping": ["shopping_mall", "store", "clothing_store", "electronics_store"],
+    "physical_activity": ["gym", "sports_complex", "fitness_center", "stadium"]
+}
+
+# The subset searchNearby accepts in includedTypes (response-only types such
+# as "food", "store", "landmark" and "natural_feature" are rejected there)
+NEARBY_INCLUDED_TYPES = {
+    "meals": ["restaurant", "meal_takeaway", "meal_delivery"],
+    "bites": ["cafe", "bakery"],
+    "entertainment": ["movie_theater", "night_club", "bar", "amusement_park"],
+    "events": ["amusement_park", "tourist_attraction", "event_venue"],
+    "scenery": ["park", "tourist_attraction"],
+    "culture": ["museum", "art_gallery", "library", "cultural_center"],
+    "shopping": ["shopping_mall", "clothing_store", "electronics_store"],
+    "physical_activity": ["gym", "sports_complex", "fitness_center", "stadium"]
+}
+
+def _has_interest_type_match(places: list, interest: str) -> bool:
+    """True if any place carries one of the interest's Google types"""
+    target_types = INTEREST_TYPE_FILTERS.get(interest, [])
+    return any(
+        ptype in target_types for place in places for ptype in place.get("types", [])
+    )
+
 def _filter_places_by_interest(places: list, interest: str) -> list:
     """Filter places based on interest category using Google types"""
     
-    # Define type filters for each interest
-    interest_type_filters = {
-        "meals": ["restaurant", "meal_takeaway", "meal_delivery", "food"],
-        "bites": ["cafe", "bakery", "food"],
-        "entertainment": ["movie_theater", "night_club", "bar", "amusement_park"],
-        "events": ["amusement_park", "tourist_attraction", "event_venue"],
-        "scenery": ["park", "natural_feature", "tourist_attraction", "landmark"],
-        "culture": ["museum", "art_gallery", "library", "cultural_center"],
-        "shopping": ["shopping_mall", "store", "clothing_store", "electronics_store"],
-        "physical_activity": ["gym", "sports_complex", "fitness_center", "stadium"]
-    }
-    
-    target_types = interest_type_filters.get(interest, [])
+    target_types = INTEREST_TYPE_FILTERS.get(interest, [])
     if not target_types:
         return places  # Return all if no filter defined
     
@@ -915,7 +1065,8 @@ def _structure_google_place_bulk(place: dict) -> dict:
             "place_id": place_id,
             "raw_name": name,
             "rating": rating,
-            "types": types
+            "types": types,
+            "opening_hours": (place.get("currentOpeningHours") or {}).get("periods")
         }
         
         return structured
@@ -1012,7 +1163,8 @@ def _structure_google_place_new_api(place: dict, interest: str, search_type: str
             "place_id": place_id,
             "raw_name": name,
             "rating": rating,
-            "types": types
+            "types": types,
+            "opening_hours": (place.get("currentOpeningHours") or {}).get("periods")
         }
         
         return structured
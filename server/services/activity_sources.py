@@ -0,0 +1,68 @@
+"""
+Source plugins for activity ingestion.
+
+Each ActivitySource wraps one upstream (Google Places, Eventbrite, Luma, ...)
+with its own timeout and circuit breaker. stream_sources() runs every source
+concurrently and yields each batch of activities as soon as its source
+finishes, so total latency is bounded by the slowest healthy source.
+"""
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence, Tuple
+
+from services.circuit_breaker import get_breaker
+from services.concurrency import run_blocking
+
+
+@dataclass
+class ActivitySource:
+    name: str
+    # fetch(city, lat, lon) -> list of activities; sync functions run on the blocking pool
+    fetch: Callable[..., Any]
+    timeout_s: float
+
+    async def run(self, city: str, lat: float, lon: float) -> List[Dict[str, Any]]:
+        if inspect.iscoroutinefunction(self.fetch):
+            return await self.fetch(city, lat, lon)
+        return await run_blocking(self.fetch, city, lat, lon)
+
+
+async def _run_source(source: ActivitySource, city: str, lat: float, lon: float) -> Tuple[ActivitySource, List[Dict[str, Any]]]:
+    breaker = get_breaker(f"source:{source.name}")
+    if not breaker.allow():
+        print(f"[Activity Sources] {source.name} circuit open, skipping")
+        return source, []
+
+    try:
+        activities = await asyncio.wait_for(source.run(city, lat, lon), timeout=source.timeout_s)
+    except asyncio.CancelledError:
+        # Stopped by the consumer, not a verdict on the source
+        breaker.release_trial()
+        raise
+    except asyncio.TimeoutError:
+        print(f"[Activity Sources] {source.name} timed out after {source.timeout_s}s")
+        breaker.record_failure()
+        return source, []
+    except Exception as e:
+        print(f"[Activity Sources] {source.name} failed: {e}")
+        breaker.record_failure()
+        return source, []
+
+    breaker.record_success()
+    return source, activities or []
+
+
+async def stream_sources(
+    sources: Sequence[ActivitySource], city: str, lat: float, lon: float
+) -> AsyncIterator[Tuple[ActivitySource, List[Dict[str, Any]]]]:
+    """Run all sources at once, yielding (source, activities) in completion order."""
+    tasks = [asyncio.create_task(_run_source(source, city, lat, lon)) for source in sources]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            source, activities = await next_done
+            print(f"[Activity Sources] {source.name} returned {len(activities)} activities")
+            yield source, activities
+    finally:
+        for task in tasks:
+            task.cancel()
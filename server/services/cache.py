@@ -0,0 +1,320 @@
+"""
+Generic result caches: an in-process LRU tier with per-entry TTL, an entry
+count and memory budget, plus an optional Redis tier shared between workers
+and replicas. TieredCache puts the two together.
+
+Every named LRU cache is swept for expired entries by one background thread
+and reports hit/miss/eviction counters through cache_stats().
+"""
+import os
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+CACHE_SWEEP_INTERVAL_S = float(os.getenv("CACHE_SWEEP_INTERVAL_S", "60"))
+# Shared tier for every cache that doesn't configure its own URL
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+
+    def state(self, now: float) -> str:
+        if now < self.fresh_until:
+            return FRESH
+        if now < self.stale_until:
+            return STALE
+        return MISS
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a JSON-like value, in bytes."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class LRUTTLCache:
+    """
+    Thread-safe in-process cache. Entries are fresh for `ttl` seconds, then
+    servable as stale for `stale_ttl` more seconds. Least recently used entries
+    are evicted once the summed entry sizes exceed `max_bytes` or the entry
+    count exceeds `max_entries`.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: Optional[int] = None, name: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.name = name
+        self.total_bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        if name:
+            _register(self)
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, MISS
+            state = entry.state(now)
+            if state == MISS:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None, MISS
+            self._entries.move_to_end(key)
+            if state == FRESH:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry.value, state
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            size=estimate_size(value),
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+        )
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while self._entries and (
+                self.total_bytes > self.max_bytes
+                or (self.max_entries is not None and len(self._entries) > self.max_entries)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every entry past its stale deadline; returns how many were dropped."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.state(now) == MISS]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+
+
+class RedisCacheTier:
+    """
+    Shared cache tier backed by Redis. Values are stored as JSON together
+    with their freshness deadlines, so every replica sees the same state.
+    Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, namespace: str):
+        import redis  # optional dependency
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.25)
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Tuple[Optional[Any], str, float, float]:
+        try:
+            raw = self.client.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            print(f"[Cache] Redis read failed: {e}")
+            self.errors += 1
+            return None, MISS, 0.0, 0.0
+        if raw is None:
+            self.misses += 1
+            return None, MISS, 0.0, 0.0
+        payload = json.loads(raw)
+        entry = CacheEntry(
+            value=payload["value"],
+            size=len(raw),
+            fresh_until=payload["fresh_until"],
+            stale_until=payload["stale_until"],
+        )
+        state = entry.state(time.time())
+        if state == MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry.value, state, entry.fresh_until, entry.stale_until
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        now = time.time()
+        payload = {
+            "value": value,
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + stale_ttl,
+        }
+        try:
+            self.client.set(
+                f"{self.namespace}:{key}",
+                json.dumps(payload, default=str),
+                ex=max(1, int(ttl + stale_ttl)),
+            )
+        except Exception as e:
+            print(f"[Cache] Redis write failed: {e}")
+            self.errors += 1
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(f"{self.namespace}:{key}")
+        except Exception as e:
+            print(f"[Cache] Redis delete failed: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def make_redis_tier(url: Optional[str], namespace: str) -> Optional[RedisCacheTier]:
+    """Build a Redis tier if a URL is configured and the client is installed."""
+    if not url:
+        return None
+    try:
+        return RedisCacheTier(url, namespace)
+    except ImportError:
+        print("[Cache] redis package not installed, shared cache tier disabled")
+        return None
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional shared Redis tier. Reads check the
+    local tier first and backfill it from the shared tier; writes go to both.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_entries: Optional[int] = None,
+        redis_url: Optional[str] = None,
+    ):
+        self.local = LRUTTLCache(max_bytes, max_entries, name=namespace)
+        self.shared = make_redis_tier(redis_url or CACHE_REDIS_URL, namespace)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        if self.shared is not None:
+            _shared_tiers[namespace] = self.shared
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """Return (value, state) from the in-process tier, then the shared tier."""
+        value, state = self.local.get(key)
+        if state != MISS or self.shared is None:
+            return value, state
+
+        value, state, fresh_until, stale_until = self.shared.get(key)
+        if state != MISS:
+            # Backfill the local tier with whatever lifetime is left
+            now = time.time()
+            self.local.set(
+                key, value, max(0.0, fresh_until - now), stale_until - max(fresh_until, now)
+            )
+        return value, state
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value, self.ttl, self.stale_ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl, self.stale_ttl)
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+
+# -----------------------------
+# Registry, sweeper and stats
+# -----------------------------
+_caches: "weakref.WeakValueDictionary[str, LRUTTLCache]" = weakref.WeakValueDictionary()
+_shared_tiers: "weakref.WeakValueDictionary[str, RedisCacheTier]" = weakref.WeakValueDictionary()
+_sweeper_lock = threading.Lock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _register(cache: LRUTTLCache) -> None:
+    global _sweeper
+    _caches[cache.name] = cache
+    with _sweeper_lock:
+        if _sweeper is None and CACHE_SWEEP_INTERVAL_S > 0:
+            _sweeper = threading.Thread(target=_sweep_forever, name="cache-sweeper", daemon=True)
+            _sweeper.start()
+
+
+def _sweep_forever() -> None:
+    while True:
+        time.sleep(CACHE_SWEEP_INTERVAL_S)
+        for cache in list(_caches.values()):
+            try:
+                cache.sweep()
+            except Exception as e:
+                print(f"[Cache] Sweep failed for {cache.name}: {e}")
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every named cache, keyed by name."""
+    stats = {}
+    for name, cache in list(_caches.items()):
+        stats[name] = cache.stats()
+        shared = _shared_tiers.get(name)
+        if shared is not None:
+            stats[name]["shared"] = shared.stats()
+    return stats
@@ -0,0 +1,96 @@
+"""
+Circuit breakers for flaky upstreams (activity sources, scraped hosts)
+
+A breaker opens after `failure_threshold` consecutive failures and rejects
+calls for `reset_timeout_s`. After that a single trial call is let through
+(half-open): success closes the circuit, failure opens it again, and a trial
+that never finished (cancelled) is released so the next call can try.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_TIMEOUT_S = float(os.getenv("CIRCUIT_RESET_TIMEOUT_S", "60"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout_s: float = CIRCUIT_RESET_TIMEOUT_S,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout_s:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """True if a call may go ahead now."""
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"[Circuit Breaker] {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial without an outcome (e.g. the call was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"state": self.state, "failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Return the process-wide breaker for `name`, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, object]]:
+    with _breakers_lock:
+        return {name: breaker.snapshot() for name, breaker in _breakers.items()}
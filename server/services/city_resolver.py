@@ -0,0 +1,177 @@
+"""
+Resolve coordinates to a city name.
+
+Lookups go through three tiers, cheapest first:
+1. a bounded in-memory cache keyed by rounded lat/lon
+2. an offline gazetteer of city centroids (data/cities.csv) behind a spatial index
+3. the Google Geocoding API, only when no bundled city covers the point
+"""
+import os
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dotenv import load_dotenv
+
+from services import http_client
+from services.cache import MISS, LRUTTLCache
+from services.geo import SpatialIndex
+
+load_dotenv()
+
+GOOGLE_API_KEY = os.getenv("GOOGLE_CLOUD_API_KEY")
+
+CITY_CACHE_MAX_BYTES = int(os.getenv("CITY_CACHE_MAX_BYTES", str(1024 * 1024)))
+CITY_CACHE_TTL_S = float(os.getenv("CITY_CACHE_TTL_S", "86400"))
+# 2 decimal places is roughly a 1 km cell
+CITY_CACHE_PRECISION = int(os.getenv("CITY_CACHE_PRECISION", "2"))
+CITY_GAZETTEER_PATH = os.getenv(
+    "CITY_GAZETTEER_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "cities.csv"),
+)
+
+# Timezone for points outside the gazetteer (the app's home region)
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "America/Toronto")
+
+# Grid cell size for the gazetteer's spatial index
+_INDEX_CELL_KM = 50.0
+
+
+@dataclass
+class City:
+    name: str
+    region: str
+    country: str
+    lat: float
+    lon: float
+    radius_km: float
+    timezone: str = ""
+
+
+class Gazetteer:
+    """
+    Bundled city centroids, each with an approximate city radius. A point
+    belongs to the nearest city whose radius covers it.
+    """
+
+    def __init__(self, cities: List[City]):
+        self.cities = cities
+        self.max_radius_km = max((c.radius_km for c in cities), default=0.0)
+        self._index = SpatialIndex([c.lat for c in cities], [c.lon for c in cities], _INDEX_CELL_KM)
+        self._by_name: Dict[str, City] = {}
+        for city in cities:
+            self._by_name.setdefault(city.name.casefold(), city)
+
+    @classmethod
+    def load(cls, path: str) -> "Gazetteer":
+        cities = []
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    cities.append(
+                        City(
+                            name=row["name"],
+                            region=row["region"],
+                            country=row["country"],
+                            lat=float(row["lat"]),
+                            lon=float(row["lon"]),
+                            radius_km=float(row["radius_km"]),
+                            timezone=row.get("timezone") or "",
+                        )
+                    )
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[City Resolver] Could not load gazetteer {path}: {e}")
+        return cls(cities)
+
+    def find(self, name: str) -> Optional[City]:
+        """Look a city up by name (case-insensitive)."""
+        return self._by_name.get(name.strip().casefold())
+
+    def nearest(self, lat: float, lon: float) -> Optional[City]:
+        """Return the nearest city whose radius contains the point, if any."""
+        if not self.cities:
+            return None
+
+        # Cities come back nearest first; take the first whose radius reaches the point
+        indices, distances = self._index.within(lat, lon, self.max_radius_km)
+        for i, km in zip(indices.tolist(), distances.tolist()):
+            if km <= self.cities[i].radius_km:
+                return self.cities[i]
+        return None
+
+
+def _reverse_geocode(lat: float, lon: float) -> Optional[str]:
+    """Ask the Google Geocoding API for the locality; None if there is none."""
+    url = f"https://maps.googleapis.com/maps/api/geocode/json?latlng={lat},{lon}&key={GOOGLE_API_KEY}"
+    res = http_client.get(url, timeout=http_client.PROBE_TIMEOUT)
+    res.raise_for_status()
+    data = res.json()
+
+    if not data.get("results"):
+        print("[City Resolver] No geocoding results")
+        return None
+
+    # Look for the 'locality' component
+    for component in data["results"][0].get("address_components", []):
+        if "locality" in component.get("types", []):
+            return component["long_name"]
+
+    print("[City Resolver] Could not determine city from geocoding results")
+    return None
+
+
+class CityResolver:
+    def __init__(self):
+        self.cache = LRUTTLCache(CITY_CACHE_MAX_BYTES, name="city")
+        self.gazetteer = Gazetteer.load(CITY_GAZETTEER_PATH)
+
+    def _cache_key(self, lat: float, lon: float) -> str:
+        return f"{round(lat, CITY_CACHE_PRECISION)},{round(lon, CITY_CACHE_PRECISION)}"
+
+    def resolve(self, lat: float, lon: float) -> Optional[str]:
+        """
+        Return the city name for a coordinate, or None if it can't be determined.
+        Geocoding errors are raised to the caller and not cached.
+        """
+        key = self._cache_key(lat, lon)
+        city, state = self.cache.get(key)
+        if state != MISS:
+            return city
+
+        match = self.gazetteer.nearest(lat, lon)
+        if match is not None:
+            city = match.name
+        else:
+            print(f"[City Resolver] {key} is outside the gazetteer, using geocoding API")
+            city = _reverse_geocode(lat, lon)
+
+        self.cache.set(key, city, CITY_CACHE_TTL_S)
+        return city
+
+    def timezone(self, lat: float, lon: float) -> str:
+        """IANA timezone of the gazetteer city covering a point, else DEFAULT_TIMEZONE."""
+        match = self.gazetteer.nearest(lat, lon)
+        return match.timezone if match is not None and match.timezone else DEFAULT_TIMEZONE
+
+    def local_date(
+        self, lat: Optional[float] = None, lon: Optional[float] = None, timezone_name: Optional[str] = None
+    ) -> date:
+        """
+        Today's date where the user is: in `timezone_name` when given and valid,
+        otherwise in the timezone of the city at lat/lon (DEFAULT_TIMEZONE without one).
+        """
+        located = self.timezone(lat, lon) if lat is not None and lon is not None else None
+        for name in (timezone_name, located, DEFAULT_TIMEZONE):
+            if not name:
+                continue
+            try:
+                return datetime.now(ZoneInfo(name)).date()
+            except (ZoneInfoNotFoundError, ValueError):
+                print(f"[City Resolver] Unknown timezone {name!r}")
+        return datetime.now().date()
+
+
+# Global instance
+city_resolver = CityResolver()
@@ -7,7 +7,6 @@ import json
 from typing import Dict, List, Any, Optional
 import cohere
 from services.user_profile_service import get_user_keywords, get_user_profile_by_auth0_id
-from services.mongo import user_profiles_col
 
 # Initialize Cohere client
 co = cohere.Client(os.getenv("COHERE_API_KEY"))
@@ -20,7 +19,7 @@ class CohereRAGLocationParser:
     def __init__(self):
         self.cohere_client = co
     
-    def parse_user_text_for_keywords(
+    async def parse_user_text_for_keywords(
         self, 
         user_text: str, 
         auth0_user_id: str,
@@ -43,7 +42,7 @@ class CohereRAGLocationParser:
         """
         try:
             # Get user's keyword database
-            user_keywords = get_user_keywords(auth0_user_id)
+            user_keywords = await get_user_keywords(auth0_user_id)
             
             if not user_keywords:
                 return {
@@ -279,12 +278,12 @@ Return ONLY valid JSON, no other text.
             "confidence_scores": valid_scores
         }
     
-    def get_user_keyword_stats(self, auth0_user_id: str) -> Dict[str, Any]:
+    async def get_user_keyword_stats(self, auth0_user_id: str) -> Dict[str, Any]:
         """
         Get statistics about user's keyword database
         """
         try:
-            user_keywords = get_user_keywords(auth0_user_id)
+            user_keywords = await get_user_keywords(auth0_user_id)
             
             if not user_keywords:
                 return {
@@ -341,7 +340,7 @@ Return ONLY valid JSON, no other text.
 
 
 # Convenience functions for easy integration
-def parse_user_text_with_rag(
+async def parse_user_text_with_rag(
     user_text: str, 
     auth0_user_id: str,
     context_location: Optional[Dict[str, float]] = None
@@ -350,11 +349,11 @@ def parse_user_text_with_rag(
     Convenience function to parse user text using Cohere RAG
     """
     parser = CohereRAGLocationParser()
-    return parser.parse_user_text_for_keywords(user_text, auth0_user_id, context_location)
+    return await parser.parse_user_text_for_keywords(user_text, auth0_user_id, context_location)
 
-def get_user_location_keywords_stats(auth0_user_id: str) -> Dict[str, Any]:
+async def get_user_location_keywords_stats(auth0_user_id: str) -> Dict[str, Any]:
     """
     Convenience function to get user keyword statistics
     """
     parser = CohereRAGLocationParser()
-    return parser.get_user_keyword_stats(auth0_user_id)
+    return await parser.get_user_keyword_stats(auth0_user_id)
@@ -0,0 +1,77 @@
+"""
+Helpers for bridging the sync and async halves of the service layer
+"""
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+# Threads reserved for blocking SDK calls made from async request handlers.
+# Kept separate from the loop's default executor so a burst of slow LLM calls
+# can't starve other to_thread() users.
+BLOCKING_MAX_WORKERS = int(os.getenv("BLOCKING_MAX_WORKERS", "16"))
+
+# Long-lived loop that runs coroutines on behalf of sync callers, so pooled
+# async clients (see services.http_client) survive between calls.
+_bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+_bridge_lock = threading.Lock()
+
+
+def _get_bridge_loop() -> asyncio.AbstractEventLoop:
+    global _bridge_loop
+    with _bridge_lock:
+        if _bridge_loop is None or _bridge_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="sync-bridge-loop", daemon=True
+            )
+            thread.start()
+            _bridge_loop = loop
+        return _bridge_loop
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine runs on a shared background loop, which works whether or not
+    the calling thread already has a running loop. The caller blocks until the
+    result is ready.
+    """
+    loop = _get_bridge_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run_sync() called from the sync bridge loop itself")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+_blocking_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_blocking_pool() -> ThreadPoolExecutor:
+    global _blocking_pool
+    with _bridge_lock:
+        if _blocking_pool is None:
+            _blocking_pool = ThreadPoolExecutor(
+                max_workers=BLOCKING_MAX_WORKERS, thread_name_prefix="blocking-io"
+            )
+        return _blocking_pool
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Await a blocking call without stalling the event loop.
+
+    The call runs on a dedicated pool of BLOCKING_MAX_WORKERS threads; callers
+    beyond that wait in the pool's queue.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_blocking_pool(), functools.partial(func, *args, **kwargs)
+    )
@@ -5,9 +5,10 @@ This extends the existing Gemini-based parsing with RAG keyword analysis
 from google import genai
 import os
 import json
-import math
 from typing import Dict, List, Any, Optional, Tuple
 from services.cohere_rag_location_parser import CohereRAGLocationParser
+from services.concurrency import run_blocking
+from services.geo import haversine_km_array
 
 def _get_gemini_client() -> genai.Client:
     api_key = os.getenv("GEMINI_API_KEY")
@@ -15,25 +16,7 @@ def _get_gemini_client() -> genai.Client:
         raise RuntimeError("GEMINI_API_KEY is not set.")
     return genai.Client(api_key=api_key)
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate distance between two points in kilometers using Haversine formula
-    """
-    R = 6371  # Earth's radius in kilometers
-    
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
-    
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
-
-def parse_intent_with_rag(
+async def parse_intent_with_rag(
     starting_location: str, 
     text: str, 
     auth0_user_id: Optional[str] = None,
@@ -54,7 +37,7 @@ def parse_intent_with_rag(
     """
     
     # Step 1: Use Gemini to identify potentially ambiguous words
-    ambiguous_words = _identify_ambiguous_words(text)
+    ambiguous_words = await run_blocking(_identify_ambiguous_words, text)
     print(f"[Enhanced LLM] Identified ambiguous words: {ambiguous_words}")
     
     # Step 2: Check user keywords for ALL ambiguous words first
@@ -65,7 +48,7 @@ def parse_intent_with_rag(
     
     if auth0_user_id and ambiguous_words:
         rag_parser = CohereRAGLocationParser()
-        rag_result = rag_parser.parse_user_text_for_keywords(
+        rag_result = await rag_parser.parse_user_text_for_keywords(
             user_text=text,
             auth0_user_id=auth0_user_id,
             context_location=user_location
@@ -79,29 +62,31 @@ def parse_intent_with_rag(
         # Filter matches by distance (20km radius) and confidence
         if user_location and location_data:
             filtered_matches = []
-            for match in location_data:
-                location_info = match.get('location_data', {})
-                match_lat = location_info.get('lat')
-                match_lng = location_info.get('lng')
+            located = [
+                match for match in location_data
+                if match.get('location_data', {}).get('lat') and match.get('location_data', {}).get('lng')
+            ]
+            # Distances from the user to every located match in one vectorized call
+            distances = haversine_km_array(
+                user_location['lat'], user_location['lng'],
+                [match['location_data']['lat'] for match in located],
+                [match['location_data']['lng'] for match in located]
+            )
+            for match, distance in zip(located, distances.tolist()):
+                location_info = match['location_data']
                 confidence = match.get('confidence', 0.5)
                 
-                if match_lat and match_lng:
-                    distance = calculate_distance(
-                        user_location['lat'], user_location['lng'],
-                        match_lat, match_lng
-                    )
-                    
-                    # Only use personal location if it's close AND confident
-                    if distance <= 20 and confidence >= 0.7:  # 20km radius + high confidence
-                        filtered_matches.append({
-                            'keyword': match.get('keyword'),
-                            'location_data': location_info,
-                            'distance_km': round(distance, 2),
-                            'confidence': confidence
-                        })
-                        print(f"[Enhanced LLM] RAG match accepted: {match.get('keyword')} ({distance:.2f}km, confidence: {confidence:.2f})")
-                    else:
-                        print(f"[Enhanced LLM] RAG match rejected: {match.get('keyword')} (distance: {distance:.2f}km, confidence: {confidence:.2f})")
+                # Only use personal location if it's close AND confident
+                if distance <= 20 and confidence >= 0.7:  # 20km radius + high confidence
+                    filtered_matches.append({
+                        'keyword': match.get('keyword'),
+                        'location_data': location_info,
+                        'distance_km': round(distance, 2),
+                        'confidence': confidence
+                    })
+                    print(f"[Enhanced LLM] RAG match accepted: {match.get('keyword')} ({distance:.2f}km, confidence: {confidence:.2f})")
+                else:
+                    print(f"[Enhanced LLM] RAG match rejected: {match.get('keyword')} (distance: {distance:.2f}km, confidence: {confidence:.2f})")
             
             rag_matches = filtered_matches
         
@@ -117,10 +102,10 @@ def parse_intent_with_rag(
             print(f"[Enhanced LLM] Unmatched words (will use Google Places): {unmatched_words}")
     
     # Step 3: Parse complete order of ALL locations (personal + general)
-    complete_order = _parse_complete_location_order(text, rag_matches, ambiguous_words)
+    complete_order = await run_blocking(_parse_complete_location_order, text, rag_matches, ambiguous_words)
     
     # Step 4: Use standard Gemini parsing for unmatched words
-    standard_intent = _parse_intent_standard(starting_location, text)
+    standard_intent = await run_blocking(_parse_intent_standard, starting_location, text)
     
     # Step 5: Enhance the intent with RAG matches and complete order
     enhanced_intent = _enhance_intent_with_rag(
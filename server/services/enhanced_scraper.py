@@ -2,17 +2,48 @@
 Fast trendiness checker using Cohere for top activity candidates only
 """
 import os
+import re
 import json
+import asyncio
+import weakref
 import requests
 from dotenv import load_dotenv
 import cohere
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import hashlib
-from datetime import datetime, timedelta
+from services import http_client
+from services.cache import MISS, TieredCache
 
 load_dotenv()
 co = cohere.Client(os.getenv("COHERE_API_KEY"))
 
+TRENDINESS_MODEL = "command-r-plus"
+# Places scored per Cohere prompt; larger batches run as concurrent prompts
+TRENDINESS_BATCH_SIZE = int(os.getenv("TRENDINESS_BATCH_SIZE", "12"))
+# Overall budget for one batch call; unscored places fall back to neutral
+TRENDINESS_DEADLINE_S = float(os.getenv("TRENDINESS_DEADLINE_S", "6"))
+NEUTRAL_TRENDINESS = 0.5
+
+TRENDINESS_CACHE_TTL_S = float(os.getenv("TRENDINESS_CACHE_TTL_S", str(24 * 3600)))
+TRENDINESS_CACHE_MAX_ENTRIES = int(os.getenv("TRENDINESS_CACHE_MAX_ENTRIES", "10000"))
+TRENDINESS_CACHE_REDIS_URL = os.getenv("TRENDINESS_CACHE_REDIS_URL")
+
+# Async Cohere clients share the pooled httpx client of their event loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, cohere.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_cohere() -> cohere.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = cohere.AsyncClient(
+            os.getenv("COHERE_API_KEY"), httpx_client=http_client.get_async_client()
+        )
+        _async_clients[loop] = client
+    return client
+
 class EnhancedScraper:
     def __init__(self):
         self.cohere_client = co
@@ -20,46 +51,86 @@ class EnhancedScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        # In-memory cache (could be moved to MongoDB later)
-        self.cache = {}
-        self.cache_duration = timedelta(hours=24)  # Cache for 24 hours
+        # Bounded in-process cache, shared through Redis when one is configured
+        self.cache = TieredCache(
+            "trendiness",
+            ttl=TRENDINESS_CACHE_TTL_S,
+            max_bytes=1024 * 1024,
+            max_entries=TRENDINESS_CACHE_MAX_ENTRIES,
+            redis_url=TRENDINESS_CACHE_REDIS_URL,
+        )
     
     async def check_trendiness(self, place_name: str, location: str) -> float:
         """
         Fast trendiness check using Cohere for top candidates only.
         Returns trendiness score (0-1, higher = more trendy).
         """
-        # Check cache first
-        cache_key = self._get_cache_key(place_name, location)
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            print(f"[Trendiness] Cache HIT for: {place_name}")
-            return cached_result
+        scores = await self.check_trendiness_batch([(place_name, location)])
+        return scores.get(place_name.lower(), NEUTRAL_TRENDINESS)
+    
+    async def check_trendiness_batch(
+        self, places: List[Tuple[str, str]], deadline_s: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Score many (place_name, location) pairs at once.
+        Cache misses are sent to Cohere in prompts of TRENDINESS_BATCH_SIZE places,
+        all in flight together. Anything not scored by the deadline gets the
+        neutral score (and is not cached, so it is retried next time).
+        Returns {place_name.lower(): score}.
+        """
+        deadline_s = TRENDINESS_DEADLINE_S if deadline_s is None else deadline_s
+        scores = {}
+        misses = {}
         
-        print(f"[Trendiness] Cache MISS - checking: {place_name}")
+        for place_name, location in places:
+            name_key = place_name.lower()
+            if name_key in scores or name_key in misses:
+                continue
+            cache_key = self._get_cache_key(place_name, location)
+            cached_result = self._get_from_cache(cache_key)
+            if cached_result is not None:
+                scores[name_key] = cached_result
+            else:
+                misses[name_key] = (place_name, location, cache_key)
         
-        try:
-            trendiness_score = await self._analyze_trendiness(place_name, location)
-            
-            # Cache the result
-            self._save_to_cache(cache_key, trendiness_score)
-            
-            return trendiness_score
-            
-        except Exception as e:
-            print(f"[Trendiness] Error checking {place_name}: {e}")
-            fallback_score = 0.5  # Neutral trendiness
-            self._save_to_cache(cache_key, fallback_score)
-            return fallback_score
+        print(f"[Trendiness] {len(scores)} cache hits, {len(misses)} to score")
+        if not misses:
+            return scores
+        
+        pending = list(misses.values())
+        batches = [
+            pending[i:i + TRENDINESS_BATCH_SIZE]
+            for i in range(0, len(pending), TRENDINESS_BATCH_SIZE)
+        ]
+        tasks = [asyncio.create_task(self._analyze_trendiness_batch(batch)) for batch in batches]
+        done, not_done = await asyncio.wait(tasks, timeout=deadline_s)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            print(f"[Trendiness] Deadline of {deadline_s}s reached, {len(not_done)}/{len(tasks)} batches unscored")
+        
+        for task in done:
+            if task.exception() is not None:
+                print(f"[Trendiness] Batch failed: {task.exception()}")
+                continue
+            for (place_name, _, cache_key), score in task.result():
+                scores[place_name.lower()] = score
+                self._save_to_cache(cache_key, score)
+        
+        for name_key in misses:
+            scores.setdefault(name_key, NEUTRAL_TRENDINESS)
+        return scores
     
-    async def _analyze_trendiness(self, place_name: str, location: str) -> float:
-        """Analyze trendiness using Cohere - focused on social media/blog presence"""
-        try:
-            prompt = f"""
-            Rate the trendiness/popularity of this place on a scale of 0.0 to 1.0:
+    async def _analyze_trendiness_batch(self, batch: List[Tuple[str, str, str]]) -> List[Tuple[Tuple[str, str, str], float]]:
+        """Rate a batch of places in one Cohere prompt - focused on social media/blog presence"""
+        listing = "\n".join(
+            f"{i}. {place_name} ({location})" for i, (place_name, location, _) in enumerate(batch, 1)
+        )
+        prompt = f"""
+            Rate the trendiness/popularity of each place below on a scale of 0.0 to 1.0.
             
-            Place: {place_name}
-            Location: {location}
+            Places:
+            {listing}
             
             Consider:
             - Social media mentions
@@ -68,62 +139,65 @@ class EnhancedScraper:
             - Instagram-worthy factor
             - Local popularity vs tourist traps
             
-            Return ONLY a number between 0.0 and 1.0 (no explanation):
+            Scale:
             - 0.0-0.3: Not trendy, local only
             - 0.3-0.6: Moderately popular
             - 0.6-0.8: Trending, getting attention
             - 0.8-1.0: Very trendy, viral/hot spot
-            """
             
-            response = co.chat(model="command-r-plus", message=prompt)
-            
-            # Extract number from response
-            cleaned_text = response.text.strip()
-            try:
-                # Try to find a number in the response
-                import re
-                numbers = re.findall(r'0\.\d+', cleaned_text)
-                if numbers:
-                    trendiness = float(numbers[0])
-                    print(f"[Trendiness] {place_name}: {trendiness}")
-                    return trendiness
-                else:
-                    # Fallback: try to parse the whole response as a number
-                    trendiness = float(cleaned_text)
-                    return max(0.0, min(1.0, trendiness))  # Clamp to 0-1
-            except ValueError:
-                print(f"[Trendiness] Could not parse response: {cleaned_text}")
-                return 0.5  # Neutral fallback
-                
-        except Exception as e:
-            print(f"[Trendiness] Error analyzing {place_name}: {e}")
-            return 0.5  # Neutral fallback
-    
+            Return ONLY a JSON object mapping each place number to its score,
+            e.g. {{"1": 0.7, "2": 0.4}} (no explanation).
+            """
+        
+        response = await _get_async_cohere().chat(model=TRENDINESS_MODEL, message=prompt)
+        parsed = _parse_batch_scores(response.text, len(batch))
+        
+        results = []
+        for i, item in enumerate(batch, 1):
+            score = parsed.get(i)
+            if score is None:
+                print(f"[Trendiness] No score returned for {item[0]}")
+                continue
+            print(f"[Trendiness] {item[0]}: {score}")
+            results.append((item, score))
+        return results
     
     def _get_cache_key(self, place_name: str, location: str) -> str:
         """Generate cache key from place name and location"""
         key_string = f"{place_name.lower().strip()}_{location.lower().strip()}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    def _get_from_cache(self, cache_key: str) -> Dict[str, Any]:
-        """Get cached result if still valid"""
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            cache_time = cached_data.get("cached_at")
-            if cache_time and datetime.now() - cache_time < self.cache_duration:
-                return cached_data.get("data")
-            else:
-                # Expired cache entry
-                del self.cache[cache_key]
-        return None
+    def _get_from_cache(self, cache_key: str) -> Optional[float]:
+        """Get cached result if still valid (None on a miss, so 0.0 is a hit)"""
+        value, state = self.cache.get(cache_key)
+        return None if state == MISS else value
     
-    def _save_to_cache(self, cache_key: str, data: Dict[str, Any]):
-        """Save result to cache with timestamp"""
-        self.cache[cache_key] = {
-            "data": data,
-            "cached_at": datetime.now()
-        }
+    def _save_to_cache(self, cache_key: str, data: float):
+        """Save result to cache"""
+        self.cache.set(cache_key, data)
         print(f"[Enhanced Scraper] Cached result for key: {cache_key[:8]}...")
 
+def _parse_batch_scores(text: str, count: int) -> Dict[int, float]:
+    """Parse {"1": 0.7, ...} (or "1: 0.7" lines) into {1: 0.7}, clamped to 0-1."""
+    raw = {}
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if match:
+        try:
+            raw = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            raw = {}
+    if not raw:
+        raw = dict(re.findall(r'(\d+)\s*[:.)=-]\s*([01](?:\.\d+)?)', text))
+    
+    scores = {}
+    for key, value in raw.items():
+        try:
+            index, score = int(key), float(value)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= index <= count:
+            scores[index] = max(0.0, min(1.0, score))
+    return scores
+
 # Global instance
 trendiness_checker = EnhancedScraper()
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Background ingestion worker that keeps the event index warm.
+
+Every CRAWLER_INTERVAL_S it scrapes and structures the event sources
+(Eventbrite, Luma, local blogs) for each configured city and writes the
+results to the event index, so fetch_all_activities doesn't have to scrape
+or call Cohere while serving a request.
+
+Run it as its own process:
+
+    python -m services.event_crawler            # loop forever
+    python -m services.event_crawler --once     # one pass, e.g. from cron
+    python -m services.event_crawler --cities Waterloo,Toronto
+"""
+import os
+import argparse
+import asyncio
+import time
+from typing import List
+
+from dotenv import load_dotenv
+
+from services import event_index, http_client, mongo
+from services.activity_service import EVENT_SOURCES
+from services.city_resolver import city_resolver
+
+load_dotenv()
+
+# Comma-separated city names, looked up in the bundled gazetteer
+CRAWLER_CITIES = os.getenv("CRAWLER_CITIES", "Waterloo")
+CRAWLER_INTERVAL_S = float(os.getenv("CRAWLER_INTERVAL_S", "900"))
+# Off the request path, so sources get much longer than in fetch_all_activities
+CRAWLER_SOURCE_TIMEOUT_S = float(os.getenv("CRAWLER_SOURCE_TIMEOUT_S", "120"))
+
+
+async def crawl_city(name: str) -> int:
+    """Refresh every event source for one city; returns how many events were stored."""
+    city = city_resolver.gazetteer.find(name)
+    if city is None:
+        print(f"[Event Crawler] {name} is not in the gazetteer, skipping")
+        return 0
+
+    async def crawl_source(source):
+        events = await asyncio.wait_for(
+            source.run(city.name, city.lat, city.lon), timeout=CRAWLER_SOURCE_TIMEOUT_S
+        )
+        if not await event_index.save_events(city.name, source.name, events or []):
+            # The scrapers swallow their errors and return [], so treat it like a failure
+            raise RuntimeError("no events returned")
+        return len(events or [])
+
+    results = await asyncio.gather(
+        *(crawl_source(source) for source in EVENT_SOURCES), return_exceptions=True
+    )
+
+    stored = 0
+    for source, result in zip(EVENT_SOURCES, results):
+        if isinstance(result, BaseException):
+            # Keep the previous events; they stay valid until the freshness SLA runs out
+            print(f"[Event Crawler] {source.name} failed for {city.name}: {result!r}")
+        else:
+            print(f"[Event Crawler] {source.name}: stored {result} events for {city.name}")
+            stored += result
+    return stored
+
+
+async def crawl(cities: List[str]) -> None:
+    started = time.perf_counter()
+    for name in cities:
+        await crawl_city(name)
+    print(f"[Event Crawler] Crawled {len(cities)} cities in {time.perf_counter() - started:.1f}s")
+
+
+async def run(cities: List[str], once: bool = False) -> None:
+    await mongo.ensure_indexes()
+    try:
+        while True:
+            await crawl(cities)
+            if once:
+                break
+            await asyncio.sleep(CRAWLER_INTERVAL_S)
+    finally:
+        await http_client.aclose()
+        http_client.close()
+        mongo.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep the per-city event index warm")
+    parser.add_argument("--cities", default=CRAWLER_CITIES, help="comma-separated city names")
+    parser.add_argument("--once", action="store_true", help="crawl once and exit")
+    args = parser.parse_args()
+
+    cities = [name.strip() for name in args.cities.split(",") if name.strip()]
+    asyncio.run(run(cities, once=args.once))
+
+
+if __name__ == "__main__":
+    main()
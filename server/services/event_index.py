@@ -0,0 +1,51 @@
+"""
+Per-city store of structured events, written by the background crawler
+(services.event_crawler) and read by fetch_all_activities.
+
+One document per (city, source) holds the source's latest events and when
+they were refreshed.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from services import mongo
+
+
+def _city_key(city: str) -> str:
+    return city.strip().casefold()
+
+
+async def save_events(city: str, source: str, events: List[Dict[str, Any]]) -> bool:
+    """
+    Replace the stored events for one city and source. Returns False, storing
+    nothing, when `events` is empty but events are already stored: the
+    scrapers return [] on any failure, so an empty result is not trusted to
+    wipe the index. The old events age out past the freshness SLA instead.
+    """
+    collection = mongo.event_index_collection()
+    key = {"city": _city_key(city), "source": source}
+    if not events:
+        previous = await collection.find_one(key, {"events": 1})
+        if previous and previous.get("events"):
+            return False
+    await collection.update_one(
+        key,
+        {"$set": {"events": events, "refreshed_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    return True
+
+
+async def load_events(city: str, source: str, max_age_s: float) -> Optional[List[Dict[str, Any]]]:
+    """
+    Stored events for a city and source, or None if there are none refreshed
+    within the last `max_age_s` seconds.
+    """
+    doc = await mongo.event_index_collection().find_one({"city": _city_key(city), "source": source})
+    if not doc:
+        return None
+    age_s = (datetime.utcnow() - doc["refreshed_at"]).total_seconds()
+    if age_s > max_age_s:
+        print(f"[Event Index] {source} events for {city} are {age_s:.0f}s old, past the {max_age_s:.0f}s SLA")
+        return None
+    return doc.get("events", [])
@@ -0,0 +1,162 @@
+"""
+Shared geographic helpers: geohashes, great-circle distances (scalar and
+vectorized) and a grid spatial index for radius and k-nearest queries.
+"""
+import os
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Default grid cell size for SpatialIndex; about the radius of a typical query
+SPATIAL_INDEX_CELL_KM = float(os.getenv("SPATIAL_INDEX_CELL_KM", "2"))
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lng: float, precision: int = 6) -> str:
+    """
+    Encode a coordinate as a geohash string of `precision` characters.
+    Precision 6 cells are roughly 1.2 km x 0.6 km, precision 5 about 4.9 km x 4.9 km.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # geohash interleaves bits, starting with longitude
+
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates, in kilometers."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_km_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Vectorized haversine_km. Arguments are scalars or arrays and broadcast
+    against each other, e.g. one origin against every candidate.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+_HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+class SpatialIndex:
+    """
+    Grid index over a fixed set of points. Cells are `cell_km` tall and about
+    the same number of degrees wide; a query only computes great-circle distances
+    for points in the cells its radius can reach, wrapping at the antimeridian.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float], cell_km: float = SPATIAL_INDEX_CELL_KM):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        # Columns divide 360 degrees evenly so wrapping at the antimeridian is seamless
+        self._cols = max(1, math.ceil(360 / self.cell_deg))
+        self._col_deg = 360 / self._cols
+        cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, (row, col) in enumerate(zip(self._rows_of(self.lats), self._cols_of(self.lons))):
+            cells[(row, col)].append(i)
+        self._cells = {cell: np.array(indices) for cell, indices in cells.items()}
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[float, float]], cell_km: float = SPATIAL_INDEX_CELL_KM) -> "SpatialIndex":
+        points = list(points)
+        return cls([p[0] for p in points], [p[1] for p in points], cell_km)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _rows_of(self, lats: np.ndarray) -> List[int]:
+        return np.floor((lats + 90) / self.cell_deg).astype(int).tolist()
+
+    def _cols_of(self, lons: np.ndarray) -> List[int]:
+        return (np.floor((lons + 180) / self._col_deg).astype(int) % self._cols).tolist()
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of every point in the cells a radius around (lat, lon) touches."""
+        radius_deg = radius_km / KM_PER_DEGREE
+        # Cells are narrowest (in km) at the band edge furthest from the equator
+        band_lat = min(90.0, abs(lat) + radius_deg)
+        cos_lat = math.cos(math.radians(band_lat))
+        if radius_km >= _HALF_CIRCUMFERENCE_KM or cos_lat < 1e-6:
+            return np.arange(len(self))
+
+        row = self._rows_of(np.array([lat]))[0]
+        col = self._cols_of(np.array([lon]))[0]
+        row_span = math.ceil(radius_deg / self.cell_deg)
+        col_span = math.ceil(radius_deg / cos_lat / self._col_deg)
+        rows = range(row - row_span, row + row_span + 1)
+        if 2 * col_span + 1 >= self._cols:
+            cols = range(self._cols)
+        else:
+            cols = [(col + dc) % self._cols for dc in range(-col_span, col_span + 1)]
+
+        if len(rows) * len(cols) <= len(self._cells):
+            found = [self._cells[(r, c)] for r in rows for c in cols if (r, c) in self._cells]
+        else:
+            # Large radius: cheaper to filter the occupied cells than to probe every cell in range
+            col_set = set(cols)
+            found = [
+                indices for (r, c), indices in self._cells.items()
+                if rows.start <= r < rows.stop and c in col_set
+            ]
+        return np.concatenate(found) if found else np.empty(0, dtype=int)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, distances_km) of the points within `radius_km`, nearest first."""
+        candidates = self._candidates(lat, lon, radius_km)
+        distances = haversine_km_array(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, distances_km) of the `k` nearest points, nearest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        radius_km = self.cell_deg * KM_PER_DEGREE
+        while True:
+            indices, distances = self.within(lat, lon, radius_km)
+            # Anything outside the radius is further away than everything inside it
+            if len(indices) >= k or radius_km >= _HALF_CIRCUMFERENCE_KM:
+                return indices[:k], distances[:k]
+            radius_km *= 2
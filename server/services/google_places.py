@@ -1,8 +1,11 @@
 import os
-import time
-import requests
-from typing import Dict, List, Optional, Any, Union
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Any, Union
 from pydantic import BaseModel, Field
+from services import http_client
+from services.concurrency import run_sync
+from services.places_cache import places_cache, places_cache_key
 
 GOOGLE_PLACES_SEARCH_TEXT_URL = "https://places.googleapis.com/v1/places:searchText"
 # Optional: switch to searchNearby if you have a strict lat/lng query only:
@@ -10,6 +13,11 @@ GOOGLE_PLACES_SEARCH_TEXT_URL = "https://places.googleapis.com/v1/places:searchT
 
 API_KEY = os.getenv("GOOGLE_CLOUD_API_KEY")  # set this in your env
 
+# Max Places requests in flight at once across all destinations of a search
+MAX_CONCURRENCY = int(os.getenv("PLACES_MAX_CONCURRENCY", "4"))
+# Pause before requesting a follow-up page (only delays that destination)
+PAGE_DELAY_S = 0.5
+
 # What we want back (kept small to reduce cost/latency)
 FIELD_MASK = ",".join(
     [
@@ -75,17 +83,12 @@ def _headers() -> Dict[str, str]:
     }
 
 
-def _search_text_page(payload: Dict[str, Any]) -> Dict[str, Any]:
-    resp = requests.post(
-        GOOGLE_PLACES_SEARCH_TEXT_URL, headers=_headers(), json=payload, timeout=15
+async def _search_text_page(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # 429s are retried with backoff by the shared client
+    resp = await http_client.apost(
+        GOOGLE_PLACES_SEARCH_TEXT_URL, headers=_headers(), json=payload
     )
-    if resp.status_code == 429:
-        # basic backoff & single retry
-        time.sleep(1.2)
-        resp = requests.post(
-            GOOGLE_PLACES_SEARCH_TEXT_URL, headers=_headers(), json=payload, timeout=15
-        )
-    if not resp.ok:
+    if not resp.is_success:
         raise RuntimeError(f"Places API error {resp.status_code}: {resp.text}")
     return resp.json()
 
@@ -130,128 +133,287 @@ def _build_payload(
         }
     return payload
 
-def search(intent: Dict[str, Any]) -> List[PlaceCandidate]:
-    """
-    intent expects keys:
-      - queries: List[str] or List[List[str]]  (or "categories")
-      - lat, lng, radius_m (optional)
-      - open_now (optional)
-      - min_rating (optional)
-      - max_results (optional)
-    """
+@dataclass
+class DestinationResult:
+    """Candidates found for one destination of a search intent."""
+    index: int
+    query: str
+    candidates: List[PlaceCandidate]
+
+
+@dataclass
+class _SearchPlan:
+    queries: List[Union[str, List[str]]]
+    lat: Optional[float]
+    lng: Optional[float]
+    radius_m: Optional[Union[int, float, str]]
+    open_now: Optional[bool]
+    min_rating: Optional[float]
+    max_results: int
+    results_per_destination: int
+
+
+def _plan_search(intent: Dict[str, Any]) -> _SearchPlan:
     queries = intent.get("queries") or intent.get("categories") or intent.get("place_types") or []
     if isinstance(queries, str):
         queries = [queries]
-    
+
+    if not queries:
+        raise ValueError(
+            "intent.queries (or .categories) must contain at least one search term"
+        )
+
+    max_results = int(intent.get("max_results", 60))
+    plan = _SearchPlan(
+        queries=queries,
+        lat=intent.get("lat"),
+        lng=intent.get("lng"),
+        radius_m=intent.get("radius_m", None),
+        open_now=intent.get("open_now", None),
+        min_rating=intent.get("min_rating", None),
+        max_results=max_results,
+        results_per_destination=max(10, max_results // len(queries)),
+    )
+
+    print(f"🔍 Google Places Search Debug:")
+    print(f"   Destinations: {len(plan.queries)}")
+    print(f"   Location: {plan.lat}, {plan.lng}")
+    print(f"   Radius: {plan.radius_m}m")
+    print(f"   Max results: {plan.max_results}")
+    print(f"   Results per destination: {plan.results_per_destination}")
+    return plan
+
+
+def _destination_query(destination: Union[str, List[str]]) -> str:
     # Handle nested arrays as combined context terms for the same destination
     # For example: [['italian restaurant', 'pasta', 'romantic'], 'museum'] means:
     # - Destination 1: search for 'italian restaurant pasta romantic' (combined)
     # - Destination 2: search for 'museum'
-    
-    lat = intent.get("lat")
-    lng = intent.get("lng")
-    radius_m = intent.get("radius_m", None)
-    open_now = intent.get("open_now", None)
-    min_rating = intent.get("min_rating", None)
-    max_results = int(intent.get("max_results", 60))
-    results_per_destination = max(10, max_results // len(queries))
+    if isinstance(destination, str):
+        return destination
+    return ' '.join(destination)
 
-    print(f"🔍 Google Places Search Debug:")
-    print(f"   Destinations: {len(queries)}")
-    print(f"   Location: {lat}, {lng}")
-    print(f"   Radius: {radius_m}m")
-    print(f"   Max results: {max_results}")
-    print(f"   Results per destination: {results_per_destination}")
 
-    if not queries:
-        raise ValueError(
-            "intent.queries (or .categories) must contain at least one search term"
-        )
+class _DestinationStream:
+    """
+    Lazily paged text search results for one destination.
 
-    seen: set[str] = set()
-    out: List[PlaceCandidate] = []
+    Pages are pulled on demand and buffered, so the merge step can ask for
+    more results if earlier destinations already claimed some of these places.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        plan: _SearchPlan,
+        semaphore: asyncio.Semaphore,
+    ):
+        self.index = index
+        self.search_query = _destination_query(plan.queries[index])
+        self.min_rating = plan.min_rating
+        self.semaphore = semaphore
+        self.buffer: List[PlaceCandidate] = []
+        self.buffered_ids: set[str] = set()
+        self.page_token: Optional[str] = None
+        self.pages_fetched = 0
+        self.last_page_cached = False
+        self.exhausted = False
 
-    for i, destination in enumerate(queries):
-        print(f"\n🎯 Destination {i+1}: {destination}")
-        
-        # Handle both single strings and arrays of context terms
-        if isinstance(destination, str):
-            search_query = destination
-        else:
-            # Combine all terms into a single contextual search query
-            search_query = ' '.join(destination)
-        
-        print(f"🔎 Combined search query: '{search_query}'")
-        
         # Make the query human-like to improve text search quality
-        text_query = search_query
-        if lat is not None and lng is not None:
-            text_query = f"best {search_query} near me"
+        text_query = self.search_query
+        if plan.lat is not None and plan.lng is not None:
+            text_query = f"best {self.search_query} near me"
+        self.payload = _build_payload(text_query, plan.lat, plan.lng, plan.radius_m, plan.open_now)
+        self.cache_key_parts = (
+            text_query,
+            plan.lat,
+            plan.lng,
+            _parse_radius_m(plan.radius_m),
+            plan.open_now,
+        )
 
+        print(f"\n🎯 Destination {index+1}: {plan.queries[index]}")
+        print(f"🔎 Combined search query: '{self.search_query}'")
         print(f"   Final text query: '{text_query}'")
-        payload = _build_payload(text_query, lat, lng, radius_m, open_now)
-
-        # Search for this destination
-        page_token = None
-        destination_results = 0
-        
-        while destination_results < results_per_destination:
-            if page_token:
-                payload["pageToken"] = page_token
-            data = _search_text_page(payload)
-
-            places_in_page = len(data.get("places", []))
-            print(f"   📄 Page returned {places_in_page} places")
-
-            for p in data.get("places", []):
-                pid = p.get("id")
-                if not pid or pid in seen:
-                    continue
-                cand = PlaceCandidate.from_api(p)
-
-                # Print each candidate
-                print(f"   📍 {cand.name} - Types: {cand.types} - Rating: {cand.rating}")
-
-                # filter by rating if configured
-                if (
-                    (min_rating is not None)
-                    and (cand.rating is not None)
-                    and (cand.rating < float(min_rating))
-                ):
-                    print(f"      ❌ Filtered out (rating {cand.rating} < {min_rating})")
-                    continue
-
-                out.append(cand)
-                seen.add(pid)
-                destination_results += 1
-                
-                if destination_results >= results_per_destination:
-                    break
 
-            if destination_results >= results_per_destination:
+    async def fetch_next_page(self) -> bool:
+        """Fetch one more page into the buffer. Returns False once exhausted."""
+        if self.exhausted:
+            return False
+
+        page = self.pages_fetched
+        payload = dict(self.payload)
+        if page:
+            payload["pageToken"] = self.page_token
+        fetched = False
+
+        async def fetch() -> Dict[str, Any]:
+            nonlocal fetched
+            fetched = True
+            if page:
+                await asyncio.sleep(PAGE_DELAY_S)
+            async with self.semaphore:
+                return await _search_text_page(payload)
+
+        key = places_cache_key("searchText", *self.cache_key_parts, page=page)
+        try:
+            data = await places_cache.aget_or_fetch(key, fetch)
+        except RuntimeError as e:
+            if not (page and self.last_page_cached):
+                raise
+            # The page token came from a cached page and may have expired
+            print(f"   ⚠️ Destination {self.index+1} follow-up page failed: {e}")
+            self.exhausted = True
+            return False
+        self.pages_fetched += 1
+        self.last_page_cached = not fetched
+
+        places = data.get("places", [])
+        print(f"   📄 Destination {self.index+1} page returned {len(places)} places")
+
+        for p in places:
+            if not p.get("id"):
+                continue
+            cand = PlaceCandidate.from_api(p)
+
+            # Print each candidate
+            print(f"   📍 {cand.name} - Types: {cand.types} - Rating: {cand.rating}")
+
+            # filter by rating if configured
+            if (
+                (self.min_rating is not None)
+                and (cand.rating is not None)
+                and (cand.rating < float(self.min_rating))
+            ):
+                print(f"      ❌ Filtered out (rating {cand.rating} < {self.min_rating})")
+                continue
+
+            self.buffer.append(cand)
+            self.buffered_ids.add(cand.place_id)
+
+        self.page_token = data.get("nextPageToken")
+        if not self.page_token:
+            self.exhausted = True
+        return True
+
+    async def prefetch(self, limit: int) -> None:
+        """Page until `limit` distinct places are buffered or results run out."""
+        while len(self.buffered_ids) < limit and await self.fetch_next_page():
+            pass
+
+    async def take(self, limit: int, seen: set[str]) -> List[PlaceCandidate]:
+        """
+        Take up to `limit` buffered places not in `seen`, in result order,
+        paging further if duplicates left this destination short.
+        """
+        picked: List[PlaceCandidate] = []
+        pos = 0
+        while True:
+            while pos < len(self.buffer) and len(picked) < limit:
+                cand = self.buffer[pos]
+                pos += 1
+                if cand.place_id in seen:
+                    continue
+                picked.append(cand)
+                seen.add(cand.place_id)
+            if len(picked) >= limit or not await self.fetch_next_page():
                 break
+        print(f"🎯 Total results for destination {self.index+1}: {len(picked)}")
+        return picked
 
-            page_token = data.get("nextPageToken")
-            if not page_token:
-                break
 
-            time.sleep(0.5)
-        
-        print(f"🎯 Total results for destination {i+1}: {destination_results}")
+def _open_streams(
+    plan: _SearchPlan, max_concurrency: Optional[int]
+) -> List[_DestinationStream]:
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or MAX_CONCURRENCY))
+    return [_DestinationStream(i, plan, semaphore) for i in range(len(plan.queries))]
 
+
+def _print_summary(out: List[PlaceCandidate]) -> None:
     print(f"\n📊 Total candidates found: {len(out)}")
-    
+
     # Group by type for summary
     type_counts = {}
     for cand in out:
         for place_type in cand.types:
             type_counts[place_type] = type_counts.get(place_type, 0) + 1
-    
+
     print(f"📈 Candidates by type:")
     for ptype, count in sorted(type_counts.items()):
         print(f"   {ptype}: {count}")
 
+
+async def search_async(
+    intent: Dict[str, Any], max_concurrency: Optional[int] = None
+) -> List[PlaceCandidate]:
+    """
+    Async version of `search`. All destinations (and their pagination chains)
+    are fetched concurrently, with at most `max_concurrency` Places requests in
+    flight (default: PLACES_MAX_CONCURRENCY). The result is the same
+    de-duplicated, destination-ordered list the sequential search produced.
+    """
+    plan = _plan_search(intent)
+
+    streams = _open_streams(plan, max_concurrency)
+    await asyncio.gather(*(s.prefetch(plan.results_per_destination) for s in streams))
+
+    # Merge in destination order so earlier destinations keep their places
+    seen: set[str] = set()
+    out: List[PlaceCandidate] = []
+    for stream in streams:
+        out.extend(await stream.take(plan.results_per_destination, seen))
+
+    _print_summary(out)
+
     # Sort results to make LLM selection easier:
     # primary: rating desc, secondary: user_ratings_total desc
     # out.sort(key=lambda c: ((c.rating or 0), (c.user_ratings_total or 0)), reverse=True)
-    return out
\ No newline at end of file
+    return out
+
+
+async def iter_destination_results(
+    intent: Dict[str, Any], max_concurrency: Optional[int] = None
+) -> AsyncIterator[DestinationResult]:
+    """
+    Yield each destination's candidates as soon as its search completes.
+
+    Results arrive in completion order, not destination order. A place is only
+    delivered once: if two destinations return the same place, it goes to
+    whichever finished first. Use `search_async` for the canonical ordering.
+    """
+    plan = _plan_search(intent)
+
+    streams = _open_streams(plan, max_concurrency)
+
+    async def run(stream: _DestinationStream) -> _DestinationStream:
+        await stream.prefetch(plan.results_per_destination)
+        return stream
+
+    tasks = [asyncio.create_task(run(s)) for s in streams]
+    delivered: set[str] = set()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            stream = await next_done
+            candidates = await stream.take(plan.results_per_destination, delivered)
+            yield DestinationResult(
+                index=stream.index,
+                query=stream.search_query,
+                candidates=candidates,
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def search(intent: Dict[str, Any]) -> List[PlaceCandidate]:
+    """
+    intent expects keys:
+      - queries: List[str] or List[List[str]]  (or "categories")
+      - lat, lng, radius_m (optional)
+      - open_now (optional)
+      - min_rating (optional)
+      - max_results (optional)
+
+    Blocking wrapper around `search_async` for sync callers.
+    """
+    return run_sync(search_async(intent))
@@ -0,0 +1,90 @@
+"""
+Health registry for speculative scraping hosts (guessed blog domains etc.)
+
+Hosts that fail DNS or answer with a non-200 status are negatively cached for
+HOST_NEGATIVE_CACHE_TTL_S, and every host has a circuit breaker that opens
+after repeated failures of any kind. Discovery results record which hosts
+actually served events for a city, so later calls only probe those; a
+discovery is only recorded once every candidate gave a definitive answer.
+"""
+import os
+import socket
+from typing import List, Optional
+
+from urllib3.exceptions import NameResolutionError
+
+from services.cache import MISS, LRUTTLCache
+from services.circuit_breaker import get_breaker
+
+HOST_NEGATIVE_CACHE_TTL_S = float(os.getenv("HOST_NEGATIVE_CACHE_TTL_S", "21600"))
+HOST_DISCOVERY_TTL_S = float(os.getenv("HOST_DISCOVERY_TTL_S", "86400"))
+HOST_HEALTH_CACHE_MAX_BYTES = int(os.getenv("HOST_HEALTH_CACHE_MAX_BYTES", str(512 * 1024)))
+
+
+def is_dns_failure(exc: BaseException) -> bool:
+    """True if the exception (or anything it wraps) is a name resolution error."""
+    seen = set()
+    pending = [exc]
+    while pending:
+        err = pending.pop()
+        if err is None or id(err) in seen:
+            continue
+        seen.add(id(err))
+        if isinstance(err, (socket.gaierror, NameResolutionError)):
+            return True
+        # requests wraps urllib3's MaxRetryError, which keeps the cause in .reason
+        pending.extend([err.__cause__, err.__context__, getattr(err, "reason", None)])
+        pending.extend(arg for arg in getattr(err, "args", ()) if isinstance(arg, BaseException))
+    return False
+
+
+class HostHealthRegistry:
+    def __init__(self):
+        self._negative = LRUTTLCache(HOST_HEALTH_CACHE_MAX_BYTES, name="host_health")
+        self._discovered = LRUTTLCache(HOST_HEALTH_CACHE_MAX_BYTES, name="host_discovery")
+
+    def allow(self, host: str) -> bool:
+        """True if the host is worth a request right now."""
+        reason, state = self._negative.get(host)
+        if state != MISS:
+            print(f"[Host Health] Skipping {host}: {reason}")
+            return False
+        if not get_breaker(f"host:{host}").allow():
+            print(f"[Host Health] Skipping {host}: circuit open")
+            return False
+        return True
+
+    def is_known_bad(self, host: str) -> bool:
+        """True if the host recently failed DNS or answered non-200."""
+        _, state = self._negative.get(host)
+        return state != MISS
+
+    def record_success(self, host: str) -> None:
+        get_breaker(f"host:{host}").record_success()
+
+    def record_status(self, host: str, status_code: int) -> None:
+        """Record a non-200 answer; it's cached as a negative result."""
+        self._negative.set(host, f"HTTP {status_code}", HOST_NEGATIVE_CACHE_TTL_S)
+        get_breaker(f"host:{host}").record_failure()
+
+    def record_error(self, host: str, exc: BaseException) -> None:
+        """
+        Record a failed request. DNS failures are cached as negative results;
+        anything else (timeouts, resets) only counts towards the breaker.
+        """
+        if is_dns_failure(exc):
+            self._negative.set(host, "DNS lookup failed", HOST_NEGATIVE_CACHE_TTL_S)
+        get_breaker(f"host:{host}").record_failure()
+
+    def known_good_hosts(self, city: str) -> Optional[List[str]]:
+        """Hosts that served events for the city in the last discovery, or None if not discovered."""
+        hosts, state = self._discovered.get(city.lower())
+        return None if state == MISS else hosts
+
+    def record_discovery(self, city: str, hosts: List[str]) -> None:
+        print(f"[Host Health] {city}: {len(hosts)} host(s) serve events: {hosts}")
+        self._discovered.set(city.lower(), list(hosts), HOST_DISCOVERY_TTL_S)
+
+
+# Global instance
+host_health = HostHealthRegistry()
@@ -0,0 +1,200 @@
+"""
+Pluggable HTML parsing for the scrapers.
+
+The scrapers only need a handful of operations (find by tag and class
+regex, CSS select, stripped text), so each backend wraps its own tree in a
+small node interface with BeautifulSoup's semantics:
+
+- find/find_all search descendants (never the node itself) in document order
+- a class regex matches if it is found in the element's class attribute
+- text() joins every stripped text node, skipping <script> and <style>
+
+Backends: "selectolax" (Lexbor, fastest), "lxml" (needs cssselect) and
+"bs4" (html.parser, pure Python). HTML_PARSER_BACKEND picks one, or "auto"
+uses the fastest one installed.
+"""
+import os
+import importlib.util
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "auto")
+
+# Fastest first; "auto" picks the first one that is installed
+_PREFERENCE = ("selectolax", "lxml", "bs4")
+_REQUIRED_MODULES: Dict[str, Tuple[str, ...]] = {
+    "selectolax": ("selectolax",),
+    "lxml": ("lxml", "cssselect"),
+    "bs4": ("bs4",),
+}
+_TEXT_EXCLUDED_TAGS = ("script", "style")
+
+
+def _class_matches(class_attr: Optional[str], class_: Optional[Pattern]) -> bool:
+    if class_ is None:
+        return True
+    return class_attr is not None and class_.search(class_attr) is not None
+
+
+class Node(ABC):
+    """Backend-independent view of one element."""
+
+    @abstractmethod
+    def find_all(self, tags: Sequence[str], class_: Optional[Pattern] = None, limit: Optional[int] = None) -> List["Node"]:
+        ...
+
+    def find(self, tags: Sequence[str], class_: Optional[Pattern] = None) -> Optional["Node"]:
+        found = self.find_all(tags, class_, limit=1)
+        return found[0] if found else None
+
+    @abstractmethod
+    def select(self, css: str) -> List["Node"]:
+        ...
+
+    @abstractmethod
+    def text(self) -> str:
+        ...
+
+
+# -----------------------------
+# BeautifulSoup (html.parser)
+# -----------------------------
+class SoupNode(Node):
+    def __init__(self, element):
+        self._el = element
+
+    def find_all(self, tags, class_=None, limit=None):
+        if class_ is None:
+            found = self._el.find_all(list(tags), limit=limit)
+        else:
+            found = self._el.find_all(list(tags), class_=class_, limit=limit)
+        return [SoupNode(el) for el in found]
+
+    def select(self, css):
+        return [SoupNode(el) for el in self._el.select(css)]
+
+    def text(self):
+        return self._el.get_text(strip=True)
+
+
+def _parse_bs4(content) -> Node:
+    from bs4 import BeautifulSoup
+
+    return SoupNode(BeautifulSoup(content, "html.parser"))
+
+
+# -----------------------------
+# lxml
+# -----------------------------
+_lxml_text_xpath = None
+
+
+class LxmlNode(Node):
+    def __init__(self, element):
+        self._el = element
+
+    def find_all(self, tags, class_=None, limit=None):
+        found = []
+        for el in self._el.iterdescendants(*tags):
+            if _class_matches(el.get("class"), class_):
+                found.append(LxmlNode(el))
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def select(self, css):
+        # cssselect matches the element itself too; BeautifulSoup doesn't
+        return [LxmlNode(el) for el in self._el.cssselect(css) if el is not self._el]
+
+    def text(self):
+        return "".join(s.strip() for s in _lxml_text_xpath(self._el))
+
+
+def _parse_lxml(content) -> Node:
+    global _lxml_text_xpath
+    import lxml.html
+    from lxml import etree
+
+    if _lxml_text_xpath is None:
+        excluded = " or ".join(f"ancestor::{tag}" for tag in _TEXT_EXCLUDED_TAGS)
+        _lxml_text_xpath = etree.XPath(f"descendant::text()[not({excluded})]")
+    if not content or not content.strip():
+        content = "<html></html>"
+    return LxmlNode(lxml.html.document_fromstring(content))
+
+
+# -----------------------------
+# selectolax (Lexbor)
+# -----------------------------
+class SelectolaxNode(Node):
+    def __init__(self, node):
+        self._node = node
+
+    def find_all(self, tags, class_=None, limit=None):
+        found = []
+        for node in self._node.css(",".join(tags)):
+            # Lexbor matches the node itself too; BeautifulSoup doesn't
+            if node.mem_id == self._node.mem_id:
+                continue
+            if _class_matches(node.attributes.get("class"), class_):
+                found.append(SelectolaxNode(node))
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def select(self, css):
+        return [SelectolaxNode(node) for node in self._node.css(css) if node.mem_id != self._node.mem_id]
+
+    def text(self):
+        return self._node.text(deep=True, separator="", strip=True)
+
+
+def _parse_selectolax(content) -> Node:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(content)
+    # Dropping these up front keeps their contents out of text()
+    tree.strip_tags(list(_TEXT_EXCLUDED_TAGS))
+    return SelectolaxNode(tree.root)
+
+
+_PARSERS: Dict[str, Callable[..., Node]] = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    return [
+        name for name in _PREFERENCE
+        if all(importlib.util.find_spec(module) is not None for module in _REQUIRED_MODULES[name])
+    ]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    name = name or HTML_PARSER_BACKEND
+    available = available_backends()
+    if name == "auto":
+        return available[0] if available else "bs4"
+    if name not in _PARSERS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    if name not in available:
+        fallback = available[0] if available else "bs4"
+        print(f"[HTML Parser] {name} is not installed, using {fallback}")
+        return fallback
+    return name
+
+
+_default_backend: Optional[str] = None
+
+
+def parse(content, backend: Optional[str] = None) -> Node:
+    """Parse an HTML document (bytes or str) and return its root node."""
+    global _default_backend
+    if backend is None:
+        if _default_backend is None:
+            _default_backend = resolve_backend()
+        backend = _default_backend
+    return _PARSERS[backend](content)
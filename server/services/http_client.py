@@ -0,0 +1,190 @@
+"""
+Shared pooled HTTP clients for all outbound API and scraping calls.
+
+Sync callers use one requests.Session; async callers use one httpx.AsyncClient
+per event loop. Both keep connections alive between calls, cap connections per
+host, and share the timeout and retry policy configured below.
+"""
+import os
+import asyncio
+import importlib.util
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT_S = float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "3.05"))
+READ_TIMEOUT_S = float(os.getenv("HTTP_READ_TIMEOUT_S", "10"))
+# Short read timeout for speculative requests (e.g. probing guessed domains)
+PROBE_TIMEOUT_S = float(os.getenv("HTTP_PROBE_TIMEOUT_S", "5"))
+
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.6"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+MAX_HOSTS = int(os.getenv("HTTP_MAX_HOSTS", "20"))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 without it
+HTTP2_ENABLED = (
+    os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT_S, READ_TIMEOUT_S)
+PROBE_TIMEOUT = (CONNECT_TIMEOUT_S, PROBE_TIMEOUT_S)
+
+
+# -----------------------------
+# Sync face
+# -----------------------------
+_session: Optional[requests.Session] = None
+
+
+def _build_session() -> requests.Session:
+    # Only retry on retryable statuses: connection failures (e.g. dead
+    # domains) should fail fast rather than multiply the timeout.
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=0,
+        read=0,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=MAX_HOSTS,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session."""
+    global _session
+    if _session is None:
+        _session = _build_session()
+    return _session
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def close() -> None:
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+# -----------------------------
+# Async face
+# -----------------------------
+class _AsyncPool:
+    """httpx client plus per-host connection caps for one event loop."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=httpx.Timeout(READ_TIMEOUT_S, connect=CONNECT_TIMEOUT_S),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+        )
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        return self.host_slots[host]
+
+
+# httpx clients are bound to the loop they were created on
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_pool() -> _AsyncPool:
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None or pool.client.is_closed:
+        pool = _AsyncPool()
+        _async_pools[loop] = pool
+    return pool
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop."""
+    return _get_pool().client
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+async def arequest(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Async request with the same retry policy as the sync session."""
+    pool = _get_pool()
+    if "timeout" in kwargs and isinstance(kwargs["timeout"], tuple):
+        connect, read = kwargs["timeout"]
+        kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+
+    attempt = 0
+    while True:
+        async with pool.slot(url):
+            response = await pool.client.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+            return response
+        await asyncio.sleep(_retry_delay(response, attempt))
+        attempt += 1
+
+
+async def aget(url: str, **kwargs: Any) -> httpx.Response:
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs: Any) -> httpx.Response:
+    return await arequest("POST", url, **kwargs)
+
+
+async def aclose() -> None:
+    """
+    Close every async client, including those of other loops such as the
+    sync bridge loop. A client is closed on its own loop while that loop runs.
+    """
+    current = asyncio.get_running_loop()
+    pools = list(_async_pools.items())
+    _async_pools.clear()
+    for loop, pool in pools:
+        if loop is current:
+            await pool.client.aclose()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.client.aclose(), loop))
@@ -0,0 +1,407 @@
+"""
+Itinerary scheduler: orienteering with time windows
+
+Given candidate stops with a score, a visit duration and a time window (the
+latest start is the window's close), pick and order the subset that
+maximizes total score between the day's start and end, using travel times
+from route_optimizer.travel_matrix. Arriving early means waiting for the
+window to open.
+- up to SCHEDULE_EXACT_MAX_STOPS candidates: exact dynamic programming over
+  subsets, keeping the earliest finish per (subset, last stop), vectorized
+  over each subset-size layer
+- beyond that: greedy insertion by score^2 / added time, with O(1)
+  feasibility checks (wait / max-shift), improved by swapping routed stops
+  for better unrouted ones
+
+Stops can belong to groups (e.g. an interest, or "meal") and each group can be
+capped, so at most that many of its stops end up in the schedule.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import re
+from dotenv import load_dotenv
+
+import numpy as np
+
+from services.route_optimizer import travel_matrix
+
+load_dotenv()
+
+SCHEDULE_EXACT_MAX_STOPS = int(os.getenv("SCHEDULE_EXACT_MAX_STOPS", "12"))
+# Travel time assumed when either end of a leg has no coordinates
+SCHEDULE_UNKNOWN_TRAVEL_MIN = float(os.getenv("SCHEDULE_UNKNOWN_TRAVEL_MIN", "15"))
+# How late someone may walk into an event that has a start time
+SCHEDULE_EVENT_GRACE_MIN = float(os.getenv("SCHEDULE_EVENT_GRACE_MIN", "15"))
+
+MINUTES_PER_DAY = 24 * 60
+_EPS = 1e-9
+
+
+@dataclass
+class Stop:
+    """A candidate visit; times are minutes since midnight of the schedule's day."""
+    score: float
+    duration: float
+    open: float = 0.0
+    close: float = float("inf")  # latest start
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    groups: Tuple[str, ...] = ()
+
+
+@dataclass
+class Visit:
+    stop: int  # index into the candidate list
+    arrival: float
+    start: float
+    end: float
+    travel_minutes: float
+
+
+def parse_clock(value: str) -> Optional[int]:
+    """
+    Minutes since midnight from the time in a string: "19:30", "7 PM",
+    "Sat, Oct 5 · 7:00 PM", "2025-10-05T19:00:00". None if there is none.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    match = re.search(r"\b(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?[Mm]\b", value)
+    if match:
+        hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+        if match.group(3).lower() == "p":
+            hour += 12
+    else:
+        match = re.search(r"(?:^|[T\s])(\d{1,2}):(\d{2})", value)
+        if not match:
+            return None
+        hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_MONTH = (
+    r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t|tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b\.?"
+)
+_WEEKDAY = r"\b(mon(?:day)?|tue(?:s|sday)?|wed(?:nesday)?|thu(?:rs?|rsday)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)\b"
+
+
+def parse_date(value: str, plan_date: date, today: Optional[date] = None) -> Optional[date]:
+    """
+    The date in an event's time string: "2025-10-05T19:00", "Sat, Oct 5 · 7:00 PM",
+    "5 October", "Today"/"Tomorrow" (relative to `today`, default plan_date).
+    Month and day without a year take the year that puts them closest to
+    plan_date. A weekday alone ("Sat 7 PM") means the next such day from
+    `today`. None if the string has no date.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    text = value.lower()
+    today = today or plan_date
+    try:
+        match = re.search(r"\b(\d{4})-(\d{2})-(\d{2})", text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+        match = re.search(r"\b" + _MONTH + r"\s+(\d{1,2})\b", text)
+        day_first = re.search(r"\b(\d{1,2})\s+" + _MONTH, text)
+        if match or day_first:
+            month_name, day = (match.group(1), match.group(2)) if match else (day_first.group(2), day_first.group(1))
+            month = _MONTHS.index(month_name[:3]) + 1
+            options = []
+            for year in (plan_date.year - 1, plan_date.year, plan_date.year + 1):
+                try:
+                    options.append(date(year, month, int(day)))
+                except ValueError:
+                    continue
+            return min(options, key=lambda d: abs((d - plan_date).days)) if options else None
+    except ValueError:
+        return None
+
+    if re.search(r"\btoday\b|\btonight\b", text):
+        return today
+    if re.search(r"\btomorrow\b", text):
+        return today + timedelta(days=1)
+    match = re.search(_WEEKDAY, text)
+    if match:
+        return today + timedelta(days=(_WEEKDAYS.index(match.group(1)[:3]) - today.weekday()) % 7)
+    return None
+
+
+def opening_window(periods: Sequence[dict], weekday: int) -> Optional[Tuple[float, float]]:
+    """
+    (open, close) minutes for a Google Places `periods` list on `weekday`
+    (Google numbering: 0 = Sunday). A period without a close is open 24 hours.
+    When a place opens several times a day, the widest period is used.
+    None if the place is closed that day.
+    """
+    best = None
+    for period in periods or []:
+        opens = period.get("open") or {}
+        if opens.get("day") != weekday:
+            continue
+        start = opens.get("hour", 0) * 60 + opens.get("minute", 0)
+        closes = period.get("close")
+        if not closes:
+            return 0.0, float(MINUTES_PER_DAY)
+        end = closes.get("hour", 0) * 60 + closes.get("minute", 0)
+        if closes.get("day") != weekday or end <= start:
+            end += MINUTES_PER_DAY  # closes after midnight
+        if best is None or end - start > best[1] - best[0]:
+            best = (float(start), float(end))
+    return best
+
+
+def _travel(stops: List[Stop], origin: Optional[Tuple[float, float]]) -> np.ndarray:
+    """
+    (n + 1) x (n + 1) travel minutes; node 0 is the origin. Without an origin the
+    first stop starts at the day's start, so every leg out of node 0 is free.
+    """
+    known = np.array([s.lat is not None and s.lon is not None for s in stops])
+    points = [(s.lat, s.lon) if k else (0.0, 0.0) for s, k in zip(stops, known)]
+    _, minutes = travel_matrix([origin or (0.0, 0.0)] + points)
+    known = np.concatenate([[origin is not None], known])
+    minutes = np.where(known[:, None] & known[None, :], minutes, SCHEDULE_UNKNOWN_TRAVEL_MIN)
+    np.fill_diagonal(minutes, 0.0)
+    if origin is None:
+        minutes[0, :] = 0.0
+    return minutes
+
+
+def _timeline(
+    order: List[int], stops: List[Stop], travel: Sequence[Sequence[float]], day_start: float
+) -> Optional[List[Visit]]:
+    """Visits for stops taken in `order` (0-based), or None if a window is missed."""
+    visits, node, clock = [], 0, day_start
+    for stop in order:
+        leg = float(travel[node][stop + 1])
+        arrival = clock + leg
+        start = max(arrival, stops[stop].open)
+        if start > stops[stop].close + _EPS:
+            return None
+        clock = start + stops[stop].duration
+        visits.append(Visit(stop, arrival, start, clock, leg))
+        node = stop + 1
+    return visits
+
+
+def _solve_exact(
+    stops: List[Stop], travel: np.ndarray, day_start: float, day_end: float, limits: Dict[str, int]
+) -> List[int]:
+    """
+    DP over subsets: finish[mask, j] is the earliest time a path visiting `mask`
+    can end at j. Waiting is allowed, so an earlier finish never hurts later stops
+    and keeping only the earliest one per state is exact. Group caps only depend
+    on the subset, so they are applied when picking the best mask.
+    """
+    n = len(stops)
+    size = 1 << n
+    duration = np.array([s.duration for s in stops])
+    opens = np.array([s.open for s in stops])
+    latest = np.minimum(np.array([s.close for s in stops]), day_end - duration)
+    leg = travel[1:, 1:]
+
+    finish = np.full((size, n), np.inf)
+    parent = np.full((size, n), -1, dtype=np.int64)
+    first = np.maximum(day_start + travel[0, 1:], opens)
+    ok = first <= latest + _EPS
+    finish[1 << np.arange(n)[ok], np.arange(n)[ok]] = first[ok] + duration[ok]
+
+    popcount = np.array([bin(mask).count("1") for mask in range(size)])
+    for layer in range(2, n + 1):
+        masks = np.nonzero(popcount == layer)[0]
+        for j in range(n):
+            bit = 1 << j
+            layer_masks = masks[(masks & bit) != 0]
+            arrival = finish[layer_masks ^ bit] + leg[:, j]
+            best = np.argmin(arrival, axis=1)
+            start = np.maximum(arrival[np.arange(len(layer_masks)), best], opens[j])
+            ok = start <= latest[j] + _EPS
+            finish[layer_masks[ok], j] = start[ok] + duration[j]
+            parent[layer_masks[ok], j] = best[ok]
+
+    reachable = np.isfinite(finish)
+    if not reachable.any():
+        return []
+    scores = np.array([s.score for s in stops])
+    bits = (np.arange(size)[:, None] >> np.arange(n)) & 1
+    allowed = reachable.any(axis=1)
+    for group, limit in limits.items():
+        members = np.array([group in s.groups for s in stops], dtype=np.int64)
+        allowed &= bits @ members <= limit
+    if not allowed.any():
+        return []
+    mask_score = np.where(allowed, bits @ scores, -np.inf)
+    best_score = mask_score.max()
+    candidates = np.nonzero(mask_score >= best_score - _EPS)[0]
+    # Among equally good subsets, finish as early as possible
+    earliest = finish[candidates].min(axis=1)
+    mask = int(candidates[np.argmin(earliest)])
+    last = int(np.argmin(finish[mask]))
+
+    order = []
+    while last >= 0:
+        order.append(last)
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    return order[::-1]
+
+
+class _Route:
+    """A heuristic route with the wait / max-shift bookkeeping for O(1) insertion checks."""
+
+    def __init__(
+        self, stops: List[Stop], travel: np.ndarray, day_start: float, day_end: float, limits: Dict[str, int]
+    ):
+        self.stops = stops
+        self.limits = limits
+        self.travel = travel.tolist()
+        self.day_start = day_start
+        self.day_end = day_end
+        self.order: List[int] = []
+        self._refresh()
+
+    def _refresh(self) -> None:
+        visits = _timeline(self.order, self.stops, self.travel, self.day_start)
+        self.visits = visits
+        self.wait = [v.start - v.arrival for v in visits]
+        # How far each visit could be pushed back without breaking it or anything after it
+        self.max_shift = [0.0] * len(visits)
+        slack_after = self.day_end - (visits[-1].end if visits else self.day_start)
+        for i in range(len(visits) - 1, -1, -1):
+            own = self.stops[visits[i].stop].close - visits[i].start
+            self.max_shift[i] = min(own, slack_after)
+            slack_after = self.wait[i] + self.max_shift[i]
+
+    def allows(self, stop: int) -> bool:
+        """True if adding `stop` keeps every group within its cap."""
+        groups = [g for g in self.stops[stop].groups if g in self.limits]
+        if not groups:
+            return True
+        counts = Counter(g for routed in self.order for g in self.stops[routed].groups)
+        return all(counts[g] < self.limits[g] for g in groups)
+
+    def insertion(self, stop: int) -> Optional[Tuple[float, int]]:
+        """(added time, position) of the cheapest feasible insertion of `stop`."""
+        if not self.allows(stop):
+            return None
+        s = self.stops[stop]
+        node = stop + 1
+        best = None
+        for position in range(len(self.order) + 1):
+            prev = self.order[position - 1] + 1 if position else 0
+            prev_end = self.visits[position - 1].end if position else self.day_start
+            start = max(prev_end + self.travel[prev][node], s.open)
+            end = start + s.duration
+            if start > s.close + _EPS or end > self.day_end + _EPS:
+                continue
+            if position < len(self.order):
+                nxt = self.order[position] + 1
+                shift = end + self.travel[node][nxt] - (prev_end + self.travel[prev][nxt])
+                if shift > self.wait[position] + self.max_shift[position] + _EPS:
+                    continue
+            else:
+                shift = end - prev_end
+            if best is None or shift < best[0] - _EPS:
+                best = (max(shift, 0.0), position)
+        return best
+
+    def insert(self, stop: int, position: int) -> None:
+        self.order.insert(position, stop)
+        self._refresh()
+
+    def remove(self, stop: int) -> None:
+        self.order.remove(stop)
+        self._refresh()
+
+    @property
+    def score(self) -> float:
+        return sum(self.stops[stop].score for stop in self.order)
+
+
+def _fill(route: _Route, pool: List[int]) -> None:
+    """Greedy insertion: repeatedly add the stop with the best score^2 / added time."""
+    remaining = [stop for stop in pool if stop not in route.order]
+    while remaining:
+        best = None
+        for stop in remaining:
+            found = route.insertion(stop)
+            if found is None:
+                continue
+            shift, position = found
+            ratio = route.stops[stop].score ** 2 / max(shift, 1.0)
+            if best is None or ratio > best[0] + _EPS:
+                best = (ratio, stop, position)
+        if best is None:
+            return
+        _, stop, position = best
+        route.insert(stop, position)
+        remaining.remove(stop)
+
+
+def _solve_heuristic(
+    stops: List[Stop], travel: np.ndarray, day_start: float, day_end: float, limits: Dict[str, int]
+) -> List[int]:
+    pool = list(range(len(stops)))
+    route = _Route(stops, travel, day_start, day_end, limits)
+    _fill(route, pool)
+
+    # Swap a routed stop for a better unrouted one whenever the total score grows
+    improved = True
+    while improved:
+        improved = False
+        outside = sorted((s for s in pool if s not in route.order), key=lambda s: -stops[s].score)
+        for candidate in outside:
+            for routed in sorted(route.order, key=lambda s: stops[s].score):
+                if stops[routed].score >= stops[candidate].score:
+                    break
+                before, trial = route.score, list(route.order)
+                route.remove(routed)
+                found = route.insertion(candidate)
+                if found is not None:
+                    route.insert(candidate, found[1])
+                    _fill(route, [s for s in pool if s != routed])
+                if route.score > before + _EPS:
+                    improved = True
+                    break
+                route.order = trial
+                route._refresh()
+            if improved:
+                break
+    return route.order
+
+
+def schedule(
+    stops: List[Stop],
+    day_start: float,
+    day_end: float,
+    origin: Optional[Tuple[float, float]] = None,
+    group_limits: Optional[Dict[str, int]] = None,
+) -> List[Visit]:
+    """
+    Choose and order the stops that maximize total score within [day_start, day_end]
+
+    Args:
+        stops: Candidates with score, duration, time window and (optional) coordinates
+        day_start: Minutes since midnight the day starts
+        day_end: Minutes since midnight everything must be finished by
+        origin: (lat, lon) the day starts from; without it the first stop starts at day_start
+        group_limits: Group -> most stops of that group in the schedule
+
+    Returns:
+        Visits in order, with arrival/start/end times and travel minutes from the previous point
+    """
+    if not stops:
+        return []
+    travel = _travel(stops, origin)
+    limits = group_limits or {}
+    if len(stops) <= SCHEDULE_EXACT_MAX_STOPS:
+        order = _solve_exact(stops, travel, day_start, day_end, limits)
+    else:
+        order = _solve_heuristic(stops, travel, day_start, day_end, limits)
+    return _timeline(order, stops, travel, day_start) or []
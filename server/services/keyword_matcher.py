@@ -0,0 +1,55 @@
+"""
+Multi-keyword substring matching (Aho-Corasick)
+
+Finds every keyword occurring anywhere in a text in one pass over the text,
+however many keywords there are. Same result as
+{k for k in keywords if k in text}.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        # Trie over the keywords; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Set[str]] = [set()]
+        for keyword in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._output.append(set())
+                state = nxt
+            self._output[state].add(keyword)
+
+        # Failure links, breadth first; outputs inherit the suffix state's
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords occurring in `text`."""
+        found: Set[str] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
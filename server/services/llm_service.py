@@ -2,6 +2,7 @@ from google import genai
 import os
 import json
 import re
+from services.concurrency import run_sync
 from services.mongodb_service import mongodb_service
 
 
@@ -12,9 +13,10 @@ def _get_gemini_client() -> genai.Client:
     return genai.Client(api_key=api_key)
 
 
-def _get_user_keywords(user_id: str) -> dict:
+async def load_user_context(user_id: str) -> dict:
     """
-    Get user context including preferences and keywords from MongoDB
+    Get user context including preferences and keywords from MongoDB.
+    Async callers should load this once and pass it to parse_intent/select_stops.
     """
     if not user_id:
         print(f"[LLM] No user_id provided")
@@ -23,7 +25,7 @@ def _get_user_keywords(user_id: str) -> dict:
     try:
         print(f"[LLM] Looking up user profile for auth0_user_id: {user_id}")
         # Use auth0_user_id as the field name for the lookup
-        profile = mongodb_service.get_user_profile_by_auth0_id(user_id)
+        profile = await mongodb_service.get_user_profile_by_auth0_id(user_id)
         
         # Debug: Print the complete profile data
         print(f"[LLM] Complete user profile from MongoDB: {profile}")
@@ -43,6 +45,11 @@ def _get_user_keywords(user_id: str) -> dict:
         return {}
 
 
+def _get_user_keywords(user_id: str) -> dict:
+    """Blocking wrapper around `load_user_context` for sync callers."""
+    return run_sync(load_user_context(user_id))
+
+
 def _resolve_personalized_locations(text: str, user_context: dict) -> str:
     """
     Replace personalized keywords with actual addresses from user preferences
@@ -76,15 +83,19 @@ def _resolve_personalized_locations(text: str, user_context: dict) -> str:
     return resolved_text
 
 
-def parse_intent(starting_location: str, text: str, user_id: str = None) -> dict:
+def parse_intent(
+    starting_location: str, text: str, user_id: str = None, user_context: dict = None
+) -> dict:
     """
     Use Gemini to parse user intent from transcribed text with keyword resolution.
+    Pass a preloaded `user_context` to skip the profile lookup.
     """
     print(f"[LLM] parse_intent called with user_id: {user_id}")
     print(f"[LLM] Original text: '{text}'")
     
     # Get user context and resolve personalized locations
-    user_context = _get_user_keywords(user_id) if user_id else {}
+    if user_context is None:
+        user_context = _get_user_keywords(user_id) if user_id else {}
     resolved_text = _resolve_personalized_locations(text, user_context)
     
     print(f"[LLM] Resolved text: '{resolved_text}'")
@@ -126,7 +137,9 @@ def parse_intent(starting_location: str, text: str, user_id: str = None) -> dict
     return intent_data
 
 
-def select_stops(intent: dict, candidates: list, user_id: str = None) -> list:
+def select_stops(
+    intent: dict, candidates: list, user_id: str = None, user_context: dict = None
+) -> list:
     """
     Use Gemini to select and rank stops from candidate places based on user intent.
 
@@ -134,11 +147,13 @@ def select_stops(intent: dict, candidates: list, user_id: str = None) -> list:
         intent: Parsed intent dictionary from parse_intent()
         candidates: List of candidate places from Google Places API
         user_id: User's Auth0 ID for accessing personalized preferences
+        user_context: Preloaded result of load_user_context(user_id), if available
     Returns:
         list: Selected and ranked stops as a list of place dictionaries
     """
     # Get user context for personalized recommendations
-    user_context = _get_user_keywords(user_id) if user_id else {}
+    if user_context is None:
+        user_context = _get_user_keywords(user_id) if user_id else {}
     
     system_rules = (
         "You are an expert route planner. "
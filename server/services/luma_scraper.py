@@ -1,21 +1,40 @@
 """
 Luma and blog scraping service for real activity data with Cohere interpretation
 """
-import requests
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import cohere
+from services import html_parser, http_client
+from services.host_health import host_health, is_dns_failure
+from services.scrape_cache import scrape_cache
 
 load_dotenv()
 
 # Initialize Cohere client
 co = cohere.Client(os.getenv("COHERE_API_KEY"))
 
+# Scraped events are interpreted in chunks of this many per Cohere prompt,
+# with up to EVENT_INTERPRET_CONCURRENCY prompts in flight
+EVENT_INTERPRET_BATCH_SIZE = int(os.getenv("EVENT_INTERPRET_BATCH_SIZE", "10"))
+EVENT_INTERPRET_CONCURRENCY = int(os.getenv("EVENT_INTERPRET_CONCURRENCY", "4"))
+
+# Events whose rule-based confidence reaches this threshold skip Cohere entirely
+EVENT_HEURISTIC_CONFIDENCE_THRESHOLD = float(os.getenv("EVENT_HEURISTIC_CONFIDENCE_THRESHOLD", "0.8"))
+
+ACTIVITY_TYPES = {"food", "scenery", "physical", "cultural", "shopping", "entertainment"}
+INDOOR_OUTDOOR_VALUES = {"indoor", "outdoor", "mixed"}
+
+def _event_place_id(source: str, title: str) -> str:
+    """Place ID for a scraped event, the same in every process (unlike hash())"""
+    return f"{source}_{hashlib.sha1(title.encode()).hexdigest()[:16]}"
+
 def fetch_luma_events(city: str, lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
     """
     Scrape events from Luma (luma.com) for a given city
@@ -32,22 +51,23 @@ def fetch_luma_events(city: str, lat: float = None, lon: float = None) -> List[D
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(search_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Look for event cards or listings
-        event_elements = soup.find_all(['div', 'article'], class_=re.compile(r'event|card|listing'))
-        
-        for element in event_elements[:10]:  # Limit to 10 events
-            try:
-                event_data = _extract_luma_event_data(element, city)
-                if event_data:
-                    events.append(event_data)
-            except Exception as e:
-                print(f"[Luma] Error extracting event: {e}")
-                continue
+        result = scrape_cache.get(search_url, headers=headers)
+        if result.unchanged:
+            events = result.cached_events
+        else:
+            result.response.raise_for_status()
+            
+            raw_events = _parse_luma_events(result.response.content, city)
+            
+            # Structure all events together: rules first, batched Cohere for the rest
+            for raw_event, structured in zip(raw_events, structure_events(raw_events, city)):
+                print(f"[Luma] Structured: {raw_event['title']} -> {structured.get('activity_type', 'unknown')} (${structured.get('cost', 0)})")
+                events.append({
+                    "raw_name": raw_event["title"],
+                    "place_id": _event_place_id("luma", raw_event["title"]),
+                    "structured": structured
+                })
+            scrape_cache.store(search_url, result, events)
                 
     except Exception as e:
         print(f"[Luma] Error fetching from Luma: {e}")
@@ -55,55 +75,139 @@ def fetch_luma_events(city: str, lat: float = None, lon: float = None) -> List[D
     print(f"[Luma] Found {len(events)} events")
     return events
 
+def _parse_luma_events(content, city: str, backend: str = None) -> List[Dict[str, Any]]:
+    """Parse raw event fields from a Luma search page"""
+    root = html_parser.parse(content, backend)
+    
+    # Look for event cards or listings
+    event_elements = root.find_all(['div', 'article'], class_=re.compile(r'event|card|listing'), limit=10)
+    
+    raw_events = []
+    for element in event_elements[:10]:  # Limit to 10 events
+        try:
+            raw_event = _extract_luma_event_data(element, city)
+            if raw_event:
+                raw_events.append(raw_event)
+        except Exception as e:
+            print(f"[Luma] Error extracting event: {e}")
+            continue
+    return raw_events
+
 def _extract_luma_event_data(element, city: str) -> Dict[str, Any]:
-    """Extract event data from a Luma HTML element using Cohere for interpretation"""
+    """Extract the raw event fields from a Luma HTML element (interpreted later in a batch)"""
     try:
         # Extract raw text data
         title_elem = element.find(['h1', 'h2', 'h3', 'h4'], class_=re.compile(r'title|name|event'))
-        title = title_elem.get_text(strip=True) if title_elem else "Luma Event"
+        title = title_elem.text() if title_elem else "Luma Event"
         
         date_elem = element.find(['time', 'span', 'div'], class_=re.compile(r'date|time'))
-        date_text = date_elem.get_text(strip=True) if date_elem else None
+        date_text = date_elem.text() if date_elem else None
         
         location_elem = element.find(['span', 'div'], class_=re.compile(r'location|venue|place'))
-        location = location_elem.get_text(strip=True) if location_elem else city
+        location = location_elem.text() if location_elem else city
         
         desc_elem = element.find(['p', 'div'], class_=re.compile(r'description|summary'))
-        description = desc_elem.get_text(strip=True) if desc_elem else ""
+        description = desc_elem.text() if desc_elem else ""
         
         price_elem = element.find(['span', 'div'], class_=re.compile(r'price|cost|ticket'))
-        price_text = price_elem.get_text(strip=True) if price_elem else "Free"
-        
-        # Combine all text for Cohere analysis
-        full_text = f"Title: {title}\nDate: {date_text}\nLocation: {location}\nDescription: {description}\nPrice: {price_text}"
-        
-        # Use Cohere to interpret the event data
-        structured = _interpret_event_with_cohere(full_text, city)
-        
-        print(f"[Luma] Cohere interpreted: {title} -> {structured.get('activity_type', 'unknown')} (${structured.get('cost', 0)})")
+        price_text = price_elem.text() if price_elem else None
         
         return {
-            "raw_name": title,
-            "place_id": f"luma_{hash(title)}",
-            "structured": structured
+            "title": title,
+            "date_text": date_text,
+            "location": location,
+            "description": description,
+            "price_text": price_text
         }
         
     except Exception as e:
         print(f"[Luma] Error extracting event data: {e}")
         return None
 
-def _interpret_event_with_cohere(event_text: str, city: str) -> Dict[str, Any]:
-    """Use Cohere to interpret event data and extract structured information"""
+_structuring_stats = {"rules": 0, "cohere": 0, "cohere_fallback": 0}
+_structuring_stats_lock = threading.Lock()
+
+def _count_structured(tier: str, count: int = 1):
+    with _structuring_stats_lock:
+        _structuring_stats[tier] += count
+
+def get_structuring_stats() -> Dict[str, Any]:
+    """How many events each structuring tier has handled since startup"""
+    with _structuring_stats_lock:
+        stats = dict(_structuring_stats)
+    stats["threshold"] = EVENT_HEURISTIC_CONFIDENCE_THRESHOLD
+    return stats
+
+def structure_events(raw_events: List[Dict[str, Any]], city: str) -> List[Dict[str, Any]]:
+    """
+    Two-tier structuring: the text heuristics handle every event whose rule-based
+    confidence reaches EVENT_HEURISTIC_CONFIDENCE_THRESHOLD; only the rest are
+    sent to Cohere (in batches). Returns one structured dict per raw event, in order.
+    """
+    structured_events = [_heuristic_event_interpretation(raw_event, city) for raw_event in raw_events]
+    uncertain = [
+        i for i, structured in enumerate(structured_events)
+        if structured["confidence"] < EVENT_HEURISTIC_CONFIDENCE_THRESHOLD
+    ]
+    _count_structured("rules", len(raw_events) - len(uncertain))
+    print(f"[Event Structuring] {len(raw_events) - len(uncertain)} by rules, {len(uncertain)} sent to Cohere (threshold {EVENT_HEURISTIC_CONFIDENCE_THRESHOLD})")
+    
+    if uncertain:
+        interpreted = interpret_events_batch([raw_events[i] for i in uncertain], city)
+        for i, structured in zip(uncertain, interpreted):
+            structured_events[i] = structured
+    return structured_events
+
+def _event_text(raw_event: Dict[str, Any]) -> str:
+    """Combine the raw event fields into one text block for Cohere"""
+    text = (
+        f"Title: {raw_event['title']}\nDate: {raw_event['date_text']}\n"
+        f"Location: {raw_event['location']}\nDescription: {raw_event['description']}"
+    )
+    if raw_event.get("price_text") is not None:
+        text += f"\nPrice: {raw_event['price_text']}"
+    return text
+
+def interpret_events_batch(raw_events: List[Dict[str, Any]], city: str) -> List[Dict[str, Any]]:
+    """
+    Interpret scraped events with Cohere, EVENT_INTERPRET_BATCH_SIZE events per prompt.
+    Returns one structured dict per raw event, in order. Events that Cohere
+    fails on or returns invalid data for get the text heuristics instead.
+    """
+    if not raw_events:
+        return []
+    
+    chunks = [
+        raw_events[i:i + EVENT_INTERPRET_BATCH_SIZE]
+        for i in range(0, len(raw_events), EVENT_INTERPRET_BATCH_SIZE)
+    ]
+    print(f"[Event Interpreter] Interpreting {len(raw_events)} events in {len(chunks)} Cohere calls")
+    
+    if len(chunks) == 1:
+        results = [_interpret_chunk(chunks[0], city)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(EVENT_INTERPRET_CONCURRENCY, len(chunks))) as pool:
+            results = list(pool.map(lambda chunk: _interpret_chunk(chunk, city), chunks))
+    
+    return [structured for chunk_result in results for structured in chunk_result]
+
+def _interpret_chunk(raw_events: List[Dict[str, Any]], city: str) -> List[Dict[str, Any]]:
+    """One Cohere call for a chunk of events, validated item by item"""
+    items = []
     try:
+        listing = "\n\n".join(
+            f"Event {i}:\n{_event_text(raw_event)}" for i, raw_event in enumerate(raw_events)
+        )
         prompt = f"""
-        Analyze this event data and extract structured information:
+        Analyze these {len(raw_events)} events and extract structured information for each:
         
-        {event_text}
+        {listing}
         
         City: {city}
         
-        Return a JSON object with these fields:
-        {{
+        Return ONLY a JSON array with one object per event, in the same order:
+        [{{
+            "index": "the event number above",
             "title": "event title",
             "location": "full location",
             "start_time": "date/time string or null",
@@ -115,7 +219,7 @@ def _interpret_event_with_cohere(event_text: str, city: str) -> Dict[str, Any]:
             "confidence": "0.0-1.0",
             "description": "brief description",
             "highlights": "key features"
-        }}
+        }}]
         
         Guidelines:
         - Cost should be realistic and varied (not all the same)
@@ -126,78 +230,104 @@ def _interpret_event_with_cohere(event_text: str, city: str) -> Dict[str, Any]:
         """
         
         response = co.chat(model="command-r-plus", message=prompt)
-        
-        # Handle empty or malformed responses
-        if not response.text or response.text.strip() == "":
-            print(f"[Luma] Empty response from Cohere")
-            return {
-                "title": "Luma Event",
-                "location": city,
-                "start_time": None,
-                "duration_hours": 2.0,
-                "cost": 0,
-                "activity_type": "entertainment",
-                "indoor_outdoor": "mixed",
-                "energy_level": 5,
-                "confidence": 0.3,
-                "description": "Local event",
-                "highlights": "Unknown"
-            }
-        
-        try:
-            structured_data = json.loads(response.text)
-        except json.JSONDecodeError as e:
-            print(f"[Luma] JSON decode error: {e}")
-            print(f"[Luma] Raw response: {response.text[:200]}...")
-            return {
-                "title": "Luma Event",
-                "location": city,
-                "start_time": None,
-                "duration_hours": 2.0,
-                "cost": 0,
-                "activity_type": "entertainment",
-                "indoor_outdoor": "mixed",
-                "energy_level": 5,
-                "confidence": 0.3,
-                "description": "Local event",
-                "highlights": "Unknown"
-            }
-        
-        # Ensure required fields exist
-        structured_data.setdefault("title", "Luma Event")
-        structured_data.setdefault("location", city)
-        structured_data.setdefault("start_time", None)
-        structured_data.setdefault("duration_hours", 2.0)
-        structured_data.setdefault("cost", 0)
-        structured_data.setdefault("activity_type", "entertainment")
-        structured_data.setdefault("indoor_outdoor", "mixed")
-        structured_data.setdefault("energy_level", 5)
-        structured_data.setdefault("confidence", 0.7)
-        structured_data.setdefault("description", "")
-        structured_data.setdefault("highlights", "")
-        
-        return structured_data
-        
+        items = _parse_json_array(response.text or "")
     except Exception as e:
-        print(f"[Luma] Cohere interpretation error: {e}")
-        # Fallback to basic extraction
-        return {
-            "title": "Luma Event",
-            "location": city,
-            "start_time": None,
-            "duration_hours": 2.0,
-            "cost": 0,
-            "activity_type": "entertainment",
-            "indoor_outdoor": "mixed",
-            "energy_level": 5,
-            "confidence": 0.3,
-            "description": "Local event",
-            "highlights": "Unknown"
-        }
+        print(f"[Event Interpreter] Cohere interpretation error: {e}")
+    
+    # Match items back to events by index, falling back to position
+    by_index = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("index", position))
+        except (TypeError, ValueError):
+            index = position
+        by_index.setdefault(index, item)
+    
+    structured_events = []
+    for i, raw_event in enumerate(raw_events):
+        structured = _validate_interpreted_event(by_index.get(i), raw_event, city)
+        if structured is None:
+            print(f"[Event Interpreter] Using heuristics for: {raw_event['title']}")
+            structured = _heuristic_event_interpretation(raw_event, city)
+            _count_structured("cohere_fallback")
+        else:
+            _count_structured("cohere")
+        structured_events.append(structured)
+    return structured_events
+
+def _parse_json_array(text: str) -> List[Any]:
+    """Pull the JSON array out of a model response ([] if there isn't one)"""
+    match = re.search(r'\[.*\]', text, re.DOTALL)
+    if not match:
+        print(f"[Event Interpreter] No JSON array in response: {text[:200]}...")
+        return []
+    try:
+        parsed = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        print(f"[Event Interpreter] JSON decode error: {e}")
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+def _validate_interpreted_event(item: Optional[Dict[str, Any]], raw_event: Dict[str, Any], city: str) -> Optional[Dict[str, Any]]:
+    """Coerce one Cohere item into the structured event shape; None if unusable"""
+    if not isinstance(item, dict):
+        return None
+    try:
+        duration_hours = float(item.get("duration_hours", 2.0))
+        cost = float(item.get("cost", 0))
+        energy_level = int(float(item.get("energy_level", 5)))
+        confidence = float(item.get("confidence", 0.7))
+    except (TypeError, ValueError):
+        return None
+    
+    full_text = _event_text(raw_event)
+    activity_type = str(item.get("activity_type", "")).lower()
+    if activity_type not in ACTIVITY_TYPES:
+        activity_type = _determine_activity_type_from_text(full_text)
+    indoor_outdoor = str(item.get("indoor_outdoor", "")).lower()
+    if indoor_outdoor not in INDOOR_OUTDOOR_VALUES:
+        indoor_outdoor = _determine_indoor_outdoor_from_text(full_text)
+    
+    return {
+        "title": item.get("title") or raw_event["title"],
+        "location": item.get("location") or raw_event["location"] or city,
+        "start_time": item.get("start_time") or raw_event["date_text"],
+        "duration_hours": max(duration_hours, 0.5),
+        "cost": max(cost, 0),
+        "activity_type": activity_type,
+        "indoor_outdoor": indoor_outdoor,
+        "energy_level": min(max(energy_level, 1), 10),
+        "confidence": min(max(confidence, 0.0), 1.0),
+        "description": item.get("description") or "",
+        "highlights": item.get("highlights") or ""
+    }
 
-def fetch_local_blog_events(city: str, lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
+def _heuristic_event_interpretation(raw_event: Dict[str, Any], city: str) -> Dict[str, Any]:
+    """Structure an event from its raw text with the rule-based extractors"""
+    full_text = _event_text(raw_event)
+    activity_type = _determine_activity_type_from_text(full_text)
+    return {
+        "title": raw_event["title"],
+        "location": raw_event["location"] or city,
+        "start_time": raw_event["date_text"],
+        "duration_hours": 2.0,
+        "cost": _estimate_cost_from_text(raw_event.get("price_text")),
+        "activity_type": activity_type,
+        "indoor_outdoor": _determine_indoor_outdoor_from_text(full_text),
+        "energy_level": _estimate_energy_level_from_text(full_text),
+        "confidence": _heuristic_confidence(raw_event, activity_type),
+        "description": raw_event["description"] or "Local event",
+        "highlights": ""
+    }
+
+def fetch_local_blog_events(city: str, lat: float = None, lon: float = None, discover: bool = False) -> List[Dict[str, Any]]:
     """
-    Scrape events from local blogs and event websites
+    Scrape events from local blogs and event websites.
+    Only hosts that served events for this city before are probed; the full
+    candidate list is probed (and the result recorded) when the city hasn't
+    been discovered yet, its discovery has expired, or `discover` is set.
     """
     print(f"[Blog Scraper] Fetching events for {city}")
     
@@ -211,30 +341,80 @@ def fetch_local_blog_events(city: str, lat: float = None, lon: float = None) ->
         f"{city.lower()}happening.com"
     ]
     
+    known_good = host_health.known_good_hosts(city)
+    discovering = discover or known_good is None
+    if not discovering:
+        blog_patterns = [pattern for pattern in blog_patterns if pattern in known_good]
+    
+    # Pages that changed since the last scrape, with the raw events parsed from them
+    changed_pages = []
+    good_hosts = []
+    # Set when a host gave no definitive answer (open breaker, timeout, reset),
+    # so the discovery would wrongly drop it
+    inconclusive = False
     for pattern in blog_patterns:
+        if not host_health.allow(pattern):
+            inconclusive = inconclusive or not host_health.is_known_bad(pattern)
+            continue
+        url = f"https://{pattern}"
         try:
-            url = f"https://{pattern}"
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                events.extend(_scrape_blog_events(response.content, city))
-                
+            result = scrape_cache.get(url, headers=headers, timeout=http_client.PROBE_TIMEOUT)
         except Exception as e:
             print(f"[Blog Scraper] Could not fetch {pattern}: {e}")
+            host_health.record_error(pattern, e)
+            inconclusive = inconclusive or not is_dns_failure(e)
+            continue
+        
+        if result.unchanged:
+            host_health.record_success(pattern)
+            events.extend(result.cached_events)
+            if result.cached_events:
+                good_hosts.append(pattern)
+            continue
+        
+        if result.response.status_code != 200:
+            host_health.record_status(pattern, result.response.status_code)
             continue
+        
+        host_health.record_success(pattern)
+        host_events = _scrape_blog_events(result.response.content, city)
+        if host_events:
+            good_hosts.append(pattern)
+        changed_pages.append((url, result, host_events))
+    
+    if discovering and not inconclusive:
+        host_health.record_discovery(city, good_hosts)
+    elif discovering:
+        print(f"[Blog Scraper] Not recording discovery for {city}: some hosts gave no definitive answer")
+    
+    # Structure every changed blog's events together: rules first, batched Cohere for the rest
+    raw_events = [raw_event for _, _, page_events in changed_pages for raw_event in page_events]
+    structured_events = iter(structure_events(raw_events, city))
+    for url, result, page_events in changed_pages:
+        page_structured = []
+        for raw_event, structured in zip(page_events, structured_events):
+            print(f"[Blog Scraper] Structured: {raw_event['title']} -> {structured.get('activity_type', 'unknown')} (${structured.get('cost', 0)})")
+            page_structured.append({
+                "raw_name": raw_event["title"],
+                "place_id": _event_place_id("blog", raw_event["title"]),
+                "structured": structured
+            })
+        scrape_cache.store(url, result, page_structured)
+        events.extend(page_structured)
     
     print(f"[Blog Scraper] Found {len(events)} events from blogs")
     return events
 
-def _scrape_blog_events(content, city: str) -> List[Dict[str, Any]]:
-    """Scrape events from blog content"""
+def _scrape_blog_events(content, city: str, backend: str = None) -> List[Dict[str, Any]]:
+    """Scrape raw event fields from blog content"""
     events = []
     
     try:
-        soup = BeautifulSoup(content, 'html.parser')
+        root = html_parser.parse(content, backend)
         
         # Look for common event patterns
         event_selectors = [
@@ -246,7 +426,7 @@ def _scrape_blog_events(content, city: str) -> List[Dict[str, Any]]:
         ]
         
         for selector in event_selectors:
-            elements = soup.select(selector)
+            elements = root.select(selector)
             for element in elements[:5]:  # Limit per selector
                 event_data = _extract_blog_event_data(element, city)
                 if event_data:
@@ -258,33 +438,27 @@ def _scrape_blog_events(content, city: str) -> List[Dict[str, Any]]:
     return events
 
 def _extract_blog_event_data(element, city: str) -> Dict[str, Any]:
-    """Extract event data from blog HTML element using Cohere interpretation"""
+    """Extract the raw event fields from a blog HTML element (interpreted later in a batch)"""
     try:
         # Extract raw text data
         title_elem = element.find(['h1', 'h2', 'h3', 'h4', 'a'])
-        title = title_elem.get_text(strip=True) if title_elem else "Local Event"
+        title = title_elem.text() if title_elem else "Local Event"
         
         date_elem = element.find(['time', 'span'], class_=re.compile(r'date|time'))
-        date_text = date_elem.get_text(strip=True) if date_elem else None
+        date_text = date_elem.text() if date_elem else None
         
         location_elem = element.find(['span', 'div'], class_=re.compile(r'location|venue'))
-        location = location_elem.get_text(strip=True) if location_elem else city
+        location = location_elem.text() if location_elem else city
         
         desc_elem = element.find(['p', 'div'], class_=re.compile(r'description|summary'))
-        description = desc_elem.get_text(strip=True) if desc_elem else ""
-        
-        # Combine all text for Cohere analysis
-        full_text = f"Title: {title}\nDate: {date_text}\nLocation: {location}\nDescription: {description}"
-        
-        # Use Cohere to interpret the blog event data
-        structured = _interpret_event_with_cohere(full_text, city)
-        
-        print(f"[Blog Scraper] Cohere interpreted: {title} -> {structured.get('activity_type', 'unknown')} (${structured.get('cost', 0)})")
+        description = desc_elem.text() if desc_elem else ""
         
         return {
-            "raw_name": title,
-            "place_id": f"blog_{hash(title)}",
-            "structured": structured
+            "title": title,
+            "date_text": date_text,
+            "location": location,
+            "description": description,
+            "price_text": None
         }
         
     except Exception as e:
@@ -358,6 +532,21 @@ def _estimate_energy_level_from_text(text: str) -> int:
     else:
         return 5  # Default moderate energy
 
+def _heuristic_confidence(raw_event: Dict[str, Any], activity_type: str) -> float:
+    """Combined confidence of the rule-based extraction for one event"""
+    confidence = _calculate_scraped_confidence(raw_event["title"], raw_event["date_text"], raw_event["location"])
+    
+    # An explicit price means the cost estimate isn't a guess
+    price_text = (raw_event.get("price_text") or "").lower()
+    if "free" in price_text or re.search(r'\$\d', price_text):
+        confidence += 0.1
+    
+    # No keyword matched, so the activity type is a guess
+    if activity_type == "general":
+        confidence -= 0.3
+    
+    return round(max(0.0, min(confidence, 1.0)), 2)
+
 def _calculate_scraped_confidence(title: str, date_text: str, location: str) -> float:
     """Calculate confidence score for scraped data"""
     confidence = 0.5  # Base confidence
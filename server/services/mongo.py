@@ -1,12 +1,135 @@
-from pymongo import MongoClient
+"""
+Async MongoDB access shared by every service.
+
+All services go through get_database(), backed by one Motor client per event
+loop (Motor clients are bound to the loop they were created on). Every client
+uses the pool settings below. Tests can point the layer at another database,
+e.g. a mongomock_motor client, with set_database().
+"""
 import os
+import asyncio
+import weakref
+from typing import Any, Optional
+
 from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
 
 load_dotenv()
-MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["sidequest_db"]  # one DB for everything
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "sidequest_db")  # one DB for everything
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Cached structured activities expire this long after they were last written
+ACTIVITY_CACHE_TTL_S = int(os.getenv("ACTIVITY_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncIOMotorClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_database_override: Optional[Any] = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            io_loop=loop,
+        )
+        _clients[loop] = client
+    return client
+
+
+def get_database():
+    if _database_override is not None:
+        return _database_override
+    return get_client()[MONGO_DB_NAME]
+
+
+def set_database(database: Optional[Any]) -> None:
+    """Use `database` for all collections (None restores the real client)."""
+    global _database_override
+    _database_override = database
+
 
 # Collections
-user_profiles_col = db["user_profiles"]  # used app-wide
-activities_col = db["activities"]        # optional Sidequest cache
\ No newline at end of file
+def user_profiles_collection():
+    return get_database()["user_profiles"]  # used app-wide
+
+
+def activities_collection():
+    return get_database()["activities"]  # optional Sidequest cache
+
+
+def event_index_collection():
+    return get_database()["event_index"]  # structured events kept warm by services.event_crawler
+
+
+async def _drop_duplicate_place_ids() -> int:
+    """
+    Keep the newest cache document per place_id. Before the cache was upserted,
+    the same place could be inserted more than once, which blocks the unique index.
+    """
+    activities = activities_collection()
+    pipeline = [
+        {"$sort": {"_id": -1}},
+        {"$group": {"_id": "$place_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    stale = []
+    async for group in activities.aggregate(pipeline):
+        stale.extend(group["ids"][1:])
+    if not stale:
+        return 0
+    result = await activities.delete_many({"_id": {"$in": stale}})
+    return result.deleted_count
+
+
+async def ensure_indexes() -> None:
+    """
+    Create the indexes the services rely on (no-op if they already exist).
+    Each index is created on its own, so one failure doesn't skip the rest.
+    """
+    activities = activities_collection()
+    try:
+        removed = await _drop_duplicate_place_ids()
+        if removed:
+            print(f"[Mongo] Removed {removed} duplicate activity cache documents")
+    except Exception as e:
+        print(f"[Mongo] ERROR: could not remove duplicate activity cache documents: {e}")
+
+    indexes = [
+        ("activities.place_id (unique)",
+         lambda: activities.create_index([("place_id", ASCENDING)], unique=True)),
+        ("activities.cached_at (TTL)",
+         lambda: activities.create_index([("cached_at", ASCENDING)], expireAfterSeconds=ACTIVITY_CACHE_TTL_S)),
+        ("event_index.city+source (unique)",
+         lambda: event_index_collection().create_index([("city", ASCENDING), ("source", ASCENDING)], unique=True)),
+    ]
+    failed = 0
+    for name, create in indexes:
+        try:
+            await create()
+        except Exception as e:
+            failed += 1
+            print(f"[Mongo] ERROR: could not create index {name}: {e}")
+    if failed:
+        print(f"[Mongo] ERROR: {failed}/{len(indexes)} indexes missing, see above")
+    else:
+        print("[Mongo] Indexes ensured")
+
+
+def close() -> None:
+    """Close every client, including those created on the sync bridge loop."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        client.close()
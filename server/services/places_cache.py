@@ -0,0 +1,166 @@
+"""
+Geohash-tiled cache for Google Places API responses.
+
+Nearby requests for the same query land in the same geohash cell and radius
+bucket, so they share one cached response. Stale entries are served
+immediately while a background refresh fetches a new copy
+(stale-while-revalidate). Concurrent async misses on the same key share a
+single upstream fetch.
+"""
+import os
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from services.cache import FRESH, STALE, TieredCache
+from services.geo import geohash_encode
+
+PLACES_CACHE_TTL_S = float(os.getenv("PLACES_CACHE_TTL_S", "900"))
+PLACES_CACHE_STALE_S = float(os.getenv("PLACES_CACHE_STALE_S", "3600"))
+PLACES_CACHE_MAX_BYTES = int(os.getenv("PLACES_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "20000"))
+PLACES_CACHE_GEOHASH_PRECISION = int(os.getenv("PLACES_CACHE_GEOHASH_PRECISION", "6"))
+PLACES_CACHE_REDIS_URL = os.getenv("PLACES_CACHE_REDIS_URL")
+
+# Radius buckets in meters; a radius is rounded up to the next bucket
+RADIUS_BUCKETS_M = (500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+def _radius_bucket(radius_m: Optional[float]) -> str:
+    if not radius_m:
+        return "none"
+    for bucket in RADIUS_BUCKETS_M:
+        if radius_m <= bucket:
+            return str(bucket)
+    return "max"
+
+
+def places_cache_key(
+    endpoint: str,
+    query: str,
+    lat: Optional[float],
+    lng: Optional[float],
+    radius_m: Optional[float] = None,
+    open_now: Optional[bool] = None,
+    page: int = 0,
+) -> str:
+    """Build the cache key for one Places request."""
+    cell = (
+        geohash_encode(lat, lng, PLACES_CACHE_GEOHASH_PRECISION)
+        if lat is not None and lng is not None
+        else "global"
+    )
+    return "|".join(
+        [
+            endpoint,
+            _normalize_query(query),
+            cell,
+            _radius_bucket(radius_m),
+            "open" if open_now else "any",
+            str(page),
+        ]
+    )
+
+
+class PlacesCache(TieredCache):
+    def __init__(self):
+        super().__init__(
+            "places",
+            ttl=PLACES_CACHE_TTL_S,
+            stale_ttl=PLACES_CACHE_STALE_S,
+            max_bytes=PLACES_CACHE_MAX_BYTES,
+            max_entries=PLACES_CACHE_MAX_ENTRIES,
+            redis_url=PLACES_CACHE_REDIS_URL,
+        )
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        # Misses being fetched, per event loop and key
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="places-refresh")
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Sync lookup; `fetch` runs on a miss, or in the background when stale."""
+        value, state = self.get(key)
+        if state == FRESH:
+            print(f"[Places Cache] HIT {key}")
+            return value
+        if state == STALE:
+            print(f"[Places Cache] STALE {key}, refreshing in background")
+            if self._claim_refresh(key):
+                self._refresh_pool.submit(self._refresh_sync, key, fetch)
+            return value
+
+        print(f"[Places Cache] MISS {key}")
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def _refresh_sync(self, key: str, fetch: Callable[[], Any]) -> None:
+        try:
+            self.set(key, fetch())
+        except Exception as e:
+            print(f"[Places Cache] Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+    async def aget_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async lookup; `fetch` is a coroutine function."""
+        value, state = self.get(key)
+        if state == FRESH:
+            print(f"[Places Cache] HIT {key}")
+            return value
+        if state == STALE:
+            print(f"[Places Cache] STALE {key}, refreshing in background")
+            if self._claim_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, fetch))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            print(f"[Places Cache] MISS {key}")
+            task = loop.create_task(self._fetch_async(key, fetch))
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        else:
+            print(f"[Places Cache] MISS {key}, joining in-flight fetch")
+        # Shielded so one cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_async(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        self.set(key, value)
+        return value
+
+    async def _refresh_async(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self.set(key, await fetch())
+        except Exception as e:
+            print(f"[Places Cache] Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+
+# Global instance
+places_cache = PlacesCache()
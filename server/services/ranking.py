@@ -0,0 +1,68 @@
+"""
+Bounded top-k selection for candidate ranking.
+
+Selecting k items out of n with a bounded heap is O(n log k) instead of the
+O(n log n) of a full sort. Ties keep insertion order, so every result here
+is identical to a stable `sorted(..., reverse=True)[:k]`.
+"""
+import heapq
+from itertools import count
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """Streaming top-k: push items one at a time, keep only the best k."""
+
+    def __init__(self, k: int):
+        self.k = k
+        # Min-heap of (score, -seq, item): the root is the entry to evict next,
+        # i.e. the lowest score and, among equal scores, the latest arrival
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = count()
+
+    def push(self, item: T, score: float) -> None:
+        if self.k <= 0:
+            return
+        entry = (score, -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[T]:
+        """Kept items, best first."""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class CategoryTopK(Generic[T]):
+    """One TopK per category; categories are reported in first-seen order."""
+
+    def __init__(self, k: int, category: Callable[[T], Hashable]):
+        self.k = k
+        self.category = category
+        self._by_category: Dict[Hashable, TopK[T]] = {}
+
+    def push(self, item: T, score: float) -> None:
+        key = self.category(item)
+        top = self._by_category.get(key)
+        if top is None:
+            top = self._by_category[key] = TopK(self.k)
+        top.push(item, score)
+
+    def items(self) -> List[T]:
+        return [item for top in self._by_category.values() for item in top.items()]
+
+
+def top_k(items: Iterable[T], k: Optional[int], key: Callable[[T], Any]) -> List[T]:
+    """
+    The k best items by `key`, best first (all of them when k is None).
+    Same result as sorted(items, key=key, reverse=True)[:k].
+    """
+    if k is None:
+        return sorted(items, key=key, reverse=True)
+    return heapq.nlargest(k, items, key=key)
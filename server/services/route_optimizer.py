@@ -1,55 +1,242 @@
 """
 Route optimizer service for computing optimal routes
+
+Stops are ordered by solving an open-path TSP over a pairwise travel-time
+matrix (great-circle distance at ROUTE_MINUTES_PER_KM):
+- up to ROUTE_EXACT_MAX_STOPS stops: exact Held-Karp dynamic programming,
+  vectorized over each subset-size layer
+- beyond that: nearest-neighbour construction improved with 2-opt and Or-opt
+
+The start is fixed, the last destination can be fixed, and any stop can be
+pinned to a position (e.g. when the user asked for a specific order).
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import os
-import requests
 from dotenv import load_dotenv
 
+import numpy as np
+
+from services.geo import haversine_km_array
+
 load_dotenv()
 
-def compute_route(stops: List[Dict[str, Any]]) -> Dict[str, Any]:
+ROUTE_MINUTES_PER_KM = float(os.getenv("ROUTE_MINUTES_PER_KM", "12"))
+ROUTE_EXACT_MAX_STOPS = int(os.getenv("ROUTE_EXACT_MAX_STOPS", "12"))
+
+
+def _coords(stop: Dict[str, Any]) -> Tuple[float, float]:
+    """A stop's coordinates, from either {"location": {"lat", "lng"}} or top-level lat/lng."""
+    location = stop.get("location") or stop
+    return location["lat"], location["lng"]
+
+
+def travel_matrix(points: List[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise (distance_km, duration_min) matrices for a list of (lat, lng) points."""
+    lats = np.array([p[0] for p in points], dtype=float)
+    lngs = np.array([p[1] for p in points], dtype=float)
+    distance_km = haversine_km_array(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :])
+    return distance_km, distance_km * ROUTE_MINUTES_PER_KM
+
+
+def pins_from_intent(stops: List[Dict[str, Any]], intent: Optional[Dict[str, Any]]) -> Tuple[Dict[int, int], bool]:
+    """
+    Route constraints from a parsed intent: (pinned stop index -> position, fixed_end).
+    An order the user asked for pins every stop where it is; a 'last_destination'
+    matching the last stop keeps that stop last.
+    """
+    if not intent:
+        return {}, False
+    if intent.get("order_preserved") and intent.get("complete_order"):
+        return {i: i for i in range(len(stops))}, True
+    last_destination = (intent.get("last_destination") or "").strip().lower()
+    fixed_end = bool(
+        stops and last_destination
+        and (last_destination in stops[-1].get("name", "").lower()
+             or stops[-1].get("name", "").lower() in last_destination)
+    )
+    return {}, fixed_end
+
+
+def _solve_exact(cost: np.ndarray, n: int, pinned: Dict[int, int]) -> List[int]:
+    """
+    Held-Karp over stops 1..n (node 0 is the start). `pinned` maps a stop to
+    its 0-based position. Each subset-size layer is solved with NumPy at once.
+    """
+    size = 1 << n
+    dp = np.full((size, n), np.inf)
+    parent = np.full((size, n), -1, dtype=np.int64)
+    stop_cost = cost[1:, 1:]
+    pinned_at = {position: stop for stop, position in pinned.items()}
+
+    def allowed(stop: int, position: int) -> bool:
+        if stop in pinned:
+            return pinned[stop] == position
+        return position not in pinned_at
+
+    popcount = np.array([bin(mask).count("1") for mask in range(size)])
+    for j in range(n):
+        if allowed(j, 0):
+            dp[1 << j, j] = cost[0, j + 1]
+
+    for layer in range(2, n + 1):
+        masks = np.nonzero(popcount == layer)[0]
+        for j in range(n):
+            if not allowed(j, layer - 1):
+                continue
+            bit = 1 << j
+            layer_masks = masks[(masks & bit) != 0]
+            prev = dp[layer_masks ^ bit] + stop_cost[:, j]
+            best = np.argmin(prev, axis=1)
+            dp[layer_masks, j] = prev[np.arange(len(layer_masks)), best]
+            parent[layer_masks, j] = best
+
+    mask = size - 1
+    last = int(np.argmin(dp[mask]))
+    if not np.isfinite(dp[mask, last]):
+        raise ValueError("Pinned positions leave no valid route")
+    order = []
+    while last >= 0:
+        order.append(last)
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    return [stop + 1 for stop in reversed(order)]
+
+
+def _path_cost(cost: List[List[float]], route: List[int]) -> float:
+    return sum(cost[a][b] for a, b in zip([0] + route, route))
+
+
+def _solve_heuristic(cost: np.ndarray, n: int, pinned: Dict[int, int]) -> List[int]:
+    """Nearest-neighbour tour honouring pins, then 2-opt and Or-opt until no move improves it."""
+    cost = cost.tolist()
+    pinned_at = {position: stop + 1 for stop, position in pinned.items()}
+    free = {stop for stop in range(1, n + 1) if stop - 1 not in pinned}
+    route, current = [], 0
+    for position in range(n):
+        if position in pinned_at:
+            nxt = pinned_at[position]
+        else:
+            nxt = min(sorted(free), key=lambda stop: cost[current][stop])
+            free.discard(nxt)
+        route.append(nxt)
+        current = nxt
+
+    fixed = set(pinned_at)
+    best = _path_cost(cost, route)
+    improved = True
+    while improved:
+        improved = False
+        # 2-opt: reverse route[i:k+1] when no pinned position is inside
+        for i in range(n - 1):
+            for k in range(i + 1, n):
+                if any(p in fixed for p in range(i, k + 1)):
+                    continue
+                candidate = route[:i] + route[i:k + 1][::-1] + route[k + 1:]
+                candidate_cost = _path_cost(cost, candidate)
+                if candidate_cost < best - 1e-9:
+                    route, best, improved = candidate, candidate_cost, True
+        # Or-opt: move a run of 1-3 free stops elsewhere
+        for length in (1, 2, 3):
+            for i in range(n - length + 1):
+                segment = route[i:i + length]
+                rest = route[:i] + route[i + length:]
+                for j in range(len(rest) + 1):
+                    if j == i:
+                        continue
+                    candidate = rest[:j] + segment + rest[j:]
+                    if any(candidate[p] != route[p] for p in fixed):
+                        continue
+                    candidate_cost = _path_cost(cost, candidate)
+                    if candidate_cost < best - 1e-9:
+                        route, best, improved = candidate, candidate_cost, True
+                        break
+                else:
+                    continue
+                break
+    return route
+
+
+def compute_route(
+    stops: List[Dict[str, Any]],
+    start: Optional[Dict[str, float]] = None,
+    intent: Optional[Dict[str, Any]] = None,
+    pinned: Optional[Dict[int, int]] = None,
+    fixed_end: Optional[bool] = None,
+) -> Dict[str, Any]:
     """
     Compute optimal route through the selected stops
-    
+
     Args:
         stops: List of selected stops with location data
-        
+        start: Starting location {"lat", "lng"}; defaults to the first stop
+        intent: Parsed intent; a requested order or last destination becomes a constraint
+        pinned: Stop index -> 0-based position in the route, on top of the intent's
+        fixed_end: Keep the last stop last (defaults to what the intent says)
+
     Returns:
-        Dict containing route information
+        Dict containing route information, with a distance/duration breakdown per leg
+        (distances in meters, durations in minutes)
     """
-    # Placeholder implementation
-    # In a real implementation, this would use Google Directions API or similar
-    
     if not stops:
-        return {"route": [], "total_distance": 0, "total_duration": 0}
-    
-    # Create a simple route connecting the stops in order
+        return {"route": [], "legs": [], "total_distance": 0, "total_duration": 0}
+
+    # Without a separate start, the first stop is where the route starts
+    origin = start if start is not None else stops[0]
+    to_order = list(stops) if start is not None else list(stops[1:])
+    offset = 0 if start is not None else 1
+
+    intent_pins, intent_fixed_end = pins_from_intent(stops, intent)
+    constraints = {**intent_pins, **(pinned or {})}
+    # Without a start, stop 0 is first by definition: only {0: 0} agrees with that
+    before_offset = {i: p for i, p in constraints.items() if (i < offset or p < offset) and i != p}
+    if before_offset:
+        raise ValueError(f"Pinned positions conflict with the first stop starting the route: {before_offset}")
+    constraints = {i - offset: p - offset for i, p in constraints.items() if i >= offset}
+    n = len(to_order)
+    if (intent_fixed_end if fixed_end is None else fixed_end) and n:
+        constraints[n - 1] = n - 1
+    if len(set(constraints.values())) != len(constraints) or any(
+        not 0 <= i < n or not 0 <= p < n for i, p in constraints.items()
+    ):
+        raise ValueError(f"Conflicting or out-of-range pinned positions: {constraints}")
+
+    points = [_coords(origin)] + [_coords(stop) for stop in to_order]
+    distance_km, duration_min = travel_matrix(points)
+
+    if n <= 1:
+        solver, order = "trivial", list(range(1, n + 1))
+    elif n <= ROUTE_EXACT_MAX_STOPS:
+        solver, order = "exact", _solve_exact(duration_min, n, constraints)
+    else:
+        solver, order = "heuristic", _solve_heuristic(duration_min, n, constraints)
+
+    ordered_stops = ([] if start is not None else [stops[0]]) + [to_order[i - 1] for i in order]
+    path = [0] + order
+
     route_points = []
-    total_distance = 0
-    total_duration = 0
-    
-    for i, stop in enumerate(stops):
+    for i, stop in enumerate(ordered_stops):
+        lat, lng = _coords(stop)
         route_points.append({
-            "lat": stop["location"]["lat"],
-            "lng": stop["location"]["lng"],
-            "name": stop["name"],
+            "lat": lat,
+            "lng": lng,
+            "name": stop.get("name"),
             "order": i + 1
         })
-        
-        # Mock distance calculation (in reality would use actual routing)
-        if i > 0:
-            # Simple distance approximation
-            prev_stop = stops[i-1]
-            lat_diff = abs(stop["location"]["lat"] - prev_stop["location"]["lat"])
-            lng_diff = abs(stop["location"]["lng"] - prev_stop["location"]["lng"])
-            distance = (lat_diff + lng_diff) * 111000  # Rough conversion to meters
-            total_distance += distance
-            total_duration += distance / 1000 * 12  # Assume 12 minutes per km
-    
+
+    names = [origin.get("name", "Start")] + [stop.get("name") for stop in to_order]
+    legs = []
+    for a, b in zip(path, path[1:]):
+        legs.append({
+            "from": names[a],
+            "to": names[b],
+            "distance": float(distance_km[a, b] * 1000),
+            "duration": float(duration_min[a, b]),
+        })
+
     return {
         "route": route_points,
-        "total_distance": total_distance,
-        "total_duration": total_duration,
-        "optimized": True
+        "legs": legs,
+        "total_distance": sum(leg["distance"] for leg in legs),
+        "total_duration": sum(leg["duration"] for leg in legs),
+        "optimized": True,
+        "solver": solver,
     }
@@ -1,10 +1,23 @@
 """
 Fast weighted scoring system for activity selection
 """
-import math
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
+from services.geo import haversine_km, haversine_km_array
+from services.ranking import CategoryTopK
+
+# Distance score by great-circle distance: (up to km, score), nearest tier first
+DISTANCE_SCORE_TIERS_KM = (
+    (1.0, 1.0),   # Very close
+    (5.0, 0.8),   # Close
+    (10.0, 0.6),  # Moderate
+    (20.0, 0.4),  # Far
+)
+DISTANCE_SCORE_FAR = 0.2
+
 @dataclass
 class ScoringWeights:
     """User-customizable scoring weights"""
@@ -13,6 +26,24 @@ class ScoringWeights:
     rating_weight: float = 0.2    # How much rating matters (0-1)
     trendiness_weight: float = 0.2 # Fixed weight for trendiness boost
 
+@dataclass
+class ActivityColumns:
+    """Scoring inputs for a batch of activities, one float array per field"""
+    lat: np.ndarray
+    lon: np.ndarray
+    rating: np.ndarray
+    cost: np.ndarray
+    
+    @classmethod
+    def from_activities(cls, activities: List[Dict[str, Any]]) -> "ActivityColumns":
+        # Extract data from structured field
+        structured = [activity.get("structured", {}) for activity in activities]
+        
+        def column(field):
+            return np.fromiter((s.get(field, 0) for s in structured), dtype=float, count=len(structured))
+        
+        return cls(lat=column("lat"), lon=column("lon"), rating=column("rating"), cost=column("cost"))
+
 class ActivityScorer:
     def __init__(self, user_weights: Optional[ScoringWeights] = None):
         self.weights = user_weights or ScoringWeights()
@@ -22,44 +53,36 @@ class ActivityScorer:
                             budget: float) -> List[Dict[str, Any]]:
         """
         Calculate base scores for all activities using only Google Places data.
-        Fast - no API calls to Cohere.
+        Fast - no API calls to Cohere. Component scores are computed on NumPy
+        columns for the whole batch and written into the activity dicts in place.
         """
-        scored_activities = []
+        columns = ActivityColumns.from_activities(activities)
         
-        for activity in activities:
-            # Extract data from structured field
-            structured = activity.get("structured", {})
-            lat = structured.get("lat", 0)
-            lon = structured.get("lon", 0)
-            rating = structured.get("rating", 0)
-            cost = structured.get("cost", 0)
-            
-            # Calculate individual scores (0-1 scale)
-            cost_score = self._calculate_cost_score(cost, budget)
-            distance_score = self._calculate_distance_score(lat, lon, user_lat, user_lon)
-            rating_score = self._calculate_rating_score(rating)
-            
-            # Calculate weighted base score
-            base_score = (
-                cost_score * self.weights.cost_weight +
-                distance_score * self.weights.distance_weight +
-                rating_score * self.weights.rating_weight
-            )
-            
-            # Add scores to activity
-            activity_with_scores = activity.copy()
-            activity_with_scores.update({
-                "cost_score": cost_score,
-                "distance_score": distance_score, 
-                "rating_score": rating_score,
-                "base_score": base_score,
-                "trendiness_score": 0.5,  # Default neutral
-                "final_score": base_score  # Will be updated with trendiness
-            })
-            
-            scored_activities.append(activity_with_scores)
+        # Calculate individual scores (0-1 scale)
+        cost_scores = self._cost_scores(columns.cost, budget)
+        distance_scores = self._distance_scores(columns.lat, columns.lon, user_lat, user_lon)
+        rating_scores = self._rating_scores(columns.rating)
+        
+        # Calculate weighted base score
+        base_scores = (
+            cost_scores * self.weights.cost_weight +
+            distance_scores * self.weights.distance_weight +
+            rating_scores * self.weights.rating_weight
+        )
+        
+        # Add scores to activities
+        for activity, cost_score, distance_score, rating_score, base_score in zip(
+            activities, cost_scores.tolist(), distance_scores.tolist(),
+            rating_scores.tolist(), base_scores.tolist()
+        ):
+            activity["cost_score"] = cost_score
+            activity["distance_score"] = distance_score
+            activity["rating_score"] = rating_score
+            activity["base_score"] = base_score
+            activity["trendiness_score"] = 0.5  # Default neutral
+            activity["final_score"] = base_score  # Will be updated with trendiness
         
-        return scored_activities
+        return activities
     
     def apply_trendiness_boost(self, activities: List[Dict[str, Any]], 
                              trendiness_data: Dict[str, float]) -> List[Dict[str, Any]]:
@@ -82,6 +105,7 @@ class ActivityScorer:
         
         return activities
     
+    # Scalar versions of the column scores below, kept as the reference they must match
     def _calculate_cost_score(self, cost: float, budget: float) -> float:
         """Calculate cost score (0-1, higher is better)"""
         if budget <= 0:
@@ -107,20 +131,13 @@ class ActivityScorer:
         if lat == 0 or lon == 0:
             return 0.5  # Unknown location
         
-        # Simple distance calculation (not precise but fast)
-        distance = math.sqrt((lat - user_lat)**2 + (lon - user_lon)**2)
+        distance_km = haversine_km(lat, lon, user_lat, user_lon)
         
         # Convert to score (closer = higher score)
-        if distance <= 0.01:  # Very close (~1km)
-            return 1.0
-        elif distance <= 0.05:  # Close (~5km)
-            return 0.8
-        elif distance <= 0.1:   # Moderate (~10km)
-            return 0.6
-        elif distance <= 0.2:   # Far (~20km)
-            return 0.4
-        else:
-            return 0.2  # Very far
+        for max_km, score in DISTANCE_SCORE_TIERS_KM:
+            if distance_km <= max_km:
+                return score
+        return DISTANCE_SCORE_FAR  # Very far
     
     def _calculate_rating_score(self, rating: float) -> float:
         """Calculate rating score (0-1, higher is better)"""
@@ -130,30 +147,47 @@ class ActivityScorer:
         # Normalize 1-5 scale to 0-1
         return (rating - 1) / 4
     
+    def _cost_scores(self, cost: np.ndarray, budget: float) -> np.ndarray:
+        """Column version of _calculate_cost_score"""
+        if budget <= 0:
+            return np.full(cost.shape, 0.5)  # Neutral if no budget constraint
+        
+        ratio = cost / budget
+        return np.select(
+            [cost <= 0, ratio >= 1.0, ratio >= 0.8, ratio >= 0.5],
+            [1.0, 0.0, 0.2, 0.6],
+            default=1.0,
+        )
+    
+    def _distance_scores(self, lat: np.ndarray, lon: np.ndarray, 
+                         user_lat: float, user_lon: float) -> np.ndarray:
+        """Column version of _calculate_distance_score"""
+        distance_km = haversine_km_array(lat, lon, user_lat, user_lon)
+        scores = np.select(
+            [distance_km <= max_km for max_km, _ in DISTANCE_SCORE_TIERS_KM],
+            [score for _, score in DISTANCE_SCORE_TIERS_KM],
+            default=DISTANCE_SCORE_FAR,
+        )
+        return np.where((lat == 0) | (lon == 0), 0.5, scores)  # Unknown location
+    
+    def _rating_scores(self, rating: np.ndarray) -> np.ndarray:
+        """Column version of _calculate_rating_score"""
+        return np.where(rating <= 0, 0.5, (rating - 1) / 4)
+    
     def select_top_candidates(self, activities: List[Dict[str, Any]], 
                             per_category: int = 5) -> List[Dict[str, Any]]:
         """
         Select top candidates per interest category for trendiness analysis.
         This keeps Cohere calls minimal.
         """
-        # Group by activity type
-        by_category = {}
+        # Keep the top N per activity type while streaming through the pool
+        top_per_category = CategoryTopK(
+            per_category, category=lambda activity: activity.get("activity_type", "general")
+        )
         for activity in activities:
-            activity_type = activity.get("activity_type", "general")
-            if activity_type not in by_category:
-                by_category[activity_type] = []
-            by_category[activity_type].append(activity)
-        
-        # Select top N per category
-        top_candidates = []
-        for category, category_activities in by_category.items():
-            # Sort by base score and take top N
-            sorted_activities = sorted(category_activities, 
-                                     key=lambda x: x["base_score"], 
-                                     reverse=True)
-            top_candidates.extend(sorted_activities[:per_category])
+            top_per_category.push(activity, activity["base_score"])
         
-        return top_candidates
+        return top_per_category.items()
 
 # Global instance
 activity_scorer = ActivityScorer()
@@ -0,0 +1,104 @@
+"""
+Change detection for scraped pages.
+
+For every URL the cache keeps the ETag / Last-Modified validators, a hash of
+the body and the events structured from it. Requests are sent as conditional
+GETs; when the server answers 304, or the body hashes the same as last time,
+the caller gets the stored events back and can skip parsing and Cohere.
+Events are copied in and out, so callers can enrich them freely.
+"""
+import os
+import copy
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from services import http_client
+from services.cache import MISS, TieredCache
+
+SCRAPE_CACHE_TTL_S = float(os.getenv("SCRAPE_CACHE_TTL_S", "21600"))
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+SCRAPE_CACHE_REDIS_URL = os.getenv("SCRAPE_CACHE_REDIS_URL")
+
+
+@dataclass
+class ScrapeResult:
+    response: requests.Response
+    content_hash: Optional[str]
+    # Events structured from this page last time, set only when the page is unchanged
+    cached_events: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def unchanged(self) -> bool:
+        return self.cached_events is not None
+
+
+def _content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class ScrapeCache:
+    def __init__(self):
+        self.cache = TieredCache(
+            "scrape",
+            SCRAPE_CACHE_TTL_S,
+            max_bytes=SCRAPE_CACHE_MAX_BYTES,
+            redis_url=SCRAPE_CACHE_REDIS_URL,
+        )
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> ScrapeResult:
+        """Conditional GET through the shared HTTP client."""
+        entry, state = self.cache.get(url)
+        if state == MISS:
+            entry = None
+
+        headers = dict(headers or {})
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http_client.get(url, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            print(f"[Scrape Cache] {url} not modified, reusing {len(entry['events'])} events")
+            self._refresh(url, entry, response)
+            return ScrapeResult(response, entry["content_hash"], copy.deepcopy(entry["events"]))
+
+        if response.status_code != 200:
+            return ScrapeResult(response, None)
+
+        content_hash = _content_hash(response.content)
+        if entry and entry["content_hash"] == content_hash:
+            print(f"[Scrape Cache] {url} content unchanged, reusing {len(entry['events'])} events")
+            self._refresh(url, entry, response)
+            return ScrapeResult(response, content_hash, copy.deepcopy(entry["events"]))
+
+        return ScrapeResult(response, content_hash)
+
+    def store(self, url: str, result: ScrapeResult, events: List[Dict[str, Any]]) -> None:
+        """Remember the events structured from a freshly downloaded page."""
+        if result.content_hash is None:
+            return
+        self.cache.set(
+            url,
+            {
+                "etag": result.response.headers.get("ETag"),
+                "last_modified": result.response.headers.get("Last-Modified"),
+                "content_hash": result.content_hash,
+                "events": copy.deepcopy(events),
+            },
+        )
+
+    def _refresh(self, url: str, entry: Dict[str, Any], response: requests.Response) -> None:
+        # Restart the TTL and pick up any new validators the server sent
+        entry = dict(entry)
+        entry["etag"] = response.headers.get("ETag") or entry.get("etag")
+        entry["last_modified"] = response.headers.get("Last-Modified") or entry.get("last_modified")
+        self.cache.set(url, entry)
+
+
+# Global instance
+scrape_cache = ScrapeCache()
@@ -2,12 +2,18 @@
 Structured sidequest service following specific rules for itinerary generation
 """
 import asyncio
+from datetime import date, datetime, timezone
+from pymongo import UpdateOne
 from services.activity_service import fetch_activities_with_scoring
-from services.mongo import activities_col
+from services.mongo import activities_collection
 from services.structured_itinerary_generator import generate_structured_itinerary
 from services.user_profile_service import get_or_create_user_profile
 from schemas.sidequest import INTEREST_CATEGORIES
 
+# Bump when the structured activity format changes; cached activities from an
+# older version are treated as misses and rewritten (2: opening_hours)
+ACTIVITY_CACHE_VERSION = 2
+
 
 async def fetch_and_prepare_sidequests(
     lat: float,
@@ -19,7 +25,9 @@ async def fetch_and_prepare_sidequests(
     interests: list = None,
     energy: int = 5,
     indoor_outdoor: str = None,
-    user_id: str = None
+    user_id: str = None,
+    plan_date: date = None,
+    timezone_name: str = None
 ):
     """
     Fetch activities and generate structured itinerary following specific rules:
@@ -44,7 +52,7 @@ async def fetch_and_prepare_sidequests(
         valid_interests = ["entertainment"]
     
     # Get or create user profile
-    user_profile = get_or_create_user_profile(user_id)
+    user_profile = await get_or_create_user_profile(user_id)
     
     # Fetch all activities
     candidates = await fetch_activities_with_scoring(lat, lon, interests, budget, travel_distance)
@@ -67,12 +75,16 @@ async def fetch_and_prepare_sidequests(
         }
     
     # Cache activities and prepare structured data
+    place_ids = [candidate.get("place_id", f"unknown_{i}") for i, candidate in enumerate(candidates)]
+    cached_by_id = await _load_cached_activities(place_ids)
+    to_cache = {}
+
     structured_activities = []
     for i, candidate in enumerate(candidates):
         print(f"[Sidequest] Processing candidate {i+1}/{len(candidates)}: {candidate.get('raw_name', 'Unknown')}")
         
-        place_id = candidate.get("place_id", f"unknown_{i}")
-        cached = activities_col.find_one({"place_id": place_id})
+        place_id = place_ids[i]
+        cached = cached_by_id.get(place_id)
         
         if cached:
             activity = cached["structured"]
@@ -80,8 +92,9 @@ async def fetch_and_prepare_sidequests(
         else:
             activity = candidate.get("structured", {})
             if activity:
-                activities_col.insert_one({"place_id": place_id, "structured": activity})
-                print(f"[Sidequest] Cached new activity: {activity.get('title', 'Unknown')}")
+                # Copy before the fields below are added, like the per-item insert did
+                to_cache.setdefault(place_id, dict(activity))
+                print(f"[Sidequest] Caching new activity: {activity.get('title', 'Unknown')}")
             else:
                 print(f"[Sidequest] No structured data for candidate: {candidate.get('raw_name', 'Unknown')}")
                 continue
@@ -101,15 +114,17 @@ async def fetch_and_prepare_sidequests(
         wrapped_activity = {
             "structured": activity,
             "raw_name": candidate.get("raw_name", "Unknown"),
-            "place_id": place_id
+            "place_id": place_id,
+            "final_score": candidate.get("final_score")
         }
         
         structured_activities.append(wrapped_activity)
     
     print(f"[Sidequest] Prepared {len(structured_activities)} structured activities")
+    await _store_activities(to_cache)
     
     # Generate structured itinerary using new rules
-    itinerary_result = generate_structured_itinerary(
+    itinerary_result = await generate_structured_itinerary(
         activities=structured_activities,
         start_time=start_time,
         end_time=end_time,
@@ -117,7 +132,10 @@ async def fetch_and_prepare_sidequests(
         user_id=user_id,
         budget=budget,
         energy=energy,
-        indoor_outdoor=indoor_outdoor
+        indoor_outdoor=indoor_outdoor,
+        start_location={"lat": lat, "lon": lon},
+        plan_date=plan_date,
+        timezone_name=timezone_name
     )
     
     # Ensure all activities in the itinerary have lat/lon coordinates
@@ -133,6 +151,39 @@ async def fetch_and_prepare_sidequests(
     return itinerary_result
 
 
+async def _load_cached_activities(place_ids: list) -> dict:
+    """Load cached structured activities for all place_ids in one query (current version only)."""
+    try:
+        cursor = activities_collection().find(
+            {"place_id": {"$in": list(set(place_ids))}, "version": ACTIVITY_CACHE_VERSION},
+            {"_id": 0, "place_id": 1, "structured": 1},
+        )
+        return {doc["place_id"]: doc async for doc in cursor}
+    except Exception as e:
+        print(f"[Sidequest] Activity cache read failed: {e}")
+        return {}
+
+
+async def _store_activities(activities_by_id: dict):
+    """Upsert newly structured activities in one unordered bulk write."""
+    if not activities_by_id:
+        return
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"place_id": place_id},
+            {"$set": {"structured": activity, "cached_at": now, "version": ACTIVITY_CACHE_VERSION}},
+            upsert=True,
+        )
+        for place_id, activity in activities_by_id.items()
+    ]
+    try:
+        await activities_collection().bulk_write(operations, ordered=False)
+        print(f"[Sidequest] Cached {len(operations)} new activities")
+    except Exception as e:
+        print(f"[Sidequest] Activity cache write failed: {e}")
+
+
 # Legacy function for backward compatibility
 async def fetch_and_prepare_sidequests_legacy(
     lat: float,
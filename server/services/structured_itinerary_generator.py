@@ -1,13 +1,28 @@
 """
 Structured itinerary generator following specific rules for sidequests
 """
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime
+from functools import lru_cache
 from services.user_profile_service import filter_unvisited_activities, get_or_create_user_profile
+from services.keyword_matcher import KeywordMatcher
+from services.city_resolver import city_resolver
+from services.itinerary_scheduler import (
+    MINUTES_PER_DAY, SCHEDULE_EVENT_GRACE_MIN, Stop, opening_window, parse_clock, parse_date, schedule
+)
+from services.ranking import top_k
 from schemas.sidequest import INTEREST_CATEGORIES
 import json
+import os
 
-def generate_structured_itinerary(
+# Candidates per interest handed to the scheduler, and how many of them can
+# make the itinerary (one location per interest category)
+SCHEDULE_CANDIDATES_PER_INTEREST = int(os.getenv("SCHEDULE_CANDIDATES_PER_INTEREST", "10"))
+MAX_ACTIVITIES_PER_INTEREST = int(os.getenv("MAX_ACTIVITIES_PER_INTEREST", "1"))
+# Scheduler group shared by every food activity, capped by the meal limit
+MEAL_GROUP = "meal"
+
+async def generate_structured_itinerary(
     activities: List[Dict[str, Any]],
     start_time: str,
     end_time: str,
@@ -15,7 +30,10 @@ def generate_structured_itinerary(
     user_id: str = None,
     budget: float = None,
     energy: int = 5,
-    indoor_outdoor: str = None
+    indoor_outdoor: str = None,
+    start_location: Dict[str, float] = None,
+    plan_date: date = None,
+    timezone_name: str = None
 ) -> Dict[str, Any]:
     """
     Generate structured itinerary following specific rules:
@@ -24,6 +42,12 @@ def generate_structured_itinerary(
     3. At least one unvisited place
     4. Prioritize meals + entertainment over meals + bites when time is short
     5. Spread food throughout the day
+    6. Fit the day: travel time, opening hours and event start times are respected
+
+    start_location ({"lat", "lon"}) is where the day starts, for the first leg.
+    plan_date is the day being planned (default: today where the user is, in
+    timezone_name or else the timezone of the city at start_location); it
+    picks the opening hours and drops events on other dates.
     """
     print(f"[Structured Itinerary] Generating itinerary from {start_time} to {end_time}")
     print(f"[Structured Itinerary] Interests: {interests}")
@@ -39,7 +63,7 @@ def generate_structured_itinerary(
         return _create_empty_itinerary()
     
     # Filter out visited places
-    unvisited_activities = filter_unvisited_activities(activities, user_id)
+    unvisited_activities = await filter_unvisited_activities(activities, user_id)
     
     if not unvisited_activities:
         print("[Structured Itinerary] All activities have been visited, using all activities")
@@ -51,8 +75,8 @@ def generate_structured_itinerary(
         print("[Structured Itinerary] No valid interests, using default: entertainment")
         valid_interests = ["entertainment"]
     
-    # Apply structured selection rules
-    selected_activities = _apply_structured_rules(
+    # Apply structured selection rules to get the scheduler's candidate pool
+    candidates, group_limits = _apply_structured_rules(
         unvisited_activities, 
         valid_interests, 
         available_hours,
@@ -61,8 +85,17 @@ def generate_structured_itinerary(
         indoor_outdoor
     )
     
-    # Order activities logically with time slots
-    ordered_activities = _assign_time_slots(selected_activities, start_time, end_time)
+    # Pick and order activities with time slots, on the user's local date
+    location = start_location or {}
+    today = city_resolver.local_date(location.get("lat"), location.get("lon"), timezone_name)
+    plan_date = plan_date or today
+    print(f"[Structured Itinerary] Planning for {plan_date.isoformat()} (local today {today.isoformat()})")
+    ordered_activities = _assign_time_slots(
+        candidates, start_time, end_time, start_location, group_limits, plan_date, today
+    )
+    
+    # Rule 5: Spread food throughout the day
+    ordered_activities = _spread_food_throughout_day(ordered_activities, available_hours)
     
     # Calculate totals (use unwrapped activities for calculations)
     unwrapped_for_calc = []
@@ -103,7 +136,7 @@ def generate_structured_itinerary(
         "summary": summary,
         "metadata": {
             "activities_considered": len(activities),
-            "activities_selected": len(selected_activities),
+            "activities_selected": len(ordered_activities),
             "activities_in_itinerary": len(unwrapped_activities),
             "interests_covered": valid_interests,
             "unvisited_places": len([a for a in unwrapped_activities if a.get("is_new_place", True)])
@@ -117,109 +150,106 @@ def _apply_structured_rules(
     budget: float = None,
     energy: int = 5,
     indoor_outdoor: str = None
-) -> List[Dict[str, Any]]:
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
     """
-    Apply structured rules to select activities with better time distribution
+    Apply structured rules to build the candidate pool the scheduler picks from.
+    Each candidate is tagged with the interest it covers; the per-interest and
+    meal limits come back as scheduler group limits.
     """
-    selected = []
-    covered_interests = set()
-    
-    # Rule 1: Select ONE activity per interest (no duplicates)
-    used_activities = set()  # Track used activities to prevent duplicates
-    
-    for interest in interests:
-        interest_activities = _find_activities_for_interest(activities, interest, budget, energy, indoor_outdoor)
-        
-        # Select the FIRST available activity for this interest (no duplicates)
-        selected_activity = None
-        for activity in interest_activities:
-            activity_id = activity.get("structured", {}).get("place_id", activity.get("structured", {}).get("title", ""))
-            if activity_id not in used_activities:
-                selected_activity = activity
-                used_activities.add(activity_id)
-                break
-        
-        if selected_activity:
-            selected.append(selected_activity)
-            covered_interests.add(interest)
-            print(f"[Structured Rules] Selected {interest}: {selected_activity.get('structured', {}).get('title', 'Unknown')}")
-        else:
-            # Fallback: if no exact match, pick any unused activity
+    candidates = []
+    claimed = set()  # Track pooled activities to prevent duplicates
+    activities_by_interest = _index_activities_by_interest(activities, interests)
+    
+    # Rule 1: The best SCHEDULE_CANDIDATES_PER_INTEREST activities per interest,
+    # of which at most MAX_ACTIVITIES_PER_INTEREST make the itinerary
+    for interest in dict.fromkeys(interests):
+        interest_activities = activities_by_interest[interest]
+        if not interest_activities:
+            # Fallback: if no exact match, any unused activity can cover it
             print(f"[Structured Rules] No exact match for {interest}, using fallback")
-            for activity in activities:
-                activity_id = activity.get("structured", {}).get("place_id", activity.get("structured", {}).get("title", ""))
-                if activity_id not in used_activities:
-                    selected.append(activity)
-                    used_activities.add(activity_id)
-                    covered_interests.add(interest)
-                    print(f"[Structured Rules] Fallback selected {interest}: {activity.get('structured', {}).get('title', 'Unknown')}")
-                    break
-    
-    # Rule 2: Apply meal limits
-    selected = _apply_meal_limits(selected, available_hours)
+            interest_activities = activities
+        
+        unclaimed = [a for a in interest_activities if _activity_id(a) not in claimed]
+        best = top_k(unclaimed, SCHEDULE_CANDIDATES_PER_INTEREST, key=_activity_score)
+        for activity in best:
+            claimed.add(_activity_id(activity))
+            # Tag a copy, the caller's activity dicts stay untouched
+            candidates.append({**activity, "interest": interest})
+        print(f"[Structured Rules] {len(best)} candidates for {interest}")
+    
+    # Rule 2: Meal limits
+    group_limits = {interest: MAX_ACTIVITIES_PER_INTEREST for interest in interests}
+    group_limits[MEAL_GROUP] = _meal_limit(available_hours)
     
     # Rule 3: Ensure at least one unvisited place (already handled by filter_unvisited_activities)
     
     # Rule 4: If time is short, prioritize meals + entertainment over meals + bites
     if available_hours < 4:  # Short time
-        selected = _prioritize_for_short_time(selected, interests)
+        candidates = _prioritize_for_short_time(candidates, interests)
     
-    # Rule 5: Spread food throughout the day
-    selected = _spread_food_throughout_day(selected, available_hours)
+    # Rule 5 (spreading food through the day) runs on the schedule
     
-    print(f"[Structured Rules] Selected {len(selected)} activities covering {covered_interests}")
-    return selected
+    print(f"[Structured Rules] {len(candidates)} candidates, limits {group_limits}")
+    return candidates, group_limits
 
-def _find_activities_for_interest(
-    activities: List[Dict[str, Any]], 
-    interest: str, 
-    budget: float = None,
-    energy: int = 5,
-    indoor_outdoor: str = None
-) -> List[Dict[str, Any]]:
+def _activity_id(activity: Dict[str, Any]) -> str:
+    structured = activity.get("structured", {})
+    return structured.get("place_id", structured.get("title", ""))
+
+def _activity_score(activity: Dict[str, Any]) -> float:
+    """Scheduler objective: the scoring service's final score, else the structured confidence"""
+    score = activity.get("final_score")
+    if score is None:
+        score = (activity["structured"] if "structured" in activity else activity).get("confidence", 0.5)
+    return float(score or 0)
+
+# Activity types and title keywords that count as each interest
+INTEREST_KEYWORDS = {
+    "meals": ["meals", "food", "restaurant", "meal"],
+    "bites": ["bites", "cafe", "snack", "bakery"],
+    "entertainment": ["entertainment", "movie", "theater", "cinema", "show", "club", "bar"],
+    "events": ["events", "festival", "concert", "amusement"],
+    "scenery": ["scenery", "park", "landmark", "viewpoint", "garden"],
+    "culture": ["culture", "museum", "gallery", "library", "cultural"],
+    "shopping": ["shopping", "store", "mall", "market"],
+    "physical_activity": ["physical", "gym", "sports", "fitness", "stadium"]
+}
+
+@lru_cache(maxsize=64)
+def _interest_matcher(interests: Tuple[str, ...]) -> Tuple[Dict[str, List[str]], KeywordMatcher]:
+    """Keyword -> interests lookup and a matcher over all the keywords of `interests`"""
+    interests_by_keyword = {}
+    for interest in interests:
+        for keyword in INTEREST_KEYWORDS.get(interest, [interest]):
+            interests_by_keyword.setdefault(keyword, []).append(interest)
+    return interests_by_keyword, KeywordMatcher(interests_by_keyword)
+
+def _index_activities_by_interest(
+    activities: List[Dict[str, Any]],
+    interests: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Find all activities for a specific interest category, sorted by quality
+    Interest -> matching activities, in their original order, built in one pass.
+    An activity matches an interest when its type is one of the interest's
+    keywords or its title contains one of them.
     """
-    # Use flexible matching instead of rigid mappings
-    matching_activities = []
-    print(f"[Structured Rules] Looking for {interest} activities using flexible matching")
-    
-    # Simple flexible mapping for better matching
-    flexible_mapping = {
-        "meals": ["meals", "food", "restaurant", "meal"],
-        "bites": ["bites", "cafe", "snack", "bakery"],
-        "entertainment": ["entertainment", "movie", "theater", "cinema", "show", "club", "bar"],
-        "events": ["events", "festival", "concert", "amusement"],
-        "scenery": ["scenery", "park", "landmark", "viewpoint", "garden"],
-        "culture": ["culture", "museum", "gallery", "library", "cultural"],
-        "shopping": ["shopping", "store", "mall", "market"],
-        "physical_activity": ["physical", "gym", "sports", "fitness", "stadium"]
-    }
-    
-    target_types = flexible_mapping.get(interest, [interest])
-    
+    interests_by_keyword, matcher = _interest_matcher(tuple(dict.fromkeys(interests)))
+    index = {interest: [] for interest in interests}
+
     for activity in activities:
-        activity_type = activity.get("structured", {}).get("activity_type", "general")
-        title = activity.get("structured", {}).get("title", "Unknown")
-        
-        # Check if activity matches the interest
-        matches = False
-        
-        # Direct type match
-        if activity_type in target_types:
-            matches = True
-        
-        # Title contains interest keywords
-        elif any(keyword in title.lower() for keyword in target_types):
-            matches = True
-        
-        # Only add if it actually matches
-        if matches:
-            matching_activities.append(activity)
-            print(f"[Structured Rules] Matched {interest} activity: {title} (type: {activity_type})")
-    
-    print(f"[Structured Rules] Found {len(matching_activities)} activities for {interest}")
-    return matching_activities
+        structured = activity.get("structured", {})
+        keywords = matcher.find(structured.get("title", "Unknown").lower())
+        activity_type = structured.get("activity_type", "general")
+        if activity_type in interests_by_keyword:
+            keywords.add(activity_type)
+
+        matched = {interest for keyword in keywords for interest in interests_by_keyword[keyword]}
+        for interest in matched:
+            index[interest].append(activity)
+
+    print(f"[Structured Rules] Indexed {len(activities)} activities: "
+          + ", ".join(f"{interest}={len(found)}" for interest, found in index.items()))
+    return index
 
 async def _llm_matches_interest(title: str, description: str, activity_type: str, interest: str) -> bool:
     """
@@ -343,29 +373,11 @@ def _find_best_activity_for_interest(
     print(f"[Structured Rules] No activities found for interest: {interest}")
     return None
 
-def _apply_meal_limits(activities: List[Dict[str, Any]], available_hours: float) -> List[Dict[str, Any]]:
+def _meal_limit(available_hours: float) -> int:
     """
-    Apply meal limits: max 3 meals/day, 2 meals/half day
+    Meal limits: max 3 meals/day, 2 meals/half day
     """
-    meal_activities = [a for a in activities if a.get("structured", {}).get("activity_type") == "food"]
-    
-    if available_hours >= 8:  # Full day
-        max_meals = 3
-    else:  # Half day
-        max_meals = 2
-    
-    if len(meal_activities) > max_meals:
-        # Keep the best meals (highest confidence)
-        meal_activities.sort(key=lambda x: x.get("structured", {}).get("confidence", 0), reverse=True)
-        meal_activities = meal_activities[:max_meals]
-        
-        # Remove excess meals from activities list
-        non_meal_activities = [a for a in activities if a.get("structured", {}).get("activity_type") != "food"]
-        activities = non_meal_activities + meal_activities
-        
-        print(f"[Meal Limits] Limited to {max_meals} meals for {available_hours}h day")
-    
-    return activities
+    return 3 if available_hours >= 8 else 2
 
 def _prioritize_for_short_time(activities: List[Dict[str, Any]], interests: List[str]) -> List[Dict[str, Any]]:
     """
@@ -375,9 +387,9 @@ def _prioritize_for_short_time(activities: List[Dict[str, Any]], interests: List
         return activities
     
     # If we have both meals and bites, prefer meals + entertainment
-    has_meals = any("meals" in interests)
-    has_bites = any("bites" in interests)
-    has_entertainment = any("entertainment" in interests)
+    has_meals = "meals" in interests
+    has_bites = "bites" in interests
+    has_entertainment = "entertainment" in interests
     
     if has_meals and has_bites and has_entertainment:
         # Remove bites, keep meals + entertainment
@@ -407,32 +419,98 @@ def _spread_food_throughout_day(activities: List[Dict[str, Any]], available_hour
     
     return activities
 
-def _assign_time_slots(activities: List[Dict[str, Any]], start_time: str, end_time: str) -> List[Dict[str, Any]]:
+def _assign_time_slots(
+    activities: List[Dict[str, Any]],
+    start_time: str,
+    end_time: str,
+    start_location: Optional[Dict[str, float]] = None,
+    group_limits: Optional[Dict[str, int]] = None,
+    plan_date: Optional[date] = None,
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
     """
-    Assign specific time slots to activities
+    Pick and schedule activities between start_time and end_time with the
+    itinerary scheduler: real travel time between stops, opening hours and
+    event start times are respected, group limits are kept, and the chosen
+    activities are the ones with the highest total score. Events dated on
+    another day than plan_date are left out; `today` resolves "Today"/"Tomorrow".
     """
-    start_dt = datetime.strptime(start_time, "%H:%M")
-    current_time = start_dt
-    
+    day_start = _minutes(start_time)
+    day_end = _minutes(end_time)
+    if day_end <= day_start:
+        day_end += MINUTES_PER_DAY  # ends after midnight
+    plan_date = plan_date or city_resolver.local_date()
+
+    candidates, stops = [], []
     for activity in activities:
+        stop = _schedule_stop(activity, plan_date, today)
+        if stop is not None:
+            candidates.append(activity)
+            stops.append(stop)
+    origin = (start_location["lat"], start_location["lon"]) if start_location else None
+    visits = schedule(stops, day_start, day_end, origin, group_limits)
+
+    scheduled = []
+    for visit in visits:
+        # Schedule a copy: event start_time strings (with their date) stay on the original
+        activity = dict(candidates[visit.stop])
         # Handle both wrapped and unwrapped activity structures
         if "structured" in activity:
+            activity["structured"] = dict(activity["structured"])
             activity_data = activity["structured"]
         else:
             activity_data = activity
-            
-        duration_hours = activity_data.get("duration_hours", 1.5)
-        
-        # Assign start time
-        activity_data["start_time"] = current_time.strftime("%H:%M")
-        
-        # Move to next time slot
-        current_time += timedelta(hours=duration_hours)
-        
-        # Add travel time between activities (15 minutes)
-        current_time += timedelta(minutes=15)
-    
-    return activities
+        activity_data["start_time"] = _clock(visit.start)
+        activity_data["travel_minutes"] = round(visit.travel_minutes)
+        scheduled.append(activity)
+
+    print(f"[Time Slots] Scheduled {len(scheduled)}/{len(activities)} candidates: "
+          + ", ".join(a.get("structured", a).get("title", "Unknown") for a in scheduled))
+    return scheduled
+
+def _schedule_stop(activity: Dict[str, Any], plan_date: date, today: Optional[date] = None) -> Optional[Stop]:
+    """
+    Scheduler input for an activity: score, duration, time window and coordinates.
+    None for an event dated on another day.
+    """
+    activity_data = activity["structured"] if "structured" in activity else activity
+
+    event_date = parse_date(activity_data.get("start_time"), plan_date, today)
+    if event_date is not None and event_date != plan_date:
+        print(f"[Time Slots] Skipping {activity_data.get('title', 'Unknown')}: on {event_date.isoformat()}")
+        return None
+
+    groups = (activity["interest"],) if activity.get("interest") else ()
+    if activity_data.get("activity_type") == "food":
+        groups += (MEAL_GROUP,)
+    stop = Stop(
+        score=max(_activity_score(activity), 0.01),
+        duration=float(activity_data.get("duration_hours") or 1.5) * 60,
+        lat=activity_data.get("lat"),
+        lon=activity_data.get("lon"),
+        groups=groups,
+    )
+
+    # Events start at a given time; places are bound by the plan date's opening hours
+    event_start = parse_clock(activity_data.get("start_time"))
+    if event_start is not None:
+        stop.open, stop.close = event_start, event_start + SCHEDULE_EVENT_GRACE_MIN
+    elif activity_data.get("opening_hours"):
+        weekday = (plan_date.weekday() + 1) % 7  # Google numbering, 0 = Sunday
+        window = opening_window(activity_data["opening_hours"], weekday)
+        if window is None:
+            stop.open, stop.close = 0.0, -1.0  # closed that day
+        else:
+            stop.open, stop.close = window[0], window[1] - stop.duration
+    return stop
+
+def _minutes(value: str) -> int:
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+def _clock(minutes: float) -> str:
+    minutes = int(round(minutes)) % MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
 
 def _generate_structured_summary(activities: List[Dict[str, Any]], interests: List[str], available_hours: float) -> str:
     """
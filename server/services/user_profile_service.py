@@ -2,13 +2,43 @@
 User profile service for tracking visited places and preferences
 Enhanced to support Auth0 integration
 """
-from typing import List, Dict, Any, Optional
-from services.mongo import user_profiles_col
+import os
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Set
+from services.cache import MISS, LRUTTLCache
+from services.mongo import user_profiles_collection
 from datetime import datetime
 import json
 import hashlib
 
-def get_or_create_user_profile(user_id: str = None) -> Dict[str, Any]:
+# Per-user visited-place indexes, dropped whenever this process records a visit.
+# The TTL bounds staleness from writes made elsewhere.
+VISITED_INDEX_TTL_S = float(os.getenv("VISITED_INDEX_TTL_S", "300"))
+VISITED_INDEX_CACHE_MAX_BYTES = int(os.getenv("VISITED_INDEX_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+
+@dataclass
+class VisitedPlaceIndex:
+    """Set lookups over one user's visited places"""
+    place_ids: Set[str] = field(default_factory=set)
+    names: Set[str] = field(default_factory=set)  # casefolded
+
+    @classmethod
+    def from_visited_places(cls, visited_places: List[Dict[str, Any]]) -> "VisitedPlaceIndex":
+        return cls(
+            place_ids={place["place_id"] for place in visited_places},
+            names={place["place_name"].casefold() for place in visited_places},
+        )
+
+    def has_visited(self, place_id: str = None, place_name: str = None) -> bool:
+        if place_id is not None and place_id in self.place_ids:
+            return True
+        return place_name is not None and place_name.casefold() in self.names
+
+
+_visited_indexes = LRUTTLCache(VISITED_INDEX_CACHE_MAX_BYTES, name="visited_places")
+
+async def get_or_create_user_profile(user_id: str = None) -> Dict[str, Any]:
     """
     Get user profile or create a default one for testing
     """
@@ -16,7 +46,7 @@ def get_or_create_user_profile(user_id: str = None) -> Dict[str, Any]:
         user_id = "default_test_user"
     
     # Try to get existing profile
-    profile = user_profiles_col.find_one({"user_id": user_id})
+    profile = await user_profiles_collection().find_one({"user_id": user_id})
     
     if not profile:
         # Create default test profile with some visited places
@@ -47,14 +77,14 @@ def get_or_create_user_profile(user_id: str = None) -> Dict[str, Any]:
             "last_updated": datetime.now().isoformat()
         }
         
-        user_profiles_col.insert_one(default_profile)
+        await user_profiles_collection().insert_one(default_profile)
         print(f"[User Profile] Created default profile for user: {user_id}")
         return default_profile
     
     print(f"[User Profile] Retrieved profile for user: {user_id}")
     return profile
 
-def add_visited_place(user_id: str, place_name: str, place_id: str, activity_type: str, location: str):
+async def add_visited_place(user_id: str, place_name: str, place_id: str, activity_type: str, location: str):
     """
     Add a place to user's visited places
     """
@@ -66,7 +96,7 @@ def add_visited_place(user_id: str, place_name: str, place_id: str, activity_typ
         "location": location
     }
     
-    user_profiles_col.update_one(
+    await user_profiles_collection().update_one(
         {"user_id": user_id},
         {
             "$push": {"visited_places": visited_place},
@@ -74,34 +104,54 @@ def add_visited_place(user_id: str, place_name: str, place_id: str, activity_typ
         }
     )
     
+    invalidate_visited_index(user_id)
     print(f"[User Profile] Added visited place: {place_name} for user: {user_id}")
 
-def get_visited_places(user_id: str) -> List[Dict[str, Any]]:
+async def get_visited_places(user_id: str) -> List[Dict[str, Any]]:
     """
     Get list of places user has visited
     """
-    profile = get_or_create_user_profile(user_id)
+    profile = await get_or_create_user_profile(user_id)
     return profile.get("visited_places", [])
 
-def has_visited_place(user_id: str, place_name: str) -> bool:
+async def get_visited_index(user_id: str) -> VisitedPlaceIndex:
+    """
+    Get the user's visited-place index, loading the profile at most once per TTL
+    """
+    key = user_id or "default_test_user"
+    index, state = _visited_indexes.get(key)
+    if state != MISS:
+        return index
+    
+    index = VisitedPlaceIndex.from_visited_places(await get_visited_places(user_id))
+    _visited_indexes.set(key, index, VISITED_INDEX_TTL_S)
+    return index
+
+def invalidate_visited_index(user_id: str):
+    """
+    Drop the cached visited-place index after the user's visits change
+    """
+    _visited_indexes.delete(user_id or "default_test_user")
+
+async def has_visited_place(user_id: str, place_name: str) -> bool:
     """
     Check if user has visited a specific place
     """
-    visited_places = get_visited_places(user_id)
-    return any(place["place_name"].lower() == place_name.lower() for place in visited_places)
+    index = await get_visited_index(user_id)
+    return index.has_visited(place_name=place_name)
 
-def get_visited_place_ids(user_id: str) -> List[str]:
+async def get_visited_place_ids(user_id: str) -> List[str]:
     """
     Get list of place IDs user has visited
     """
-    visited_places = get_visited_places(user_id)
+    visited_places = await get_visited_places(user_id)
     return [place["place_id"] for place in visited_places]
 
-def filter_unvisited_activities(activities: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
+async def filter_unvisited_activities(activities: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
     """
     Filter out activities that user has already visited
     """
-    visited_place_ids = get_visited_place_ids(user_id)
+    index = await get_visited_index(user_id)
     unvisited = []
     
     for activity in activities:
@@ -109,7 +159,7 @@ def filter_unvisited_activities(activities: List[Dict[str, Any]], user_id: str)
         place_name = activity.get("raw_name", "")
         
         # Skip if user has visited this place
-        if place_id in visited_place_ids or has_visited_place(user_id, place_name):
+        if index.has_visited(place_id, place_name):
             print(f"[User Profile] Skipping visited place: {place_name}")
             continue
             
@@ -120,7 +170,7 @@ def filter_unvisited_activities(activities: List[Dict[str, Any]], user_id: str)
 
 # Auth0 Integration Functions
 
-def create_or_update_auth0_user_profile(
+async def create_or_update_auth0_user_profile(
     auth0_user_id: str, 
     email: str, 
     name: str = None, 
@@ -133,7 +183,7 @@ def create_or_update_auth0_user_profile(
     Create or update user profile from Auth0 data
     """
     # Check if user already exists
-    existing_profile = user_profiles_col.find_one({"auth0_user_id": auth0_user_id})
+    existing_profile = await user_profiles_collection().find_one({"auth0_user_id": auth0_user_id})
     
     current_time = datetime.now().isoformat()
     
@@ -162,13 +212,13 @@ def create_or_update_auth0_user_profile(
             update_data["keywords"] = {}
             print(f"[User Profile] Added missing keywords field for existing user: {auth0_user_id}")
         
-        user_profiles_col.update_one(
+        await user_profiles_collection().update_one(
             {"auth0_user_id": auth0_user_id},
             {"$set": update_data}
         )
         
         print(f"[User Profile] Updated Auth0 profile for user: {auth0_user_id}")
-        return user_profiles_col.find_one({"auth0_user_id": auth0_user_id})
+        return await user_profiles_collection().find_one({"auth0_user_id": auth0_user_id})
     
     else:
         # Create new profile
@@ -192,11 +242,11 @@ def create_or_update_auth0_user_profile(
             "last_updated": current_time
         }
         
-        user_profiles_col.insert_one(new_profile)
+        await user_profiles_collection().insert_one(new_profile)
         print(f"[User Profile] Created new Auth0 profile for user: {auth0_user_id}")
         return new_profile
 
-def add_keyword_location(auth0_user_id: str, keyword: str, location_data: Dict[str, Any]):
+async def add_keyword_location(auth0_user_id: str, keyword: str, location_data: Dict[str, Any]):
     """
     Add or update a keyword -> location mapping
     
@@ -216,7 +266,7 @@ def add_keyword_location(auth0_user_id: str, keyword: str, location_data: Dict[s
         "added_at": datetime.now().isoformat()
     }
     
-    user_profiles_col.update_one(
+    await user_profiles_collection().update_one(
         {"auth0_user_id": auth0_user_id},
         {
             "$set": {
@@ -228,26 +278,26 @@ def add_keyword_location(auth0_user_id: str, keyword: str, location_data: Dict[s
     
     print(f"[User Profile] Added keyword '{keyword}' for user: {auth0_user_id}")
 
-def get_user_keywords(auth0_user_id: str) -> Dict[str, Any]:
+async def get_user_keywords(auth0_user_id: str) -> Dict[str, Any]:
     """
     Get all keyword mappings for a user
     """
-    profile = user_profiles_col.find_one({"auth0_user_id": auth0_user_id})
+    profile = await user_profiles_collection().find_one({"auth0_user_id": auth0_user_id})
     if profile:
         return profile.get("keywords", {})
     return {}
 
-def get_user_profile_by_auth0_id(auth0_user_id: str) -> Optional[Dict[str, Any]]:
+async def get_user_profile_by_auth0_id(auth0_user_id: str) -> Optional[Dict[str, Any]]:
     """
     Get user profile by Auth0 user ID
     """
-    return user_profiles_col.find_one({"auth0_user_id": auth0_user_id})
+    return await user_profiles_collection().find_one({"auth0_user_id": auth0_user_id})
 
-def delete_keyword(auth0_user_id: str, keyword: str):
+async def delete_keyword(auth0_user_id: str, keyword: str):
     """
     Remove a keyword mapping
     """
-    user_profiles_col.update_one(
+    await user_profiles_collection().update_one(
         {"auth0_user_id": auth0_user_id},
         {
             "$unset": {f"keywords.{keyword}": ""},
@@ -257,20 +307,20 @@ def delete_keyword(auth0_user_id: str, keyword: str):
     
     print(f"[User Profile] Removed keyword '{keyword}' for user: {auth0_user_id}")
 
-def migrate_existing_users_add_keywords():
+async def migrate_existing_users_add_keywords():
     """
     Migration function to add keywords field to existing users who don't have it
     """
     try:
         # Find all users without keywords field
-        users_without_keywords = user_profiles_col.find({
+        users_without_keywords = user_profiles_collection().find({
             "auth0_user_id": {"$exists": True},
             "keywords": {"$exists": False}
         })
         
         count = 0
-        for user in users_without_keywords:
-            user_profiles_col.update_one(
+        async for user in users_without_keywords:
+            await user_profiles_collection().update_one(
                 {"_id": user["_id"]},
                 {
                     "$set": {
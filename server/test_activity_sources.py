@@ -0,0 +1,32 @@
+"""
+Check that activity sources keep their circuit breakers usable when cancelled
+"""
+import asyncio
+
+from services import circuit_breaker
+from services.activity_sources import ActivitySource, stream_sources
+
+
+def test_cancelled_half_open_trial_is_released(monkeypatch):
+    breaker = circuit_breaker.CircuitBreaker("source:slow", failure_threshold=1, reset_timeout_s=0)
+    monkeypatch.setitem(circuit_breaker._breakers, "source:slow", breaker)
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.HALF_OPEN
+
+    async def fast(city, lat, lon):
+        return [{"title": "Fast"}]
+
+    async def slow(city, lat, lon):
+        await asyncio.sleep(10)
+        return [{"title": "Slow"}]
+
+    async def first_batch():
+        sources = [ActivitySource("fast", fast, 5), ActivitySource("slow", slow, 5)]
+        stream = stream_sources(sources, "Waterloo", 43.46, -80.52)
+        source, activities = await anext(stream)
+        await stream.aclose()  # consumer stops early, the slow trial is cancelled
+        await asyncio.sleep(0)
+        return source.name
+
+    assert asyncio.run(first_batch()) == "fast"
+    assert breaker.allow()
@@ -54,7 +54,7 @@ async def test_rag_functionality():
     # Add sample keywords to user profile
     for keyword, location_data in sample_keywords.items():
         try:
-            add_keyword_location(test_user_id, keyword, location_data)
+            await add_keyword_location(test_user_id, keyword, location_data)
             print(f"  ✅ Added keyword: '{keyword}' -> {location_data['name']}")
         except Exception as e:
             print(f"  ❌ Failed to add keyword '{keyword}': {str(e)}")
@@ -108,7 +108,7 @@ async def test_rag_functionality():
         print(f"   Expected: {test_case['expected_keywords']}")
         
         try:
-            result = parser.parse_user_text_for_keywords(
+            result = await parser.parse_user_text_for_keywords(
                 user_text=test_case['text'],
                 auth0_user_id=test_user_id
             )
@@ -135,7 +135,7 @@ async def test_rag_functionality():
     
     print("\n📊 Testing user keyword statistics...")
     try:
-        stats = parser.get_user_keyword_stats(test_user_id)
+        stats = await parser.get_user_keyword_stats(test_user_id)
         print(f"   Total Keywords: {stats['total_keywords']}")
         print(f"   Keyword List: {stats['keyword_list']}")
         print(f"   Location Types: {stats['location_types']}")
@@ -150,7 +150,7 @@ async def test_rag_functionality():
         test_text = "I want to go to the coffee shop"
         
         # RAG result
-        rag_result = parse_user_text_with_rag(test_text, test_user_id)
+        rag_result = await parse_user_text_with_rag(test_text, test_user_id)
         
         # Gemini result
         gemini_result = parse_intent("Current Location", test_text)
@@ -47,7 +47,7 @@ async def test_enhanced_integration():
     # Add sample keywords
     for keyword, location_data in sample_keywords.items():
         try:
-            add_keyword_location(test_user_id, keyword, location_data)
+            await add_keyword_location(test_user_id, keyword, location_data)
             print(f"  ✅ Added keyword: '{keyword}' -> {location_data['name']}")
         except Exception as e:
             print(f"  ❌ Failed to add keyword '{keyword}': {str(e)}")
@@ -97,7 +97,7 @@ async def test_enhanced_integration():
         print(f"   Expected Keywords: {test_case['expected_keywords']}")
         
         try:
-            result = parse_intent_with_rag(
+            result = await parse_intent_with_rag(
                 starting_location="San Francisco, CA",
                 text=test_case['text'],
                 auth0_user_id=test_user_id,
@@ -143,7 +143,7 @@ async def test_enhanced_integration():
     print(f"   Testing with far location (NYC): {far_location}")
     
     try:
-        result = parse_intent_with_rag(
+        result = await parse_intent_with_rag(
             starting_location="New York, NY",
             text="I want to get coffee then go to work",
             auth0_user_id=test_user_id,
@@ -0,0 +1,39 @@
+"""
+Check the spatial index against brute-force great-circle distances
+"""
+import random
+
+import numpy as np
+
+from services.geo import SpatialIndex, haversine_km, haversine_km_array
+
+
+def test_haversine_array_matches_scalar():
+    lats = [43.47, 43.45, 51.5, -33.9]
+    lons = [-80.54, -80.49, -0.12, 151.2]
+    expected = [haversine_km(43.46, -80.52, lat, lon) for lat, lon in zip(lats, lons)]
+    assert np.allclose(haversine_km_array(43.46, -80.52, lats, lons), expected)
+
+
+def test_radius_and_nearest_queries_match_brute_force():
+    rng = random.Random(3)
+    # Waterloo, the high Arctic and points straddling the antimeridian
+    for center_lat, center_lon in [(43.46, -80.52), (78.0, 15.0), (-16.5, 179.95)]:
+        lats = [center_lat + rng.uniform(-0.5, 0.5) for _ in range(500)]
+        lons = [((center_lon + rng.uniform(-1.5, 1.5) + 180) % 360) - 180 for _ in range(500)]
+        index = SpatialIndex(lats, lons, cell_km=2)
+        brute = np.array([haversine_km(center_lat, center_lon, lat, lon) for lat, lon in zip(lats, lons)])
+
+        for radius_km in (0.5, 5, 30, 500):
+            indices, distances = index.within(center_lat, center_lon, radius_km)
+            assert sorted(indices.tolist()) == np.nonzero(brute <= radius_km)[0].tolist()
+            assert list(distances) == sorted(distances)
+
+        indices, distances = index.nearest(center_lat, center_lon, k=7)
+        assert np.allclose(distances, np.sort(brute)[:7])
+
+
+def test_empty_index():
+    index = SpatialIndex([], [])
+    assert len(index.within(43.46, -80.52, 10)[0]) == 0
+    assert len(index.nearest(43.46, -80.52, k=3)[0]) == 0
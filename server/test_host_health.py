@@ -0,0 +1,39 @@
+"""
+Check that blog host discovery only forgets hosts that definitely don't serve events
+"""
+import socket
+
+import requests
+
+from services import luma_scraper
+from services.host_health import HostHealthRegistry
+from services.scrape_cache import ScrapeResult
+
+
+def test_host_timing_out_during_discovery_is_probed_again(monkeypatch):
+    registry = HostHealthRegistry()
+    monkeypatch.setattr(luma_scraper, "host_health", registry)
+    probes = []
+    timeouts = {"elmiraevents.com": 1}
+
+    def get(url, headers=None, **kwargs):
+        host = url.removeprefix("https://")
+        probes.append(host)
+        if timeouts.get(host):
+            timeouts[host] -= 1
+            raise requests.exceptions.ReadTimeout("read timed out")
+        if host == "elmiraevents.com":
+            event = {"place_id": "blog_1", "structured": {"title": "Maple Syrup Festival"}}
+            return ScrapeResult(response=None, content_hash="h", cached_events=[event])
+        raise requests.exceptions.ConnectionError(socket.gaierror("Name or service not known"))
+
+    monkeypatch.setattr(luma_scraper.scrape_cache, "get", get)
+
+    assert luma_scraper.fetch_local_blog_events("Elmira") == []
+    assert registry.known_good_hosts("Elmira") is None
+
+    probes.clear()
+    events = luma_scraper.fetch_local_blog_events("Elmira")
+    assert [event["structured"]["title"] for event in events] == ["Maple Syrup Festival"]
+    assert probes == ["elmiraevents.com"]  # the DNS failures stay negatively cached
+    assert registry.known_good_hosts("Elmira") == ["elmiraevents.com"]
@@ -0,0 +1,54 @@
+"""
+Check that every installed HTML parser backend extracts the same events as BeautifulSoup
+"""
+import os
+import re
+
+import pytest
+
+from services import html_parser
+from services.luma_scraper import _parse_luma_events, _scrape_blog_events
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "benchmarks", "fixtures")
+BACKENDS = html_parser.available_backends()
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "fixture, extract",
+    [("luma_search.html", _parse_luma_events), ("event_blog.html", _scrape_blog_events)],
+)
+def test_backends_extract_like_bs4(backend, fixture, extract):
+    content = _fixture(fixture)
+    expected = extract(content, "Waterloo", "bs4")
+    assert expected
+    assert extract(content, "Waterloo", backend) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_node_semantics(backend):
+    root = html_parser.parse(
+        b'<div class="event card"><h3 class="x">Jazz <b> Night </b><script>track()</script><!-- c --></h3>'
+        b'<div class="event"><span class="event-date">Fri</span></div></div>',
+        backend,
+    )
+    outer = root.find(["div"], class_=re.compile(r"card"))
+    # find() searches descendants only, never the element itself
+    assert outer.find(["div"], class_=re.compile(r"event")).text() == "Fri"
+    assert outer.find(["h3"]).text() == "JazzNight"
+    assert [node.text() for node in outer.select('[class*="event"]')] == ["Fri", "Fri"]
+    assert root.find(["p"]) is None
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class TextOnlyNode(html_parser.Node):
+        def text(self):
+            return ""
+
+    with pytest.raises(TypeError):
+        TextOnlyNode()
@@ -0,0 +1,44 @@
+"""
+The one-pass interest index must match the per-interest substring scan it replaced
+"""
+import random
+
+from services.keyword_matcher import KeywordMatcher
+from services.structured_itinerary_generator import INTEREST_KEYWORDS, _index_activities_by_interest
+
+WORDS = ["Cafe", "Barbershop", "Park", "Gallery", "Market", "Showroom", "Stadium", "Festival", "Central",
+         "Bakery", "Cinema", "Mall", "Library", "Garden", "The", "Old", "Food", "Club", "Museum", "Gym"]
+TYPES = ["meals", "food", "bites", "entertainment", "cultural", "scenery", "shopping", "general", "sports"]
+
+
+def _scan(activities, interest):
+    target_types = INTEREST_KEYWORDS.get(interest, [interest])
+    return [
+        activity for activity in activities
+        if activity["structured"].get("activity_type", "general") in target_types
+        or any(keyword in activity["structured"].get("title", "Unknown").lower() for keyword in target_types)
+    ]
+
+
+def test_matcher_finds_every_substring_keyword():
+    keywords = ["he", "she", "his", "hers", "bar", "barb", "a"]
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(4)
+    for _ in range(300):
+        text = "".join(rng.choice("abehirs ") for _ in range(rng.randint(0, 20)))
+        assert matcher.find(text) == {k for k in keywords if k in text}
+
+
+def test_index_matches_per_interest_scan():
+    rng = random.Random(9)
+    activities = []
+    for i in range(400):
+        structured = {"title": " ".join(rng.sample(WORDS, rng.randint(1, 3))), "place_id": str(i)}
+        if rng.random() < 0.8:
+            structured["activity_type"] = rng.choice(TYPES)
+        activities.append({"structured": structured})
+
+    interests = list(INTEREST_KEYWORDS) + ["food"]
+    index = _index_activities_by_interest(activities, interests)
+    for interest in interests:
+        assert index[interest] == _scan(activities, interest)
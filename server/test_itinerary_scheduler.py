@@ -0,0 +1,290 @@
+"""
+Check the itinerary scheduler against brute force over every ordered subset
+"""
+import asyncio
+import itertools
+import random
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from services import activity_service, itinerary_scheduler
+from services import structured_itinerary_generator as generator
+from services.city_resolver import city_resolver
+from services.itinerary_scheduler import Stop, opening_window, parse_clock, parse_date, schedule
+from services.structured_itinerary_generator import _assign_time_slots
+
+ORIGIN = (43.4643, -80.5204)
+
+
+def _stops(rng, count):
+    stops = []
+    for _ in range(count):
+        stop = Stop(
+            score=rng.uniform(0.1, 1.0),
+            duration=rng.choice([45, 60, 90, 120]),
+            lat=43.45 + rng.uniform(-0.05, 0.05),
+            lon=-80.5 + rng.uniform(-0.08, 0.08),
+        )
+        if rng.random() < 0.5:
+            stop.open = rng.uniform(540, 900)
+            stop.close = stop.open + rng.choice([15, 120, 300])
+        stops.append(stop)
+    return stops
+
+
+def _feasible(visits, stops, day_start, day_end):
+    clock = day_start
+    for visit in visits:
+        stop = stops[visit.stop]
+        assert visit.arrival == pytest.approx(clock + visit.travel_minutes)
+        assert visit.start == pytest.approx(max(visit.arrival, stop.open))
+        assert visit.start <= stop.close + 1e-6
+        clock = visit.end
+    assert clock <= day_end + 1e-6
+    assert len({visit.stop for visit in visits}) == len(visits)
+
+
+def _within_limits(order, stops, limits):
+    return all(sum(g in stops[i].groups for i in order) <= limit for g, limit in limits.items())
+
+
+def _best_score(stops, day_start, day_end, limits=None):
+    travel = itinerary_scheduler._travel(stops, ORIGIN)
+    best = 0.0
+    for size in range(1, len(stops) + 1):
+        for order in itertools.permutations(range(len(stops)), size):
+            if limits and not _within_limits(order, stops, limits):
+                continue
+            visits = itinerary_scheduler._timeline(list(order), stops, travel, day_start)
+            if visits and visits[-1].end <= day_end + 1e-9:
+                best = max(best, sum(stops[i].score for i in order))
+    return best
+
+
+@pytest.mark.parametrize("exact_max_stops", [12, 0])  # exact DP, then the heuristic only
+def test_schedules_against_brute_force(monkeypatch, exact_max_stops):
+    monkeypatch.setattr(itinerary_scheduler, "SCHEDULE_EXACT_MAX_STOPS", exact_max_stops)
+    rng = random.Random(7)
+    for _ in range(25):
+        stops = _stops(rng, rng.randint(1, 6))
+        day_start, day_end = 540, 540 + rng.choice([120, 240, 480])
+
+        visits = schedule(stops, day_start, day_end, ORIGIN)
+        _feasible(visits, stops, day_start, day_end)
+
+        score = sum(stops[visit.stop].score for visit in visits)
+        best = _best_score(stops, day_start, day_end)
+        if exact_max_stops:
+            assert score == pytest.approx(best)
+        else:
+            assert score <= best + 1e-9
+
+
+@pytest.mark.parametrize("exact_max_stops", [12, 0])
+def test_group_limits_against_brute_force(monkeypatch, exact_max_stops):
+    monkeypatch.setattr(itinerary_scheduler, "SCHEDULE_EXACT_MAX_STOPS", exact_max_stops)
+    rng = random.Random(11)
+    limits = {"food": 1, "park": 1, "meal": 1}
+    for _ in range(20):
+        stops = _stops(rng, rng.randint(2, 6))
+        for stop in stops:
+            stop.groups = rng.choice([("food", "meal"), ("park",), ("food",), ()])
+
+        visits = schedule(stops, 540, 1020, ORIGIN, limits)
+        _feasible(visits, stops, 540, 1020)
+        assert _within_limits([visit.stop for visit in visits], stops, limits)
+
+        score = sum(stops[visit.stop].score for visit in visits)
+        best = _best_score(stops, 540, 1020, limits)
+        if exact_max_stops:
+            assert score == pytest.approx(best)
+        else:
+            assert score <= best + 1e-9
+
+
+def test_heuristic_handles_a_hundred_candidates():
+    stops = _stops(random.Random(3), 100)
+    visits = schedule(stops, 540, 1260, ORIGIN)
+    assert visits
+    _feasible(visits, stops, 540, 1260)
+
+
+def test_parse_clock_and_opening_hours():
+    assert parse_clock("19:30") == 19 * 60 + 30
+    assert parse_clock("Sat, Oct 5 · 7:00 PM") == 19 * 60
+    assert parse_clock("12 am") == 0
+    assert parse_clock("2025-10-05T09:15:00") == 9 * 60 + 15
+    assert parse_clock("Every weekend") is None
+
+    periods = [
+        {"open": {"day": 1, "hour": 9, "minute": 0}, "close": {"day": 1, "hour": 17, "minute": 0}},
+        {"open": {"day": 5, "hour": 18, "minute": 0}, "close": {"day": 6, "hour": 2, "minute": 0}},
+    ]
+    assert opening_window(periods, 1) == (540, 1020)
+    assert opening_window(periods, 5) == (1080, 1560)
+    assert opening_window(periods, 3) is None
+    assert opening_window([{"open": {"day": 0, "hour": 0, "minute": 0}}], 0) == (0, 1440)
+
+
+def test_parse_event_dates():
+    plan = date(2025, 10, 5)  # a Sunday
+    assert parse_date("Sun, Oct 5 · 7:00 PM", plan) == plan
+    assert parse_date("Saturday, October 4", plan) == date(2025, 10, 4)
+    assert parse_date("2025-10-06T19:00:00", plan) == date(2025, 10, 6)
+    assert parse_date("Jan 2", date(2025, 12, 30)) == date(2026, 1, 2)
+    assert parse_date("Tomorrow 8pm", plan, today=date(2025, 10, 4)) == plan
+    assert parse_date("Fri 6pm", plan) == date(2025, 10, 10)
+    assert parse_date("Farmers market 5 PM", plan) is None
+    assert parse_date("19:00", plan) is None
+
+
+def test_time_slots_use_the_plan_date():
+    concert = {"title": "Concert", "lat": 43.47, "lon": -80.53, "duration_hours": 2, "confidence": 0.9}
+    sunday_only = [{"open": {"day": 0, "hour": 10, "minute": 0}, "close": {"day": 0, "hour": 16, "minute": 0}}]
+    activities = [
+        {"structured": {**concert, "title": "Saturday Concert", "start_time": "Sat, Oct 4 · 7:00 PM"}},
+        {"structured": {**concert, "title": "Sunday Concert", "start_time": "Sun, Oct 5 · 7:00 PM"}},
+        {"structured": {"title": "Sunday Market", "lat": 43.46, "lon": -80.51, "duration_hours": 1,
+                        "confidence": 0.5, "opening_hours": sunday_only}},
+    ]
+
+    def titles(plan_date):
+        fresh = [{"structured": dict(a["structured"])} for a in activities]
+        return [a["structured"]["title"] for a in _assign_time_slots(fresh, "10:00", "22:00", plan_date=plan_date)]
+
+    assert titles(date(2025, 10, 5)) == ["Sunday Market", "Sunday Concert"]
+    assert titles(date(2025, 10, 4)) == ["Saturday Concert"]
+
+
+def test_scheduling_leaves_the_callers_activities_alone(monkeypatch):
+    async def unvisited(activities, user_id):
+        return activities
+
+    monkeypatch.setattr(generator, "filter_unvisited_activities", unvisited)
+    concert = {"title": "Concert", "place_id": "concert", "activity_type": "entertainment",
+               "lat": 43.47, "lon": -80.53, "duration_hours": 2, "confidence": 0.9,
+               "start_time": "Sun, Oct 5 · 7:00 PM"}
+    activities = [{"structured": dict(concert), "place_id": "concert"}]
+
+    result = asyncio.run(generator.generate_structured_itinerary(
+        activities, "17:00", "22:00", ["entertainment"], plan_date=date(2025, 10, 5)
+    ))
+
+    assert result["itinerary"][0]["start_time"] == "19:00"
+    assert activities == [{"structured": concert, "place_id": "concert"}]
+
+
+def test_local_date_follows_the_user_timezone():
+    assert city_resolver.timezone(43.4643, -80.5204) == "America/Toronto"
+    assert city_resolver.timezone(35.6762, 139.6503) == "Asia/Tokyo"
+    tokyo_today = datetime.now(ZoneInfo("Asia/Tokyo")).date()
+    assert city_resolver.local_date(35.6762, 139.6503) == tokyo_today
+    assert city_resolver.local_date(43.4643, -80.5204, "Asia/Tokyo") == tokyo_today
+
+
+def test_time_slots_follow_event_start_and_drop_what_does_not_fit():
+    activities = [
+        {"structured": {"title": "Gallery", "lat": 43.465, "lon": -80.52, "duration_hours": 1.5, "confidence": 0.5}},
+        {"structured": {"title": "Concert", "lat": 43.47, "lon": -80.53, "duration_hours": 2,
+                        "start_time": "Sun, Oct 5 · 7:00 PM", "confidence": 0.9}},
+        {"structured": {"title": "Park", "lat": 43.46, "lon": -80.51, "duration_hours": 3, "confidence": 0.1}},
+    ]
+    scheduled = _assign_time_slots(
+        activities, "17:00", "21:30", {"lat": 43.465, "lon": -80.52}, plan_date=date(2025, 10, 5)
+    )
+    by_title = {activity["structured"]["title"]: activity["structured"] for activity in scheduled}
+
+    assert list(by_title) == ["Gallery", "Concert"]
+    assert by_title["Gallery"]["start_time"] == "17:00"
+    assert by_title["Concert"]["start_time"] == "19:00"
+
+
+def _nearby_place(place_id, name, lat, lon, open_hour, close_hour):
+    periods = [
+        {"open": {"day": day, "hour": open_hour, "minute": 0}, "close": {"day": day, "hour": close_hour, "minute": 0}}
+        for day in range(7)
+    ]
+    return {
+        "id": place_id,
+        "displayName": {"text": name},
+        "location": {"latitude": lat, "longitude": lon},
+        "rating": 4.5,
+        "types": ["park"],
+        "currentOpeningHours": {"openNow": True, "periods": periods},
+    }
+
+
+def test_nearby_opening_hours_reach_the_schedule(monkeypatch):
+    places = [
+        _nearby_place("early", "Closes At Five Garden", 12.3401, 45.6701, 9, 17),
+        _nearby_place("late", "Night Park", 12.3402, 45.6702, 18, 23),
+    ]
+    masks = []
+
+    class Response:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"places": places}
+
+    def post(url, headers=None, json=None, **kwargs):
+        masks.append(headers["X-Goog-FieldMask"])
+        return Response()
+
+    monkeypatch.setattr(activity_service.http_client, "post", post)
+    activities = asyncio.run(activity_service.fetch_google_places_for_interests(12.34, 45.67, ["scenery"]))
+    assert masks and all("places.currentOpeningHours" in mask for mask in masks)
+
+    scheduled = _assign_time_slots(activities, "16:00", "21:00", {"lat": 12.34, "lon": 45.67})
+    assert [(a["structured"]["title"], a["structured"]["start_time"]) for a in scheduled] == [("Night Park", "18:00")]
+
+
+def test_generator_schedules_from_the_candidate_pool(monkeypatch):
+    async def unvisited(activities, user_id):
+        return activities
+
+    monkeypatch.setattr(generator, "filter_unvisited_activities", unvisited)
+    rng = random.Random(5)
+    interests = ["food", "scenery", "shopping", "entertainment"]
+    activities = []
+    for interest in interests:
+        for i in range(10):
+            structured = {
+                "title": f"{interest} {i}", "place_id": f"{interest}-{i}", "activity_type": interest,
+                "lat": 43.45 + rng.uniform(-0.02, 0.02), "lon": -80.5 + rng.uniform(-0.03, 0.03),
+                "duration_hours": 1.5, "cost": 10, "confidence": 0.5,
+            }
+            activities.append({"structured": structured, "place_id": structured["place_id"], "final_score": i / 10})
+
+    result = asyncio.run(generator.generate_structured_itinerary(
+        activities, "09:00", "21:00", interests, start_location={"lat": ORIGIN[0], "lon": ORIGIN[1]}
+    ))
+
+    # 40 candidates go through the heuristic; with a long day the best of each interest fits
+    assert result["metadata"]["activities_selected"] == 4
+    assert sorted(a["title"] for a in result["itinerary"]) == sorted(f"{interest} 9" for interest in interests)
+
+
+def test_generator_plans_a_short_day(monkeypatch):
+    async def unvisited(activities, user_id):
+        return activities
+
+    monkeypatch.setattr(generator, "filter_unvisited_activities", unvisited)
+    activities = []
+    for i in range(5):
+        structured = {
+            "title": f"Park {i}", "place_id": f"park-{i}", "activity_type": "scenery",
+            "lat": 43.46 + i / 1000, "lon": -80.52, "duration_hours": 1, "cost": 0, "confidence": 0.5,
+        }
+        activities.append({"structured": structured, "place_id": structured["place_id"], "final_score": i / 10})
+
+    result = asyncio.run(generator.generate_structured_itinerary(
+        activities, "10:00", "13:00", ["scenery"], start_location={"lat": ORIGIN[0], "lon": ORIGIN[1]}
+    ))
+
+    assert [a["title"] for a in result["itinerary"]] == ["Park 4"]
@@ -0,0 +1,187 @@
+"""
+Test the async profile data layer against an in-memory MongoDB (mongomock_motor)
+"""
+import asyncio
+import inspect
+
+import mongomock_motor
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+from services import event_crawler, event_index, http_client, mongo
+from services import user_profile_service as profiles
+from services.activity_sources import ActivitySource
+from services.concurrency import run_sync
+from services.mongodb_service import mongodb_service
+from services.sidequest_service import _load_cached_activities, _store_activities
+
+
+@pytest.fixture
+def mock_db():
+    mongo.set_database(mongomock_motor.AsyncMongoMockClient()["sidequest_test_db"])
+    profiles._visited_indexes.clear()
+    yield
+    mongo.set_database(None)
+
+
+def test_auth0_profile_and_keywords_round_trip(mock_db):
+    async def scenario():
+        user_id = "auth0|test_user"
+        await profiles.create_or_update_auth0_user_profile(user_id, "test@example.com", name="Test")
+        await profiles.add_keyword_location(
+            user_id,
+            "gym",
+            {"name": "PAC", "address": "200 University Ave W, Waterloo, ON", "lat": 43.47, "lng": -80.54},
+        )
+
+        keywords = await profiles.get_user_keywords(user_id)
+        assert keywords["gym"]["name"] == "PAC"
+        assert (await mongodb_service.get_user_keywords(user_id))["gym"]["lat"] == 43.47
+
+        await profiles.delete_keyword(user_id, "gym")
+        assert await profiles.get_user_keywords(user_id) == {}
+
+    asyncio.run(scenario())
+
+
+def test_filter_unvisited_activities(mock_db):
+    async def scenario():
+        user_id = "visitor"
+        await profiles.get_or_create_user_profile(user_id)
+        await profiles.add_visited_place(user_id, "Waterloo Park", "park_1", "outdoor", "Waterloo, ON")
+
+        activities = [
+            {"place_id": "park_1", "raw_name": "Somewhere"},
+            {"place_id": "x", "raw_name": "tim hortons"},  # default profile, matched by name
+            {"place_id": "cafe_1", "raw_name": "New Cafe"},
+        ]
+        unvisited = await profiles.filter_unvisited_activities(activities, user_id)
+        assert [a["place_id"] for a in unvisited] == ["cafe_1"]
+
+        # Recording a visit invalidates the cached index
+        await profiles.add_visited_place(user_id, "New Cafe", "cafe_1", "bites", "Waterloo, ON")
+        assert await profiles.filter_unvisited_activities(activities, user_id) == []
+
+    asyncio.run(scenario())
+
+
+def test_auth0_visit_invalidates_the_profile_index(mock_db):
+    async def scenario():
+        await mongo.user_profiles_collection().insert_one(
+            {"auth0_user_id": "auth0|abc", "user_id": "profile-1", "visited_places": []}
+        )
+        activities = [{"place_id": "cafe_1", "raw_name": "New Cafe"}]
+        assert await profiles.filter_unvisited_activities(activities, "profile-1") == activities  # index cached
+
+        assert await mongodb_service.update_user_visited_places(
+            "auth0|abc", {"place_id": "cafe_1", "place_name": "New Cafe"}
+        )
+        assert await profiles.filter_unvisited_activities(activities, "profile-1") == []
+        assert not await mongodb_service.update_user_visited_places("auth0|nobody", {"place_id": "x"})
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def bulk_updates(monkeypatch):
+    """
+    pymongo >= 4.9 passes `sort` when adding an UpdateOne to a bulk write;
+    mongomock (up to 4.3) doesn't take it yet. Accept it when it's unset.
+    """
+    add_update = BulkOperationBuilder.add_update
+    if "sort" in inspect.signature(add_update).parameters:
+        return
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        assert sort is None, "mongomock can't apply a sorted update"
+        return add_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update_without_sort)
+
+
+def test_activity_cache_bulk_round_trip(mock_db, bulk_updates):
+    async def scenario():
+        await mongo.ensure_indexes()
+        await _store_activities({"a": {"title": "A"}, "b": {"title": "B"}})
+        await _store_activities({"a": {"title": "A v2"}})  # upsert, no duplicate key error
+
+        cached = await _load_cached_activities(["a", "b", "missing", "a"])
+        assert {k: v["structured"]["title"] for k, v in cached.items()} == {"a": "A v2", "b": "B"}
+        assert await mongo.activities_collection().count_documents({}) == 2
+
+    asyncio.run(scenario())
+
+
+def test_ensure_indexes_drops_legacy_duplicates(mock_db):
+    async def scenario():
+        activities = mongo.activities_collection()
+        # The cache used to insert_one, so the same place could be stored twice
+        await activities.insert_many([
+            {"place_id": "a", "structured": {"title": "A"}},
+            {"place_id": "a", "structured": {"title": "A v2"}},
+            {"place_id": "b", "structured": {"title": "B"}},
+        ])
+        await mongo.ensure_indexes()
+
+        assert await activities.count_documents({}) == 2
+        assert (await activities.find_one({"place_id": "a"}))["structured"]["title"] == "A v2"
+        index_keys = [index["key"] for index in (await activities.index_information()).values()]
+        assert [("place_id", 1)] in index_keys and [("cached_at", 1)] in index_keys
+        event_keys = [index["key"] for index in (await mongo.event_index_collection().index_information()).values()]
+        assert [("city", 1), ("source", 1)] in event_keys
+
+    asyncio.run(scenario())
+
+
+def test_activity_cache_skips_older_versions(mock_db):
+    async def scenario():
+        # Written before opening hours were part of the structured activity
+        await mongo.activities_collection().insert_one({"place_id": "old", "structured": {"title": "Old"}})
+        assert await _load_cached_activities(["old"]) == {}
+
+    asyncio.run(scenario())
+
+
+def test_failed_crawl_keeps_previous_events(mock_db, monkeypatch):
+    outcomes = [[{"title": "Trivia Night"}], [], ConnectionError("luma is down")]
+
+    async def fetch(city, lat, lon):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(event_crawler, "EVENT_SOURCES", [ActivitySource("luma", fetch, 5)])
+
+    async def scenario():
+        assert await event_crawler.crawl_city("Waterloo") == 1
+        # The scraper swallowed an outage and returned [], then raised outright
+        assert await event_crawler.crawl_city("Waterloo") == 0
+        assert await event_crawler.crawl_city("Waterloo") == 0
+        assert await event_index.load_events("Waterloo", "luma", max_age_s=60) == [{"title": "Trivia Night"}]
+
+        # A city with nothing indexed yet still records an empty result
+        assert await event_index.save_events("Guelph", "luma", [])
+        assert await event_index.load_events("Guelph", "luma", max_age_s=60) == []
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_closes_clients_of_every_loop():
+    async def open_clients():
+        return mongo.get_client(), http_client.get_async_client()
+
+    async def scenario():
+        app_clients = await open_clients()
+        bridge_clients = run_sync(open_clients())
+        await http_client.aclose()
+        mongo.close()
+        return app_clients, bridge_clients
+
+    app_clients, bridge_clients = asyncio.run(scenario())
+    assert not mongo._clients and not http_client._async_pools
+    assert app_clients[1].is_closed and bridge_clients[1].is_closed
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
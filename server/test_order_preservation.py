@@ -46,7 +46,7 @@ async def test_order_preservation():
     # Add sample keywords
     for keyword, location_data in sample_keywords.items():
         try:
-            add_keyword_location(test_user_id, keyword, location_data)
+            await add_keyword_location(test_user_id, keyword, location_data)
             print(f"  ✅ Added keyword: '{keyword}' -> {location_data['name']}")
         except Exception as e:
             print(f"  ❌ Failed to add keyword '{keyword}': {str(e)}")
@@ -102,7 +102,7 @@ async def test_order_preservation():
         print(f"   Expected Order: {test_case['expected_order']}")
         
         try:
-            result = parse_intent_with_rag(
+            result = await parse_intent_with_rag(
                 starting_location="San Francisco, CA",
                 text=test_case['text'],
                 auth0_user_id=test_user_id,
@@ -0,0 +1,25 @@
+"""
+Check that concurrent misses on one Places cache key go upstream once
+"""
+import asyncio
+
+from services.places_cache import PlacesCache
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = PlacesCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"places": [{"id": "park"}]}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_fetch("nearby|parks|dpwhw", fetch) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [{"places": [{"id": "park"}]}] * 10
+    assert asyncio.run(cache.aget_or_fetch("nearby|parks|dpwhw", fetch)) == {"places": [{"id": "park"}]}
+    assert len(calls) == 1
@@ -0,0 +1,77 @@
+"""
+Test that concurrent plan-route requests overlap instead of serializing
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from routers import plan_route_audio
+from services import llm_service, google_places
+
+STAGE_DELAY_S = 0.3
+CONCURRENT_REQUESTS = 4
+
+
+def _fake_parse_intent(starting_location, text, user_id=None, user_context=None):
+    time.sleep(STAGE_DELAY_S)  # blocking, like the real Gemini call
+    return {"place_types": ["cafe"], "search_radius_meters": 1000}
+
+
+async def _fake_search_async(intent, max_concurrency=None):
+    await asyncio.sleep(STAGE_DELAY_S)
+    return [
+        {
+            "place_id": "test_cafe",
+            "name": "Test Cafe",
+            "address": "1 King St, Waterloo, ON",
+            "lat": 43.46,
+            "lng": -80.52,
+            "types": ["cafe"],
+        }
+    ]
+
+
+def _fake_select_stops(intent, candidates, user_id=None, user_context=None):
+    time.sleep(STAGE_DELAY_S)
+    return candidates[:1]
+
+
+async def _post_concurrently(app: FastAPI):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[
+                client.post("/plan-route-text", json={"text": f"coffee {i}"})
+                for i in range(CONCURRENT_REQUESTS)
+            ]
+        )
+        return responses, time.perf_counter() - start
+
+
+def test_plan_route_text_requests_overlap(monkeypatch):
+    monkeypatch.setattr(llm_service, "parse_intent", _fake_parse_intent)
+    monkeypatch.setattr(google_places, "search_async", _fake_search_async)
+    monkeypatch.setattr(llm_service, "select_stops", _fake_select_stops)
+
+    app = FastAPI()
+    app.include_router(plan_route_audio.router)
+
+    responses, elapsed = asyncio.run(_post_concurrently(app))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["stops"][0]["name"] == "Test Cafe" for r in responses)
+
+    one_request_s = 3 * STAGE_DELAY_S
+    serialized_s = CONCURRENT_REQUESTS * one_request_s
+    print(f"⏱️  {CONCURRENT_REQUESTS} requests took {elapsed:.2f}s (serialized would be {serialized_s:.2f}s)")
+    # Overlapping requests finish in about the time of one
+    assert elapsed < one_request_s * 2
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,56 @@
+"""
+Heap-based selection must return exactly what the stable sorts it replaced did
+"""
+import random
+
+from services.ranking import CategoryTopK, TopK, top_k
+from services.scoring_service import ActivityScorer
+
+
+def _pool(count, seed=11):
+    rng = random.Random(seed)
+    # Coarse scores so there are plenty of ties
+    return [
+        {
+            "id": i,
+            "activity_type": rng.choice(["food", "scenery", "cultural", None]),
+            "base_score": rng.choice([0.1, 0.25, 0.5, 0.5, 0.75, 0.9]),
+            "final_score": round(rng.random(), 1),
+        }
+        for i in range(count)
+    ]
+
+
+def _sorted_top_per_category(activities, per_category):
+    by_category = {}
+    for activity in activities:
+        by_category.setdefault(activity.get("activity_type", "general"), []).append(activity)
+    top = []
+    for category_activities in by_category.values():
+        top.extend(sorted(category_activities, key=lambda x: x["base_score"], reverse=True)[:per_category])
+    return top
+
+
+def test_top_k_matches_stable_sort():
+    pool = _pool(500)
+    for k in (0, 1, 7, 500, 800, None):
+        expected = sorted(pool, key=lambda x: x["final_score"], reverse=True)[:k]
+        assert top_k(pool, k, key=lambda x: x["final_score"]) == expected
+
+        streamed = TopK(len(pool) if k is None else k)
+        for activity in pool:
+            streamed.push(activity, activity["final_score"])
+        assert streamed.items() == expected
+
+
+def test_select_top_candidates_matches_sorted_grouping():
+    pool = _pool(300)
+    for per_category in (1, 2, 5, 400):
+        assert ActivityScorer().select_top_candidates(pool, per_category) == _sorted_top_per_category(pool, per_category)
+
+
+def test_category_top_k_keeps_first_seen_category_order():
+    top = CategoryTopK(1, category=lambda item: item[0])
+    for item, score in [(("b", 1), 0.2), (("a", 2), 0.9), (("b", 3), 0.5), (("a", 4), 0.9)]:
+        top.push(item, score)
+    assert top.items() == [("b", 3), ("a", 2)]
@@ -0,0 +1,77 @@
+"""
+Check compute_route against brute force over every stop order
+"""
+import itertools
+import random
+
+import pytest
+
+from services import route_optimizer
+from services.route_optimizer import compute_route, travel_matrix
+
+START = {"lat": 43.4643, "lng": -80.5204, "name": "Home"}
+
+
+def _stops(rng, count):
+    return [
+        {"name": f"stop {i}", "location": {"lat": 43.45 + rng.uniform(-0.05, 0.05), "lng": -80.5 + rng.uniform(-0.08, 0.08)}}
+        for i in range(count)
+    ]
+
+
+def _best_duration(stops, pinned, fixed_end):
+    points = [(START["lat"], START["lng"])] + [(s["location"]["lat"], s["location"]["lng"]) for s in stops]
+    _, duration = travel_matrix(points)
+    best = float("inf")
+    for order in itertools.permutations(range(len(stops))):
+        if any(order[position] != stop for stop, position in pinned.items()):
+            continue
+        if fixed_end and order[-1] != len(stops) - 1:
+            continue
+        path = [0] + [stop + 1 for stop in order]
+        best = min(best, sum(duration[a, b] for a, b in zip(path, path[1:])))
+    return best
+
+
+@pytest.mark.parametrize("exact_max_stops", [12, 0])  # exact DP, then the heuristic only
+def test_routes_against_brute_force(monkeypatch, exact_max_stops):
+    monkeypatch.setattr(route_optimizer, "ROUTE_EXACT_MAX_STOPS", exact_max_stops)
+    rng = random.Random(5)
+    for _ in range(30):
+        stops = _stops(rng, rng.randint(2, 7))
+        pinned = {1: 0} if rng.random() < 0.5 else {}
+        fixed_end = rng.random() < 0.5 and len(stops) > 2
+
+        result = compute_route(stops, start=START, pinned=pinned, fixed_end=fixed_end)
+        names = [point["name"] for point in result["route"]]
+
+        assert sorted(names) == sorted(s["name"] for s in stops)
+        assert all(names[position] == f"stop {stop}" for stop, position in pinned.items())
+        if fixed_end:
+            assert names[-1] == stops[-1]["name"]
+        assert len(result["legs"]) == len(stops)
+        assert result["total_duration"] == pytest.approx(sum(leg["duration"] for leg in result["legs"]))
+
+        best = _best_duration(stops, pinned, fixed_end)
+        if exact_max_stops:
+            assert result["total_duration"] == pytest.approx(best)
+        else:
+            assert result["total_duration"] >= best - 1e-9
+
+
+def test_requested_order_is_kept():
+    stops = _stops(random.Random(1), 5)
+    intent = {"order_preserved": True, "complete_order": [{"order_index": 0}]}
+    result = compute_route(stops, start=START, intent=intent)
+    assert [point["name"] for point in result["route"]] == [s["name"] for s in stops]
+    assert result["legs"][0]["from"] == "Home"
+
+
+def test_conflicting_pins_are_rejected():
+    with pytest.raises(ValueError):
+        compute_route(_stops(random.Random(2), 3), start=START, pinned={0: 1, 1: 1})
+    # Without a start the first stop starts the route, so nothing else can take position 0
+    with pytest.raises(ValueError):
+        compute_route(_stops(random.Random(2), 3), pinned={2: 0})
+    with pytest.raises(ValueError):
+        compute_route(_stops(random.Random(2), 3), pinned={0: 1})
@@ -0,0 +1,62 @@
+"""
+The column scorer must give exactly the scores of the scalar reference methods
+"""
+import random
+
+from services.scoring_service import ActivityScorer, ScoringWeights
+
+
+def _scalar_scores(scorer, activities, user_lat, user_lon, budget):
+    weights = scorer.weights
+    scores = []
+    for activity in activities:
+        structured = activity.get("structured", {})
+        cost_score = scorer._calculate_cost_score(structured.get("cost", 0), budget)
+        distance_score = scorer._calculate_distance_score(
+            structured.get("lat", 0), structured.get("lon", 0), user_lat, user_lon
+        )
+        rating_score = scorer._calculate_rating_score(structured.get("rating", 0))
+        base_score = (
+            cost_score * weights.cost_weight +
+            distance_score * weights.distance_weight +
+            rating_score * weights.rating_weight
+        )
+        scores.append((cost_score, distance_score, rating_score, base_score))
+    return scores
+
+
+def _random_activities(count, seed=7):
+    rng = random.Random(seed)
+    activities = []
+    for _ in range(count):
+        structured = {}
+        # Mix missing fields, zeros and exact tier boundaries with random values
+        if rng.random() < 0.9:
+            structured["lat"] = rng.choice([0, 43.46, 43.47, 43.51, 43.56, 43.66, 43.46 + rng.uniform(-0.3, 0.3)])
+        if rng.random() < 0.9:
+            structured["lon"] = rng.choice([0, -80.52, -80.52 + rng.uniform(-0.3, 0.3)])
+        if rng.random() < 0.9:
+            structured["rating"] = rng.choice([0, -1, 1, 4, 4.5, 5, rng.uniform(0, 5)])
+        if rng.random() < 0.9:
+            structured["cost"] = rng.choice([0, -5, 10, 16, 20, 25, 40, 50, rng.uniform(0, 60)])
+        activities.append({"structured": structured} if rng.random() < 0.95 else {})
+    return activities
+
+
+def test_column_scores_match_scalar_reference():
+    scorer = ActivityScorer(ScoringWeights(cost_weight=0.35, distance_weight=0.25, rating_weight=0.4))
+    for budget in (0, -1, 20, 50.0):
+        activities = _random_activities(2000)
+        expected = _scalar_scores(scorer, activities, 43.46, -80.52, budget)
+
+        scored = scorer.calculate_base_scores(activities, 43.46, -80.52, budget)
+
+        assert scored is activities  # written in place, no copies
+        assert [
+            (a["cost_score"], a["distance_score"], a["rating_score"], a["base_score"]) for a in scored
+        ] == expected
+        assert all(a["final_score"] == a["base_score"] and a["trendiness_score"] == 0.5 for a in scored)
+
+
+def test_empty_batch():
+    assert ActivityScorer().calculate_base_scores([], 43.46, -80.52, 20) == []
@@ -0,0 +1,26 @@
+"""
+Check that events reused from the scrape cache can't be changed by callers
+"""
+from services import scrape_cache as scrape_cache_module
+from services.scrape_cache import ScrapeCache
+
+
+class _Response:
+    status_code = 200
+    content = b"<html>Trivia Night</html>"
+    headers = {"ETag": '"v1"'}
+
+
+def test_reused_events_are_copies(monkeypatch):
+    monkeypatch.setattr(scrape_cache_module.http_client, "get", lambda url, headers=None, **kwargs: _Response())
+    cache = ScrapeCache()
+    url = "https://example.com/events"
+
+    events = [{"place_id": "luma_1", "structured": {"title": "Trivia Night"}}]
+    cache.store(url, cache.get(url), events)
+    events[0]["structured"]["title"] = "Enriched by the caller"
+
+    reused = cache.get(url).cached_events
+    assert reused[0]["structured"]["title"] == "Trivia Night"
+    reused[0]["structured"]["start_time"] = "19:00"
+    assert "start_time" not in cache.get(url).cached_events[0]["structured"]